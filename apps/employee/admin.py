@@ -2,7 +2,7 @@ from django.contrib import admin
 
 from mptt.admin import DraggableMPTTAdmin
 
-from apps.employee.models import Employee, Position
+from apps.employee.models import Employee, Job, Position
 
 
 class EmployeeMPTTModelAdmin(DraggableMPTTAdmin):
@@ -19,3 +19,12 @@ class PositionAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Position, PositionAdmin)
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["kind", "status", "done", "total", "created_by", "created_at"]
+    list_filter = ["kind", "status"]
+    readonly_fields = [field.name for field in Job._meta.fields]
+
+
+admin.site.register(Job, JobAdmin)
@@ -1,9 +1,53 @@
+import uuid
+import random
+from typing import Optional
+from datetime import date, timedelta
+
 from django import forms
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.urls import reverse_lazy
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Employee, Job, Position
+from apps.employee.service.employees import HireDateRange
+from apps.employee.service.generator import parse_fan_out
+from apps.employee.service.positions import get_position_registry
+
+
+def position_choices():
+    return [("", "---------")] + get_position_registry().choices()
+
+
+class PositionChoiceField(forms.ChoiceField):
+    """
+    A position picked from the process's position registry, so rendering and
+    validating the employee form doesn't query the positions table.
+    """
 
-from apps.employee.models import Employee
+    def __init__(self, **kwargs) -> None:
+        super().__init__(choices=position_choices, **kwargs)
+
+    def valid_value(self, value) -> bool:
+        return True
+
+    def clean(self, value):
+        value = super().clean(value)
+        if value in self.empty_values:
+            return None
+        try:
+            return get_position_registry().get(uuid.UUID(str(value)))
+        except (ValueError, Position.DoesNotExist):
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
 
 
 class EmployeeForm(forms.ModelForm):
+    position = PositionChoiceField(label=_("Position"), required=False)
+
     class Meta:
         model = Employee
         fields = [
@@ -13,3 +57,194 @@ class EmployeeForm(forms.ModelForm):
             "parent",
             "hire_date",
         ]
+        widgets = {
+            # Rendering every employee as an <option> doesn't scale; the
+            # supervisor is picked by id with suggestions from the type-ahead
+            # endpoint instead.
+            "parent": forms.TextInput(
+                attrs={
+                    "list": "supervisor-suggestions",
+                    "autocomplete": "off",
+                    "data-autocomplete-url": reverse_lazy(
+                        "employee:employee_autocomplete"
+                    ),
+                }
+            ),
+        }
+
+
+class EmployeeTransferForm(forms.Form):
+    """
+    A bulk reassignment: the reports of ``manager`` (or ``manager`` with their
+    whole subtree) move to ``new_manager``, or become roots when it is empty.
+    """
+
+    manager = forms.UUIDField(label=_("Manager"))
+    new_manager = forms.UUIDField(label=_("New manager"), required=False)
+    include_manager = forms.BooleanField(
+        label=_("Move the manager too"), required=False
+    )
+
+
+class EmployeeFilterForm(forms.Form):
+    """
+    Hire date filters of the employee list, read from the query string.
+
+    All filters that are given are combined; ``get_hire_date_range`` turns them
+    into a single range of dates.
+    """
+
+    hired_from = forms.DateField(label=_("Hired from"), required=False)
+    hired_to = forms.DateField(label=_("Hired to"), required=False)
+    hired_year = forms.IntegerField(
+        label=_("Hired in year"), required=False, min_value=1900, max_value=9998
+    )
+    hired_quarter = forms.IntegerField(
+        label=_("Quarter"), required=False, min_value=1, max_value=4
+    )
+    hired_within_days = forms.IntegerField(
+        label=_("Hired in the last N days"),
+        required=False,
+        min_value=1,
+        max_value=36500,
+    )
+
+    def clean(self) -> dict:
+        cleaned_data = super().clean()
+        if cleaned_data.get("hired_quarter") and not cleaned_data.get("hired_year"):
+            self.add_error("hired_year", _("A quarter needs a year."))
+        if not self.errors:
+            try:
+                self.hire_date_range = self._combine_filters(cleaned_data)
+            except OverflowError:
+                raise forms.ValidationError(
+                    _("The hire date filters are out of range.")
+                )
+        return cleaned_data
+
+    @staticmethod
+    def _combine_filters(data: dict) -> Optional[HireDateRange]:
+        starts, ends = [], []
+
+        if data["hired_from"]:
+            starts.append(data["hired_from"])
+        if data["hired_to"]:
+            ends.append(data["hired_to"] + timedelta(days=1))
+        if data["hired_year"]:
+            year, quarter = data["hired_year"], data["hired_quarter"]
+            if quarter:
+                starts.append(date(year, 3 * quarter - 2, 1))
+                ends.append(
+                    date(year + 1, 1, 1)
+                    if quarter == 4
+                    else date(year, 3 * quarter + 1, 1)
+                )
+            else:
+                starts.append(date(year, 1, 1))
+                ends.append(date(year + 1, 1, 1))
+        if data["hired_within_days"]:
+            starts.append(
+                timezone.localdate() - timedelta(days=data["hired_within_days"])
+            )
+
+        if not (starts or ends):
+            return None
+        return HireDateRange(
+            max(starts) if starts else None, min(ends) if ends else None
+        )
+
+    def get_hire_date_range(self) -> Optional[HireDateRange]:
+        """
+        Combine the valid filters into one half-open range of hire dates.
+
+        Returns:
+            Optional[HireDateRange]: The range, or None if no filter is set or
+            the filters are invalid.
+        """
+        if not self.is_valid():
+            return None
+        return self.hire_date_range
+
+
+class SeedJobForm(forms.Form):
+    """
+    A seeded synthetic organisation, written as a new tree by a background job.
+    """
+
+    employees = forms.IntegerField(label=_("Employees"), min_value=1)
+    seed = forms.IntegerField(
+        label=_("Random seed"),
+        required=False,
+        min_value=0,
+        help_text=_("A random one when empty"),
+    )
+    depth = forms.IntegerField(
+        label=_("Management levels"), required=False, min_value=1
+    )
+    fan_out = forms.CharField(label=_("Direct reports per manager"), required=False)
+
+    def clean_seed(self) -> int:
+        # Fixed at submission, so that a retried job writes the same people.
+        seed = self.cleaned_data["seed"]
+        return seed if seed is not None else random.randrange(2**32)
+
+    def clean_depth(self) -> int:
+        return self.cleaned_data["depth"] or 6
+
+    def clean_fan_out(self) -> str:
+        fan_out = self.cleaned_data["fan_out"] or "uniform:2-8"
+        try:
+            parse_fan_out(fan_out)
+        except ValueError as error:
+            raise forms.ValidationError(str(error))
+        return fan_out
+
+
+class WipeJobForm(forms.Form):
+    """
+    Employees deleted by a background job: a tree, a subtree or everyone.
+    """
+
+    tree_id = forms.IntegerField(label=_("Tree"), required=False, min_value=1)
+    subtree = forms.UUIDField(label=_("Employee and their reports"), required=False)
+    include_positions = forms.BooleanField(
+        label=_("Delete the positions too, when deleting everyone"), required=False
+    )
+
+    def clean(self) -> dict:
+        cleaned_data = super().clean()
+        if cleaned_data.get("tree_id") and cleaned_data.get("subtree"):
+            raise forms.ValidationError(_("Choose either a tree or a subtree."))
+        return cleaned_data
+
+
+class ImportJobForm(forms.Form):
+    """
+    A file imported by a background job, as with the ``load_employees`` command.
+    """
+
+    path = forms.CharField(label=_("File"), help_text=_("A path the workers can read"))
+    use_copy = forms.BooleanField(label=_("Insert with COPY"), required=False)
+
+
+class RepairTreeJobForm(forms.Form):
+    """
+    An org tree integrity check and repair run by a background job.
+    """
+
+    tree_id = forms.IntegerField(label=_("Tree"), required=False, min_value=1)
+    dry_run = forms.BooleanField(label=_("Only count the rows"), required=False)
+
+    def clean(self) -> dict:
+        cleaned_data = super().clean()
+        tree_id = cleaned_data.pop("tree_id", None)
+        cleaned_data["tree_ids"] = [tree_id] if tree_id is not None else None
+        return cleaned_data
+
+
+JOB_FORMS = {
+    Job.Kind.SEED: SeedJobForm,
+    Job.Kind.WIPE: WipeJobForm,
+    Job.Kind.IMPORT: ImportJobForm,
+    Job.Kind.REPAIR_TREE: RepairTreeJobForm,
+}
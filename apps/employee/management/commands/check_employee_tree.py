@@ -0,0 +1,104 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Job
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.jobs import JobService
+
+
+class Command(BaseCommand):
+    """
+    Command to validate the nested set columns of the org tree and repair only
+    the trees that drifted.
+    """
+
+    help = _(
+        "Check the lft/rght/level columns of every tree against the parent links "
+        "in one streaming scan and, with --repair, renumber the corrupted trees"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--tree-id",
+            type=int,
+            action="append",
+            dest="tree_ids",
+            help=_("Check only this tree (can be repeated)"),
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help=_("Renumber the corrupted trees"),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help=_("With --repair, only report how many rows would be rewritten"),
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help=_("With --repair, check and repair in a background job"),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Prints the issues of every corrupted tree and the repairs.
+        """
+        if options["repair"] and options["background"]:
+            job = JobService._submit(
+                Job.Kind.REPAIR_TREE,
+                {"tree_ids": options["tree_ids"], "dry_run": options["dry_run"]},
+            )
+            self.stdout.write(_("Queued job %(id)s") % {"id": job.pk})
+            return
+
+        check = TreeIntegrityService._check(options["tree_ids"])
+        self.stdout.write(
+            f"Checked {check.rows} employees in {check.trees} trees "
+            f"in {check.elapsed:.2f}s"
+        )
+        for tree_id, issues in sorted(check.issues.items()):
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Tree {tree_id}: {check.issue_counts[tree_id]} issues"
+                )
+            )
+            for issue in issues:
+                self.stdout.write(f"  {issue.node_id}: {issue.message}")
+            hidden = check.issue_counts[tree_id] - len(issues)
+            if hidden:
+                self.stdout.write(f"  ... and {hidden} more")
+
+        if not check.issues:
+            self.stdout.write(self.style.SUCCESS("No issues found"))
+            return
+        if not options["repair"]:
+            raise CommandError(
+                _("%(count)s corrupted trees; run with --repair to fix them")
+                % {"count": len(check.issues)}
+            )
+
+        dry_run = options["dry_run"]
+        failed = []
+        for repair in TreeIntegrityService._repair(check, dry_run=dry_run):
+            trees = ", ".join(str(tree_id) for tree_id in repair.tree_ids)
+            if repair.error:
+                failed.append(trees)
+                self.stdout.write(
+                    self.style.ERROR(f"Trees {trees}: not repaired, {repair.error}")
+                )
+                continue
+            verb = "would rewrite" if dry_run else "rewrote"
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Trees {trees}: {verb} {repair.rows} rows in {repair.elapsed:.2f}s"
+                )
+            )
+
+        if failed:
+            raise CommandError(
+                _("Could not repair trees %(trees)s") % {"trees": "; ".join(failed)}
+            )
@@ -1,9 +1,12 @@
+import uuid
 from typing import Any
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError, CommandParser
 from django.utils.translation import gettext_lazy as _
 
-from apps.employee.models import Employee, Position
+from apps.employee.models import Employee, Job, Position
+from apps.employee.service.jobs import JobService
+from apps.employee.service.wipe import EmployeeWipeService
 
 
 class Command(BaseCommand):
@@ -13,14 +16,101 @@ class Command(BaseCommand):
 
     help = _("Delete all rows from the comm_employee table")
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--fast",
+            action="store_true",
+            help=_("Skip per-row signals and cascades with chunked range deletes"),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help=_("Rows deleted per transaction by the chunked fast path"),
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help=_("Delete in a background job, in chunks"),
+        )
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument(
+            "--tree-id",
+            type=int,
+            help=_("Only delete the employees of this tree"),
+        )
+        scope.add_argument(
+            "--subtree",
+            help=_("Only delete this employee and everyone below them"),
+        )
+        scope.add_argument(
+            "--truncate",
+            action="store_true",
+            help=_(
+                "Empty the employee and position tables with TRUNCATE on "
+                "PostgreSQL, which locks both tables until it is done; chunked "
+                "range deletes elsewhere"
+            ),
+        )
+
     def handle(self, *args: Any, **options: Any) -> None:
         """
         Deletes all rows from the comm_employee table.
         """
+        if options["subtree"]:
+            try:
+                options["subtree"] = uuid.UUID(options["subtree"])
+            except ValueError:
+                raise CommandError(
+                    _("Invalid employee id: %(id)s") % {"id": options["subtree"]}
+                )
+
+        if options["background"]:
+            job = JobService._submit(
+                Job.Kind.WIPE,
+                {
+                    "tree_id": options["tree_id"],
+                    "subtree": str(options["subtree"]) if options["subtree"] else None,
+                    "include_positions": True,
+                },
+            )
+            self.stdout.write(_("Queued job %(id)s") % {"id": job.pk})
+            return
+
+        if options["tree_id"] is not None:
+            deleted = EmployeeWipeService._delete_tree(options["tree_id"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    _("Deleted %(count)s employees of tree %(tree_id)s")
+                    % {"count": deleted, "tree_id": options["tree_id"]}
+                )
+            )
+            return
+
+        if options["subtree"]:
+            try:
+                deleted = EmployeeWipeService._delete_subtree(options["subtree"])
+            except ValueError as error:
+                raise CommandError(str(error))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    _("Deleted %(count)s employees") % {"count": deleted}
+                )
+            )
+            return
 
-        # Delete all records
-        Employee.objects.all().delete()
-        Position.objects.all().delete()
+        if options["fast"] or options["truncate"]:
+            if not (options["truncate"] and EmployeeWipeService._truncate()):
+                EmployeeWipeService._delete_in_chunks(
+                    chunk_size=options["chunk_size"],
+                    progress=lambda deleted: self.stdout.write(
+                        f"  {deleted} employees deleted"
+                    ),
+                )
+        else:
+            # Delete all records
+            Employee.objects.all().delete()
+            Position.objects.all().delete()
         self.stdout.write(
             self.style.SUCCESS(
                 _("Successfully deleted all rows from the comm_employee table")
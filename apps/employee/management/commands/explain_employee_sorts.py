@@ -0,0 +1,54 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.service.plans import QueryPlanService
+
+
+class Command(BaseCommand):
+    """
+    Command to check that every sort of the employee list is served by an index.
+    """
+
+    help = _(
+        "Explain the employee list query of every sort option and fail if any of "
+        "them sorts or scans the whole table"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--per-page",
+            type=int,
+            default=15,
+            help=_("The page size to explain (default: 15)"),
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help=_("Print the full plans"),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Prints the plan nodes of every sort option and page.
+        """
+        failed = []
+        for plan in QueryPlanService._check_sort_plans(options["per_page"]):
+            if plan.index_only_order is None:
+                status = self.style.WARNING("UNCHECKED")
+            elif plan.index_only_order:
+                status = self.style.SUCCESS("OK")
+            else:
+                status = self.style.ERROR("FULL SORT")
+                failed.append(f"{plan.sort_by} ({plan.page} page)")
+            self.stdout.write(
+                f"{status} {plan.sort_by}, {plan.page} page: {' -> '.join(plan.nodes)}"
+            )
+            if options["verbose_plans"] or plan.index_only_order is None:
+                self.stdout.write(plan.plan)
+
+        if failed:
+            raise CommandError(
+                _("Not served by an index: %(sorts)s") % {"sorts": ", ".join(failed)}
+            )
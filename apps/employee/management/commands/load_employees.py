@@ -0,0 +1,100 @@
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Job
+from apps.employee.service.importer import EmployeeImporter
+from apps.employee.service.jobs import JobService
+
+
+class Command(BaseCommand):
+    """
+    Command to import employees and positions from a fixture or CSV file.
+    """
+
+    help = _(
+        "Import employees and positions from a JSON, JSON Lines or CSV file "
+        "(optionally compressed) in validated batches"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help=_("The file to import"))
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help=_("Rows validated and written per transaction (default: 5000)"),
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help=_("Insert new rows with COPY when running on PostgreSQL"),
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=_("Where progress is saved (default: <path>.checkpoint)"),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help=_("Continue an interrupted import from its checkpoint"),
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help=_(
+                "Import in a background job, which the workers must be able to "
+                "read the file for; progress is saved on the job"
+            ),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Imports the file and reports progress, throughput and rejected rows.
+        """
+        path = options["path"]
+        if options["background"]:
+            job = JobService._submit(
+                Job.Kind.IMPORT,
+                {"path": str(Path(path).resolve()), "use_copy": options["copy"]},
+            )
+            self.stdout.write(_("Queued job %(id)s") % {"id": job.pk})
+            return
+
+        def report(rows: int, elapsed: float) -> None:
+            rate = rows / elapsed if elapsed else rows
+            self.stdout.write(f"  {rows} rows processed ({rate:.0f} rows/sec)")
+
+        importer = EmployeeImporter(
+            batch_size=options["batch_size"],
+            use_copy=options["copy"],
+            checkpoint=options["checkpoint"] or f"{path}.checkpoint",
+            progress=report,
+        )
+        try:
+            result = importer._import(path, resume=options["resume"])
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+        for issue in result.errors[:20]:
+            self.stderr.write(f"  row {issue.row} ({issue.pk}): {issue.message}")
+        if len(result.errors) > 20:
+            self.stderr.write(f"  ... and {len(result.errors) - 20} more")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                _(
+                    "Imported %(rows)s rows in %(elapsed).1fs: %(created)s created, "
+                    "%(updated)s updated, %(errors)s rejected"
+                )
+                % {
+                    "rows": result.rows,
+                    "elapsed": result.elapsed,
+                    "created": result.created,
+                    "updated": result.updated,
+                    "errors": len(result.errors),
+                }
+            )
+        )
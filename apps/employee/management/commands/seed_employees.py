@@ -1,31 +1,27 @@
-import json
+import os
 import random
 import sys
 from uuid import uuid4
 from faker import Faker
 
+from django.db.models import Max
 from django.core.management.base import BaseCommand
 
-from apps.employee.models import Position, Employee
+from apps.employee.models import Job, Employee
+from apps.employee.service.bulk import BulkInsertService
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.tree import compute_tree_positions
+from apps.employee.service.generator import parse_position_mix
+from apps.employee.service.positions import get_position_registry
+from apps.employee.service.fixtures import FixtureWriter
+from apps.employee.service.jobs import JobService
+from apps.employee.service.seeding import POSITION_NAMES, SeedService
+from apps.employee.service.typeahead import invalidate_typeahead_index
 
 
 faker = Faker()
 
-positions_list = [
-    "CEO",
-    "Team Lead",
-    "Employee",
-    "Intern",
-    "Data Analyst",
-    "Mechanical engineer",
-    "HR",
-    "UI Developer",
-    "UI/UX",
-    "Backend Architect",
-    "Frontend Architect",
-    "Software Tester",
-    "QA",
-]
+positions_list = POSITION_NAMES
 
 
 class Command(BaseCommand):
@@ -33,7 +29,65 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("employees", type=int)
-        parser.add_argument("supervisors", type=int)
+        parser.add_argument("supervisors", type=int, nargs="?", default=1)
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Build the hierarchy in memory and write it with batched bulk inserts",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows written per batch in bulk mode (default: 5000)",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Use COPY instead of INSERT in bulk mode when running on PostgreSQL",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Generate a reproducible organisation from this random seed "
+            "(implies --bulk)",
+        )
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=6,
+            help="Maximum number of management levels of a seeded organisation",
+        )
+        parser.add_argument(
+            "--fan-out",
+            default="uniform:2-8",
+            help="Direct reports per manager: fixed:N, uniform:MIN-MAX or "
+            "geometric:MEAN (default: uniform:2-8)",
+        )
+        parser.add_argument(
+            "--position-mix",
+            help="Position weights of a seeded organisation, e.g. "
+            "'Employee=60,Intern=10,QA=5' (default: all positions equally)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes used to generate personal data of a seeded organisation",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Write a seeded organisation (a random seed without --seed) in a "
+            "background job; --position-mix, --workers, --copy and --output are "
+            "not used",
+        )
+        parser.add_argument(
+            "--output",
+            default="apps/employee/fixtures/employee_data.json",
+            help="Fixture file written alongside the database rows; use .jsonl for "
+            "JSON Lines and add .gz, .bz2, .xz or .zst to compress it",
+        )
 
     @staticmethod
     def print_success_message(number_of_employees):
@@ -42,27 +96,13 @@ class Command(BaseCommand):
         )
 
     @staticmethod
-    def create_positions(data):
-        for i, position_name in enumerate(positions_list):
-            position = Position.objects.create(position_name=position_name)
-            position_record = {
-                "model": "employee.position",
-                "pk": str(position.id),
-                "fields": {
-                    "position_name": position.position_name,
-                },
-            }
-            data.append(position_record)
-        return data
-
-    @staticmethod
-    def write_to_json(data):
-        with open("apps/employee/fixtures/employee_data.json", "w") as json_file:
-            json.dump(data, json_file, indent=4, separators=(",", ": "))
+    def create_positions(writer, names=positions_list):
+        SeedService._create_positions(names, writer)
 
     @staticmethod
-    def create_employees(number_of_employees, number_of_supervisors, data):
+    def create_employees(number_of_employees, number_of_supervisors, writer):
         employees = []
+        position_ids = list(get_position_registry().ids().values())
 
         # Создаем начальника высшего уровня
         root_manager = None
@@ -72,14 +112,14 @@ class Command(BaseCommand):
             hired = faker.date_between(start_date="-5y", end_date="today").strftime(
                 "%Y-%m-%d"
             )
-            position = random.choice(Position.objects.all())
+            position_id = random.choice(position_ids)
 
             root_manager = Employee.objects.create(
                 id=uuid4(),
                 full_name=full_name,
                 email=email,
                 hire_date=hired,
-                position=position,
+                position_id=position_id,
                 show_supervisors=True,
             )
 
@@ -92,7 +132,7 @@ class Command(BaseCommand):
             hired = faker.date_between(start_date="-5y", end_date="today").strftime(
                 "%Y-%m-%d"
             )
-            position = random.choice(Position.objects.all())
+            position_id = random.choice(position_ids)
 
             # Выбираем случайного начальника из уже созданных сотрудников
             parent = random.choice(employees)
@@ -102,34 +142,121 @@ class Command(BaseCommand):
                 full_name=full_name,
                 email=email,
                 hire_date=hired,
-                position=position,
+                position_id=position_id,
                 show_supervisors=True,
                 parent=parent,
             )
 
             employees.append(employee)
 
-        # Добавляем записи в JSON
-        for employee in employees:
-            record = {
-                "model": "employee.employee",
-                "pk": str(employee.id),
-                "fields": {
-                    "full_name": employee.full_name,
-                    "email": employee.email,
-                    "hire_date": str(employee.hire_date),
-                    "position": str(employee.position_id),
-                    "parent": str(employee.parent_id) if employee.parent else None,
-                    "show_supervisors": employee.show_supervisors,
-                },
-            }
-            data.append(record)
+        # Добавляем записи в JSON; lft/rght сдвигались при каждой вставке,
+        # поэтому читаем итоговые значения из базы
+        if root_manager is not None:
+            writer.write_objects(
+                Employee.objects.filter(tree_id=root_manager.tree_id)
+                .order_by("lft")
+                .iterator()
+            )
 
-        return data
+    @staticmethod
+    def build_employees(number_of_employees, number_of_supervisors):
+        """
+        Build unsaved employees with precomputed MPTT fields, parents first.
 
-    def handle(self, *args, **options):
-        data = []
+        The hierarchy has the same shape as ``create_employees`` produces, but it is
+        assembled in memory and the nested set values are computed in one pass, so
+        the rows can be written without MPTT renumbering the tree on every insert.
+        """
+        position_ids = list(get_position_registry().ids().values())
+        rows = []
+
+        if number_of_supervisors > 0:
+            rows.append((uuid4(), None))
+            for _ in range(number_of_employees - number_of_supervisors):
+                rows.append((uuid4(), random.choice(rows)[0]))
+
+        first_tree_id = (
+            Employee.objects.aggregate(Max("tree_id"))["tree_id__max"] or 0
+        ) + 1
+        tree_positions = compute_tree_positions(rows, first_tree_id=first_tree_id)
 
+        employees = []
+        for employee_id, parent_id in rows:
+            tree_position = tree_positions[employee_id]
+            employees.append(
+                Employee(
+                    id=employee_id,
+                    full_name=faker.name(),
+                    email=faker.email(),
+                    hire_date=faker.date_between(start_date="-5y", end_date="today"),
+                    position_id=random.choice(position_ids) if position_ids else None,
+                    show_supervisors=True,
+                    parent_id=parent_id,
+                    tree_id=tree_position.tree_id,
+                    lft=tree_position.lft,
+                    rght=tree_position.rght,
+                    level=tree_position.level,
+                )
+            )
+        return employees
+
+    def progress_reporter(self, total):
+        def report(written, elapsed):
+            rate = written / elapsed if elapsed else written
+            self.stdout.write(
+                f"  {written}/{total} employees written ({rate:.0f} rows/sec)"
+            )
+
+        return report
+
+    def write_employees(self, employees, total, writer, batch_size, use_copy):
+        def records():
+            for employee in employees:
+                writer.write_objects([employee])
+                yield employee
+
+        BulkInsertService._bulk_insert(
+            Employee,
+            records(),
+            batch_size=batch_size,
+            use_copy=use_copy,
+            progress=self.progress_reporter(total),
+        )
+        # Bulk inserts skip the signals that invalidate org chart snapshots and
+        # update the type-ahead index.
+        bump_generation("tree")
+        invalidate_typeahead_index()
+
+    def bulk_create_employees(
+        self, number_of_employees, number_of_supervisors, writer, batch_size, use_copy
+    ):
+        employees = self.build_employees(number_of_employees, number_of_supervisors)
+        self.write_employees(employees, len(employees), writer, batch_size, use_copy)
+
+    def generate_employees(self, number_of_employees, writer, options):
+        """
+        Generate a reproducible organisation with the requested shape and write it
+        in bulk; the same seed and shape options always produce the same dataset.
+        """
+        position_mix = None
+        if options["position_mix"]:
+            position_mix = parse_position_mix(options["position_mix"])
+
+        result = SeedService._seed(
+            number_of_employees,
+            seed=options["seed"],
+            depth=options["depth"],
+            fan_out=options["fan_out"],
+            position_mix=position_mix,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            use_copy=options["copy"],
+            writer=writer,
+            progress=self.progress_reporter(number_of_employees),
+        )
+        self.stdout.write(f"  Dataset fingerprint: {result.fingerprint}")
+
+    def handle(self, *args, **options):
         if not options["employees"]:
             if len(sys.argv) != 3:
                 print(
@@ -146,7 +273,35 @@ class Command(BaseCommand):
                 f"\n\033[93m  Usage: python manage.py db_seeder {number_of_employees} {number_of_supervisors}\033[0m"
             )
 
-        data = self.create_positions(data)
-        data = self.create_employees(number_of_employees, number_of_supervisors, data)
-        self.write_to_json(data)
+        if options["background"]:
+            job = JobService._submit(
+                Job.Kind.SEED,
+                {
+                    "employees": number_of_employees,
+                    "seed": options["seed"]
+                    if options["seed"] is not None
+                    else random.randrange(2**32),
+                    "depth": options["depth"],
+                    "fan_out": options["fan_out"],
+                },
+            )
+            self.stdout.write(f"  Queued job {job.pk}")
+            return
+
+        with FixtureWriter(options["output"]) as writer:
+            self.create_positions(writer)
+            if options["seed"] is not None:
+                self.generate_employees(number_of_employees, writer, options)
+            elif options["bulk"]:
+                self.bulk_create_employees(
+                    number_of_employees,
+                    number_of_supervisors,
+                    writer,
+                    options["batch_size"],
+                    options["copy"],
+                )
+            else:
+                self.create_employees(
+                    number_of_employees, number_of_supervisors, writer
+                )
         self.print_success_message(number_of_employees)
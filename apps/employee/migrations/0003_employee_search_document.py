@@ -0,0 +1,107 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Keeps search_document (weighted tsvector) and search_text (trigram source) in
+# sync with the employee's name and email, the position name and the manager's
+# name. Triggers rather than save() hooks, so bulk inserts, COPY and queryset
+# updates are covered as well.
+CREATE_TRIGGERS = """
+CREATE FUNCTION employee_search_document_update() RETURNS trigger AS $$
+DECLARE
+    v_position_name text;
+    v_manager_name text;
+BEGIN
+    SELECT p.position_name INTO v_position_name
+    FROM employee_position p WHERE p.id = NEW.position_id;
+    SELECT m.full_name INTO v_manager_name
+    FROM employee_employee m WHERE m.id = NEW.parent_id;
+
+    NEW.search_document :=
+        setweight(to_tsvector('simple', coalesce(NEW.full_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(v_position_name, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(v_manager_name, '')), 'D');
+    NEW.search_text := concat_ws(
+        ' ', NEW.full_name, NEW.email, v_position_name, v_manager_name
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_search_document
+BEFORE INSERT OR UPDATE OF full_name, email, position_id, parent_id
+ON employee_employee
+FOR EACH ROW EXECUTE FUNCTION employee_search_document_update();
+
+-- Touching parent_id/position_id of the affected rows re-runs the trigger above.
+CREATE FUNCTION employee_search_document_manager_renamed() RETURNS trigger AS $$
+BEGIN
+    UPDATE employee_employee SET parent_id = parent_id WHERE parent_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_search_document_manager_renamed
+AFTER UPDATE OF full_name ON employee_employee
+FOR EACH ROW WHEN (OLD.full_name IS DISTINCT FROM NEW.full_name)
+EXECUTE FUNCTION employee_search_document_manager_renamed();
+
+CREATE FUNCTION employee_search_document_position_renamed() RETURNS trigger AS $$
+BEGIN
+    UPDATE employee_employee SET position_id = position_id
+    WHERE position_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_search_document_position_renamed
+AFTER UPDATE OF position_name ON employee_position
+FOR EACH ROW WHEN (OLD.position_name IS DISTINCT FROM NEW.position_name)
+EXECUTE FUNCTION employee_search_document_position_renamed();
+
+UPDATE employee_employee SET full_name = full_name;
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER employee_search_document_position_renamed ON employee_position;
+DROP FUNCTION employee_search_document_position_renamed();
+DROP TRIGGER employee_search_document_manager_renamed ON employee_employee;
+DROP FUNCTION employee_search_document_manager_renamed();
+DROP TRIGGER employee_search_document ON employee_employee;
+DROP FUNCTION employee_search_document_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_rename_supervisor_employee_parent'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='employee',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        # Backfill before the indexes exist so they are built once, not per row.
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='employee_search_doc_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='employee_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:16
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ('employee', '0003_employee_search_document'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['hire_date', 'id'], name='employee_hire_date_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+# The search trigger of migration 0003 already looks up the position and
+# manager names, and re-runs when either of them is renamed; it now also copies
+# them into the sort key columns.
+SEARCH_DOCUMENT_UPDATE = """
+CREATE OR REPLACE FUNCTION employee_search_document_update() RETURNS trigger AS $$
+DECLARE
+    v_position_name text;
+    v_manager_name text;
+BEGIN
+    SELECT p.position_name INTO v_position_name
+    FROM employee_position p WHERE p.id = NEW.position_id;
+    SELECT m.full_name INTO v_manager_name
+    FROM employee_employee m WHERE m.id = NEW.parent_id;
+
+    NEW.search_document :=
+        setweight(to_tsvector('simple', coalesce(NEW.full_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(v_position_name, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(v_manager_name, '')), 'D');
+    NEW.search_text := concat_ws(
+        ' ', NEW.full_name, NEW.email, v_position_name, v_manager_name
+    );
+    {sort_keys}
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_SORT_KEYS = SEARCH_DOCUMENT_UPDATE.replace(
+    "{sort_keys}",
+    "NEW.position_name := coalesce(v_position_name, '');\n"
+    "    NEW.manager_name := coalesce(v_manager_name, '');",
+) + """
+UPDATE employee_employee SET full_name = full_name;
+"""
+
+DROP_SORT_KEYS = SEARCH_DOCUMENT_UPDATE.replace("{sort_keys}", "")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_employee_hire_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='manager_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=50, verbose_name='Manager name'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='position_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=244, verbose_name='Position name'),
+        ),
+        migrations.RunSQL(CREATE_SORT_KEYS, DROP_SORT_KEYS),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:16
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ('employee', '0005_employee_sort_keys'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['full_name', 'id'], name='employee_full_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['position_name', 'id'], name='employee_position_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['email', 'id'], name='employee_email_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['manager_name', 'id'], name='employee_manager_name_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ('employee', '0006_employee_sort_key_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['tree_id', 'lft'], name='employee_tree_lft_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['parent', 'lft'], name='employee_parent_lft_idx'),
+        ),
+    ]
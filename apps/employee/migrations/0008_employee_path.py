@@ -0,0 +1,74 @@
+# Generated by Django 4.0.10 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+# Keeps path (the hex ids of the ancestors and of the employee, each followed
+# by a dot) in sync with parent. The BEFORE trigger derives the path of a new or
+# moved employee from the path of its parent; the AFTER trigger rewrites the
+# paths below a moved employee with one prefix replacement over the path index.
+# The cascade's own row updates (trigger depth 1) don't cascade again: their
+# subtrees are rewritten by the same statement.
+CREATE_PATH = """
+WITH RECURSIVE paths (id, path) AS (
+    SELECT id, replace(id::text, '-', '') || '.'
+    FROM employee_employee WHERE parent_id IS NULL
+    UNION ALL
+    SELECT e.id, p.path || replace(e.id::text, '-', '') || '.'
+    FROM employee_employee e JOIN paths p ON e.parent_id = p.id
+)
+UPDATE employee_employee e SET path = paths.path
+FROM paths WHERE e.id = paths.id;
+
+CREATE FUNCTION employee_path_update() RETURNS trigger AS $$
+DECLARE
+    v_parent_path text;
+BEGIN
+    SELECT m.path INTO v_parent_path
+    FROM employee_employee m WHERE m.id = NEW.parent_id;
+    NEW.path := coalesce(v_parent_path, '') || replace(NEW.id::text, '-', '') || '.';
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_path
+BEFORE INSERT OR UPDATE OF parent_id ON employee_employee
+FOR EACH ROW EXECUTE FUNCTION employee_path_update();
+
+CREATE FUNCTION employee_path_moved() RETURNS trigger AS $$
+BEGIN
+    UPDATE employee_employee
+    SET path = NEW.path || substr(path, length(OLD.path) + 1)
+    WHERE path LIKE OLD.path || '%' AND id <> NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_path_moved
+AFTER UPDATE OF path ON employee_employee
+FOR EACH ROW WHEN (OLD.path IS DISTINCT FROM NEW.path AND pg_trigger_depth() = 0)
+EXECUTE FUNCTION employee_path_moved();
+"""
+
+DROP_PATH = """
+DROP TRIGGER employee_path_moved ON employee_employee;
+DROP FUNCTION employee_path_moved();
+DROP TRIGGER employee_path ON employee_employee;
+DROP FUNCTION employee_path_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0007_employee_tree_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='path',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Path'),
+        ),
+        # Backfill before the triggers exist, so the backfill doesn't cascade.
+        migrations.RunSQL(CREATE_PATH, DROP_PATH),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.0.10 on 2026-10-18 19:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ('employee', '0008_employee_path'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employee',
+            index=models.Index(fields=['path'], name='employee_path_idx', opclasses=['text_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.0.10 on 2026-10-18 19:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Touches updated_at when the employee's own columns or the position and
+# manager names shown with them change, but not when the tree columns are
+# renumbered. BEFORE triggers fire in name order, so this one runs after
+# employee_search_document has copied the names; renaming a position or a
+# manager re-runs both through the cascades of migration 0003.
+CREATE_UPDATED_AT = """
+CREATE FUNCTION employee_updated_at_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        NEW.updated_at := now();
+    ELSIF (
+        NEW.full_name, NEW.email, NEW.hire_date, NEW.position_id, NEW.parent_id,
+        NEW.show_supervisors, NEW.position_name, NEW.manager_name
+    ) IS DISTINCT FROM (
+        OLD.full_name, OLD.email, OLD.hire_date, OLD.position_id, OLD.parent_id,
+        OLD.show_supervisors, OLD.position_name, OLD.manager_name
+    ) THEN
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_updated_at
+BEFORE INSERT OR UPDATE ON employee_employee
+FOR EACH ROW EXECUTE FUNCTION employee_updated_at_update();
+"""
+
+DROP_UPDATED_AT = """
+DROP TRIGGER employee_updated_at ON employee_employee;
+DROP FUNCTION employee_updated_at_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0010_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Updated at'),
+        ),
+        migrations.RunSQL(CREATE_UPDATED_AT, DROP_UPDATED_AT),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 4.0.10 on 2026-10-19 09:12
+
+from django.db import migrations
+
+# The row trigger of migration 0008 rewrote the subtree of every moved
+# employee from NEW.path as each row was updated. When one statement moved both
+# an employee and someone above their new manager (a multi-row bulk_update),
+# the order of the rows decided whether the subtree was rebuilt from the old
+# or the new path of that ancestor. Likewise a bulk insert that listed a report
+# before their manager got a path without the manager.
+#
+# Now the BEFORE trigger only records such rows, with the path their subtree
+# has, in employee_path_move, and a statement trigger rebuilds their paths from
+# the final parent links once the whole statement is done: each recorded row
+# from its chain of parents, every other row below one from the new path of the
+# closest recorded row above it. The queue only ever holds rows of the running
+# statement, so it is unlogged; the statement trigger only fires for
+# statements that set parent_id, so renumbering lft/rght doesn't pay for it.
+CREATE_REPAIR = """
+CREATE UNLOGGED TABLE employee_path_move (
+    id uuid NOT NULL,
+    old_path text NOT NULL
+);
+
+DROP TRIGGER employee_path_moved ON employee_employee;
+DROP FUNCTION employee_path_moved();
+
+CREATE OR REPLACE FUNCTION employee_path_update() RETURNS trigger AS $$
+DECLARE
+    v_parent_path text;
+BEGIN
+    SELECT m.path INTO v_parent_path
+    FROM employee_employee m WHERE m.id = NEW.parent_id;
+    NEW.path := coalesce(v_parent_path, '') || replace(NEW.id::text, '-', '') || '.';
+    IF TG_OP = 'UPDATE' AND OLD.parent_id IS DISTINCT FROM NEW.parent_id THEN
+        INSERT INTO employee_path_move (id, old_path) VALUES (NEW.id, OLD.path);
+    ELSIF TG_OP = 'INSERT' AND NEW.parent_id IS NOT NULL AND v_parent_path IS NULL THEN
+        -- The manager comes later in the same statement.
+        INSERT INTO employee_path_move (id, old_path) VALUES (NEW.id, NEW.path);
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION employee_path_repair() RETURNS trigger AS $$
+DECLARE
+    v_ids uuid[];
+    v_old_paths text[];
+BEGIN
+    WITH moved AS (
+        DELETE FROM employee_path_move RETURNING id, old_path
+    )
+    SELECT array_agg(id), array_agg(old_path) INTO v_ids, v_old_paths FROM moved;
+    IF v_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    WITH RECURSIVE moved (id, old_path) AS (
+        SELECT * FROM unnest(v_ids, v_old_paths)
+    ), chain (id, ancestor_id, depth, seen) AS (
+        SELECT id, id, 0, ARRAY[id] FROM moved
+        UNION ALL
+        SELECT c.id, e.parent_id, c.depth + 1, c.seen || e.parent_id
+        FROM chain c JOIN employee_employee e ON e.id = c.ancestor_id
+        WHERE e.parent_id IS NOT NULL AND e.parent_id <> ALL (c.seen)
+    ), new_paths (id, path) AS (
+        SELECT id, string_agg(
+            replace(ancestor_id::text, '-', '') || '.', '' ORDER BY depth DESC
+        )
+        FROM chain GROUP BY id
+    ), rewritten (id, path) AS (
+        SELECT id, path FROM new_paths
+        UNION ALL
+        (
+            -- A prefix range of employee_path_idx; 'g' sorts after every hex
+            -- digit and the dot.
+            SELECT DISTINCT ON (e.id)
+                e.id, n.path || substr(e.path, length(m.old_path) + 1)
+            FROM moved m
+            JOIN new_paths n ON n.id = m.id
+            JOIN employee_employee e
+                ON e.path ~>=~ m.old_path AND e.path ~<~ (m.old_path || 'g')
+            WHERE e.id <> ALL (v_ids)
+            ORDER BY e.id, length(m.old_path) DESC
+        )
+    )
+    UPDATE employee_employee e SET path = r.path
+    FROM rewritten r
+    WHERE e.id = r.id AND e.path IS DISTINCT FROM r.path;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_path_repair
+AFTER INSERT OR UPDATE OF parent_id ON employee_employee
+FOR EACH STATEMENT EXECUTE FUNCTION employee_path_repair();
+"""
+
+DROP_REPAIR = """
+DROP TRIGGER employee_path_repair ON employee_employee;
+DROP FUNCTION employee_path_repair();
+
+CREATE OR REPLACE FUNCTION employee_path_update() RETURNS trigger AS $$
+DECLARE
+    v_parent_path text;
+BEGIN
+    SELECT m.path INTO v_parent_path
+    FROM employee_employee m WHERE m.id = NEW.parent_id;
+    NEW.path := coalesce(v_parent_path, '') || replace(NEW.id::text, '-', '') || '.';
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION employee_path_moved() RETURNS trigger AS $$
+BEGIN
+    UPDATE employee_employee
+    SET path = NEW.path || substr(path, length(OLD.path) + 1)
+    WHERE path LIKE OLD.path || '%' AND id <> NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_path_moved
+AFTER UPDATE OF path ON employee_employee
+FOR EACH ROW WHEN (OLD.path IS DISTINCT FROM NEW.path AND pg_trigger_depth() = 0)
+EXECUTE FUNCTION employee_path_moved();
+
+DROP TABLE employee_path_move;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0011_employee_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_REPAIR, DROP_REPAIR),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.10 on 2026-10-20 10:41
+
+from importlib import import_module
+
+from django.db import migrations
+
+# Every hierarchy read goes through the nested set again, so the path column and
+# the triggers keeping it current (which fired on every insert and every change
+# of manager) are dropped. Reversing restores them as migrations 0008 and 0012
+# left them, backfilled from the parent links.
+DROP_PATH = """
+DROP TRIGGER employee_path_repair ON employee_employee;
+DROP FUNCTION employee_path_repair();
+DROP TRIGGER employee_path ON employee_employee;
+DROP FUNCTION employee_path_update();
+DROP TABLE employee_path_move;
+"""
+
+
+def restore_path_sql():
+    path = import_module('apps.employee.migrations.0008_employee_path')
+    repair = import_module('apps.employee.migrations.0012_employee_path_statement_repair')
+    return path.CREATE_PATH + repair.CREATE_REPAIR
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0012_employee_path_statement_repair'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_PATH, restore_path_sql()),
+        migrations.RemoveIndex(
+            model_name='employee',
+            name='employee_path_idx',
+        ),
+        migrations.RemoveField(
+            model_name='employee',
+            name='path',
+        ),
+    ]
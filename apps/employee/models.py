@@ -1,7 +1,11 @@
 import uuid
 
+from django.conf import settings
 from django.db import models
 from django.core import validators
+from django.utils import timezone
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.translation import gettext_lazy as _
 
 from mptt.models import MPTTModel, TreeForeignKey
@@ -61,27 +65,60 @@ class Employee(MPTTModel):
         verbose_name=_("Supervisor"),
     )
     show_supervisors = models.BooleanField(default=True)
+    # Maintained by database triggers from the employee's name and email, the
+    # position name and the manager's name (see migrations 0003 and 0005).
+    search_document = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(blank=True, default="", editable=False)
+    # Copies of the position and manager names, so the list can be sorted by
+    # them with an index scan instead of a join and a sort. Empty rather than
+    # NULL when there is none, which keeps the keyset predicates plain ranges.
+    position_name = models.CharField(
+        _("Position name"), max_length=244, blank=True, default="", editable=False
+    )
+    manager_name = models.CharField(
+        _("Manager name"), max_length=50, blank=True, default="", editable=False
+    )
+    # When anything shown in a row of the employee list or the detail page last
+    # changed, including the position and manager names; maintained by a
+    # database trigger (see migration 0011) and keying cached row fragments.
+    updated_at = models.DateTimeField(
+        _("Updated at"), default=timezone.now, editable=False
+    )
+
+    def save(self, *args, **kwargs):
+        # MPTT records the parent an instance was loaded with, but overwrites it
+        # while moving the node, before the save signals are sent; the org chart
+        # invalidation needs the old one.
+        self._loaded_parent_id = self._mptt_cached_fields.get("parent")
+        super().save(*args, **kwargs)
 
     def transfer_supervisors(self, new_manager):
         """
-        Update the supervisor of the current object with the provided new manager.
+        Move the direct reports of the current object, with everyone below
+        them, to the provided new manager.
 
         Parameters:
-            new_manager (str): The name of the new manager.
+            new_manager (Employee): The new manager, or None to make every report
+                the root of a tree of their own.
 
         Returns:
-            None
+            TransferResult: The number of moved employees and renumbered rows.
         """
-        self.parent.update(parent=new_manager)
+        from apps.employee.service.employees import EmployeeService
+
+        return EmployeeService._transfer_reports(
+            self.pk, new_manager.pk if new_manager is not None else None
+        )
 
     def get_supervisors(self):
         """
-        Retrieves all supervisors along with their associated positions.
+        Retrieves the reporting chain, from the top of the tree down to the
+        direct supervisor, along with their associated positions.
 
         :returns: A queryset of supervisors with related position information.
         :rtype: QuerySet
         """
-        return self.parent.all().select_related("position")
+        return self.get_ancestors().select_related("position")
 
     def __str__(self) -> str:
         return self.full_name
@@ -89,3 +126,94 @@ class Employee(MPTTModel):
     class Meta:
         verbose_name = _("Employee")
         verbose_name_plural = _("Employees")
+        indexes = [
+            # Subtrees are lft ranges within a tree, and the tree API pages
+            # through the direct reports of a manager in lft order.
+            models.Index(fields=["tree_id", "lft"], name="employee_tree_lft_idx"),
+            models.Index(fields=["parent", "lft"], name="employee_parent_lft_idx"),
+            # One index per sort option of the list, ending with the id that
+            # breaks ties, so every page is an index range scan. Hire date
+            # filters use employee_hire_date_idx as well.
+            models.Index(fields=["full_name", "id"], name="employee_full_name_idx"),
+            models.Index(
+                fields=["position_name", "id"], name="employee_position_name_idx"
+            ),
+            models.Index(fields=["hire_date", "id"], name="employee_hire_date_idx"),
+            models.Index(fields=["email", "id"], name="employee_email_idx"),
+            models.Index(
+                fields=["manager_name", "id"], name="employee_manager_name_idx"
+            ),
+            GinIndex(fields=["search_document"], name="employee_search_doc_gin"),
+            GinIndex(
+                fields=["search_text"],
+                name="employee_search_text_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+
+class Job(models.Model):
+    """
+    A bulk operation on employees run by a Celery worker (see
+    ``apps.employee.service.jobs``), with its progress, the checkpoint it
+    resumes from when retried and its outcome.
+    """
+
+    class Kind(models.TextChoices):
+        SEED = "seed", _("Seed employees")
+        WIPE = "wipe", _("Delete employees")
+        IMPORT = "import", _("Import employees")
+        REPAIR_TREE = "repair_tree", _("Repair the org tree")
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        SUCCEEDED = "succeeded", _("Succeeded")
+        FAILED = "failed", _("Failed")
+        CANCELLED = "cancelled", _("Cancelled")
+
+    id = models.UUIDField(
+        _("Job id"),
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+    )
+    kind = models.CharField(_("Kind"), max_length=20, choices=Kind.choices)
+    status = models.CharField(
+        _("Status"), max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    params = models.JSONField(_("Parameters"), default=dict)
+    # What the job needs to resume where it stopped, saved after every chunk.
+    checkpoint = models.JSONField(_("Checkpoint"), default=dict)
+    done = models.PositiveBigIntegerField(_("Done"), default=0)
+    total = models.PositiveBigIntegerField(_("Total"), null=True, blank=True)
+    result = models.JSONField(_("Result"), null=True, blank=True)
+    error = models.TextField(_("Error"), blank=True, default="")
+    cancel_requested = models.BooleanField(_("Cancel requested"), default=False)
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name=_("Created by"),
+    )
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    started_at = models.DateTimeField(_("Started at"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("Finished at"), null=True, blank=True)
+
+    ACTIVE_STATUSES = (Status.PENDING, Status.RUNNING)
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = _("Job")
+        verbose_name_plural = _("Jobs")
+        ordering = ["-created_at"]
+        indexes = [
+            # Looking up the active job of a kind before submitting another.
+            models.Index(fields=["kind", "status"], name="job_kind_status_idx"),
+        ]
@@ -0,0 +1,148 @@
+import io
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Type
+
+from django.db import connections, models, router, transaction
+
+from apps.employee.service.caching import bump_generation
+
+
+class BulkInsertService:
+    @staticmethod
+    def _supports_copy(model: Type[models.Model]) -> bool:
+        """
+        Check whether rows of the given model can be written with Postgres COPY.
+
+        Args:
+            model: The model class the rows belong to.
+
+        Returns:
+            bool: True if the model's database is PostgreSQL.
+        """
+        connection = connections[router.db_for_write(model)]
+        return connection.vendor == "postgresql"
+
+    @staticmethod
+    def _batched(objs: Iterable[models.Model], batch_size: int) -> Iterator[List]:
+        """
+        Split an iterable of objects into lists of at most ``batch_size`` items.
+
+        Args:
+            objs: The objects to split.
+            batch_size: The maximum number of objects per batch.
+
+        Returns:
+            Iterator[List]: The batches.
+        """
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _copy_value(value) -> str:
+        """
+        Encode a single value for the Postgres COPY text format.
+        """
+        if value is None:
+            return "\\N"
+        return (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+
+    @staticmethod
+    def _copy_batch(model: Type[models.Model], batch: List[models.Model]) -> None:
+        """
+        Write a batch of unsaved model instances with a single COPY statement.
+
+        Values are prepared by the model fields exactly as ``bulk_create`` would,
+        so defaults and ``auto_now`` fields behave the same way.
+
+        Args:
+            model: The model class of the instances.
+            batch: The instances to write.
+
+        Returns:
+            None
+        """
+        using = router.db_for_write(model)
+        connection = connections[using]
+        fields = model._meta.concrete_fields
+        buffer = io.StringIO()
+        for obj in batch:
+            buffer.write(
+                "\t".join(
+                    BulkInsertService._copy_value(
+                        field.get_db_prep_save(
+                            field.pre_save(obj, add=True), connection=connection
+                        )
+                    )
+                    for field in fields
+                )
+            )
+            buffer.write("\n")
+        buffer.seek(0)
+
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN",
+                buffer,
+            )
+
+    @staticmethod
+    def _bulk_insert(
+        model: Type[models.Model],
+        objs: Iterable[models.Model],
+        batch_size: int = 5000,
+        use_copy: bool = False,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ) -> int:
+        """
+        Insert unsaved model instances in batches, bypassing ``save()`` and signals.
+
+        Cached values keyed on the model's generation are invalidated afterwards.
+
+        Every batch is committed in its own transaction so memory and lock time
+        stay bounded no matter how many rows are written.
+
+        Args:
+            model: The model class of the instances.
+            objs: The instances to insert; may be a generator.
+            batch_size: The number of rows written per statement.
+            use_copy: Use Postgres COPY instead of multi-row INSERT when available.
+            progress: Called after every batch with the total rows written and the
+                elapsed time in seconds.
+
+        Returns:
+            int: The number of inserted rows.
+        """
+        use_copy = use_copy and BulkInsertService._supports_copy(model)
+        using = router.db_for_write(model)
+        started = time.monotonic()
+        written = 0
+
+        for batch in BulkInsertService._batched(objs, batch_size):
+            with transaction.atomic(using=using):
+                if use_copy:
+                    BulkInsertService._copy_batch(model, batch)
+                else:
+                    model._default_manager.db_manager(using).bulk_create(
+                        batch, batch_size=batch_size
+                    )
+            written += len(batch)
+            if progress is not None:
+                progress(written, time.monotonic() - started)
+
+        if written:
+            bump_generation(model._meta.model_name)
+        return written
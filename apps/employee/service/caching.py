@@ -0,0 +1,64 @@
+from typing import Tuple
+
+from django.core.cache import cache
+
+
+GENERATION_KEY = "generation:{name}"
+
+
+def get_generation(name: str) -> int:
+    """
+    Return the current generation of a group of cached values.
+
+    Cache keys that embed the generation are invalidated all at once by
+    ``bump_generation``, without having to find and delete them.
+
+    Args:
+        name: The name of the group, usually a model name like ``"employee"``.
+
+    Returns:
+        int: The current generation.
+    """
+    key = GENERATION_KEY.format(name=name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, 1, timeout=None)
+        generation = cache.get(key, 1)
+    return generation
+
+
+def bump_generation(name: str) -> int:
+    """
+    Invalidate every cached value keyed on the generation of ``name``.
+
+    Args:
+        name: The name of the group, usually a model name like ``"employee"``.
+
+    Returns:
+        int: The new generation, which no other bump returns.
+    """
+    key = GENERATION_KEY.format(name=name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 2, timeout=None):
+            return 2
+        return cache.incr(key)
+
+
+def get_generations(*names: str) -> Tuple[int, ...]:
+    """
+    Return the current generations of several groups with one cache read.
+
+    Args:
+        names: The names of the groups.
+
+    Returns:
+        Tuple[int, ...]: Their generations, in the same order.
+    """
+    keys = [GENERATION_KEY.format(name=name) for name in names]
+    found = cache.get_many(keys)
+    return tuple(
+        found[key] if key in found else get_generation(name)
+        for name, key in zip(names, keys)
+    )
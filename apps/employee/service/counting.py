@@ -0,0 +1,127 @@
+import json
+import hashlib
+from typing import Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.core.paginator import Paginator
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+from apps.employee.service.caching import get_generation
+
+
+class ExactCount:
+    """
+    Count rows with ``COUNT(*)``.
+    """
+
+    def count(self, queryset: QuerySet) -> Tuple[int, bool]:
+        """
+        Count the rows of a queryset.
+
+        Args:
+            queryset: The queryset to count.
+
+        Returns:
+            Tuple[int, bool]: The count and whether it is an estimate.
+        """
+        return queryset.count(), False
+
+
+class CachedCount(ExactCount):
+    """
+    Count rows with ``COUNT(*)`` once per query and keep the result in the cache
+    until an employee or position is saved or deleted.
+    """
+
+    def __init__(self, timeout: int = 60 * 60) -> None:
+        self.timeout = timeout
+
+    def count(self, queryset: QuerySet) -> Tuple[int, bool]:
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(f"{sql}{params!r}".encode()).hexdigest()
+        key = "employee:count:{}:{}:{}".format(
+            get_generation("employee"), get_generation("position"), digest
+        )
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.timeout)
+        return count, False
+
+
+class EstimatedCount(ExactCount):
+    """
+    Read row counts from the PostgreSQL planner statistics.
+
+    The whole table is estimated from ``pg_class.reltuples`` and filtered
+    querysets from the row estimate of their plan. Estimates below
+    ``threshold`` are replaced by an exact count, which is cheap at that size.
+    Other databases always get an exact count.
+    """
+
+    def __init__(self, threshold: int = 100_000) -> None:
+        self.threshold = threshold
+
+    def _estimate(self, queryset: QuerySet) -> int:
+        connection = connections[queryset.db]
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+                return row[0] if row else -1
+
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+    def count(self, queryset: QuerySet) -> Tuple[int, bool]:
+        if connections[queryset.db].vendor != "postgresql":
+            return super().count(queryset)
+        estimate = self._estimate(queryset)
+        if estimate < self.threshold:
+            return super().count(queryset)
+        return estimate, True
+
+
+def get_count_strategy() -> ExactCount:
+    """
+    Build the count strategy selected by ``EMPLOYEE_COUNT_STRATEGY``.
+
+    Returns:
+        ExactCount: An ``ExactCount``, ``CachedCount`` or ``EstimatedCount``.
+    """
+    strategy = getattr(settings, "EMPLOYEE_COUNT_STRATEGY", "exact")
+    if strategy == "cached":
+        return CachedCount(getattr(settings, "EMPLOYEE_COUNT_CACHE_TIMEOUT", 60 * 60))
+    if strategy == "estimated":
+        return EstimatedCount(
+            getattr(settings, "EMPLOYEE_COUNT_ESTIMATE_THRESHOLD", 100_000)
+        )
+    return ExactCount()
+
+
+class CountingPaginator(Paginator):
+    """
+    A paginator that gets its total count from a count strategy.
+
+    ``count_is_estimate`` tells templates to render "page N of ~M".
+    """
+
+    def __init__(self, *args, count_strategy: ExactCount = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.count_strategy = count_strategy or get_count_strategy()
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self) -> int:
+        count, self.count_is_estimate = self.count_strategy.count(self.object_list)
+        return count
@@ -1,21 +1,101 @@
 from uuid import UUID
-from typing import List
-from datetime import datetime
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional
 
-from django.db.models import Q
-from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.core.paginator import Page
 from django.db.models.query import QuerySet
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import gettext_lazy as _
 
 from apps.employee.models import Employee
+from apps.employee.service.counting import CountingPaginator
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.pagination import KeysetPage, KeysetPaginator
+from apps.employee.service.positions import get_position_registry
+from apps.employee.service.tree import TreeService
+from apps.employee.service.treewrites import TreeWriteService
+from apps.employee.service.typeahead import get_typeahead_index
+
+
+# Sort options of the employee list and the indexed columns behind them.
+SORT_FIELDS = {
+    "full_name": "full_name",
+    "position": "position_name",
+    "hire_date": "hire_date",
+    "email": "email",
+    "manager": "manager_name",
+}
+
+
+# The columns the employee list displays. Position and manager names come from
+# their denormalized copies, so a page is read from the employee table alone.
+# ``updated_at`` keys the cached row fragments.
+LIST_FIELDS = (
+    "id",
+    "full_name",
+    "position_name",
+    "hire_date",
+    "email",
+    "manager_name",
+    "updated_at",
+)
+
+# The columns shown for each manager of the reporting chain.
+CHAIN_FIELDS = ("id", "full_name", "position_name", "level")
+
+# Direct reports listed on the detail page; the count covers all of them.
+MAX_DIRECT_REPORTS = 50
+
+
+class HireDateRange(NamedTuple):
+    """
+    A half-open range of hire dates, ``start <= hire_date < end``; either bound
+    may be None.
+    """
+
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+
+class OrgSummary(NamedTuple):
+    """
+    Where an employee sits in the org chart.
+
+    ``supervisors`` is the reporting chain from the top of the tree down to the
+    direct manager, and ``direct_reports`` the first ``MAX_DIRECT_REPORTS``
+    reports, as rows.
+    """
+
+    supervisors: List[tuple]
+    direct_reports: List[tuple]
+    direct_report_count: int
+    headcount: int
+    depth: int
+
+
+class TransferResult(NamedTuple):
+    """
+    The outcome of a bulk reassignment: how many employees got a new manager
+    and how many rows the renumbering pass rewrote.
+    """
+
+    moved: int
+    renumbered: int
 
 
 class EmployeeService:
     @staticmethod
     def _create_employee(employee) -> None:
         """
-        Create a new employee.
+        Create a new employee. Their place in the tree is computed by the next
+        batched renumbering of the tree (see ``TreeWriteService``).
 
         Parameters:
             employee (Employee): The employee object to create.
@@ -23,7 +103,21 @@ class EmployeeService:
         Returns:
             None
         """
-        employee.save()
+        TreeWriteService._insert(employee)
+
+    @staticmethod
+    def _update_employee(employee) -> None:
+        """
+        Save the changes of an employee, moving them in the tree when their
+        supervisor changed.
+
+        Parameters:
+            employee (Employee): The changed employee object.
+
+        Raises:
+            ValueError: If the new supervisor reports to the employee.
+        """
+        TreeWriteService._update(employee)
 
     @staticmethod
     def _get_employee_by_id(employee_id: UUID) -> Employee:
@@ -54,59 +148,311 @@ class EmployeeService:
         return Employee.objects.all()
 
     @staticmethod
-    def _get_supervisors(employee_id: UUID) -> List[Employee]:
+    def _filter_by_hire_date(
+        employees: QuerySet, hire_date_range: Optional[HireDateRange]
+    ) -> QuerySet:
+        """
+        Restricts employees to a range of hire dates.
+
+        The bounds are compared to the bare ``hire_date`` column, so the filter
+        is a range scan of its index and combines with any other filter or sort.
+
+        Args:
+            employees: The employees to filter.
+            hire_date_range: The range to keep, or None to keep everyone.
+
+        Returns:
+            QuerySet: The filtered employees.
+        """
+        if hire_date_range is None:
+            return employees
+        if hire_date_range.start is not None:
+            employees = employees.filter(hire_date__gte=hire_date_range.start)
+        if hire_date_range.end is not None:
+            employees = employees.filter(hire_date__lt=hire_date_range.end)
+        return employees
+
+    @staticmethod
+    def _as_rows(employees: QuerySet) -> QuerySet:
+        """
+        Projects employees onto the columns of the list.
+
+        Rows are named tuples of ``LIST_FIELDS`` read by a single query, instead
+        of model instances with every column and lazily loaded relations.
+
+        Args:
+            employees: The employees to project.
+
+        Returns:
+            QuerySet: A queryset of named tuples.
+        """
+        return employees.values_list(*LIST_FIELDS, named=True)
+
+    @staticmethod
+    def _get_supervisors(employee: Employee) -> QuerySet:
+        """
+        Get the reporting chain of an employee, from the top of the tree down to
+        the direct manager.
+
+        The ancestors of a node are the rows of its tree whose ``lft``/``rght``
+        interval encloses its own, so the chain is one range query on
+        ``(tree_id, lft)`` whatever the depth.
+
+        Args:
+            employee (Employee): The employee.
+
+        Returns:
+            QuerySet: Named tuples of ``CHAIN_FIELDS``, outermost first.
+        """
+        return (
+            Employee.objects.filter(
+                tree_id=employee.tree_id,
+                lft__lt=employee.lft,
+                rght__gt=employee.rght,
+            )
+            .order_by("lft")
+            .values_list(*CHAIN_FIELDS, named=True)
+        )
+
+    @staticmethod
+    def _get_org_summary(employee: Employee) -> OrgSummary:
         """
-        Get the supervisors of an employee.
+        Get the reporting chain, direct reports, headcount and depth of an
+        employee.
+
+        Headcount and depth come from the nested set values of the employee
+        itself: a subtree of ``n`` descendants spans ``2n + 2`` numbers. The
+        direct reports are only counted when there are more than are listed,
+        so this costs two or three queries however large the organisation.
 
         Args:
-            employee_id (UUID): The ID of the employee.
+            employee (Employee): The employee.
 
         Returns:
-            List[Employee]: A list of supervisor employees.
+            OrgSummary: The employee's place in the org chart.
         """
-        employee = EmployeeService._get_employee_by_id(employee_id)
-        supervisors = Employee.objects.filter(parent=employee).select_related(
-            "position"
+        direct_reports = list(
+            EmployeeService._as_rows(
+                Employee.objects.filter(parent_id=employee.pk).order_by("lft")
+            )[: MAX_DIRECT_REPORTS + 1]
+        )
+        if len(direct_reports) > MAX_DIRECT_REPORTS:
+            direct_report_count = Employee.objects.filter(parent_id=employee.pk).count()
+            direct_reports = direct_reports[:MAX_DIRECT_REPORTS]
+        else:
+            direct_report_count = len(direct_reports)
+        return OrgSummary(
+            supervisors=list(EmployeeService._get_supervisors(employee)),
+            direct_reports=direct_reports,
+            direct_report_count=direct_report_count,
+            headcount=(employee.rght - employee.lft - 1) // 2,
+            depth=employee.level,
         )
-        return supervisors
+
+    @staticmethod
+    def _transfer_reports(
+        manager_id: UUID,
+        new_manager_id: Optional[UUID],
+        include_manager: bool = False,
+    ) -> TransferResult:
+        """
+        Move the direct reports of a manager, with everyone below them, to a new
+        manager in one transaction.
+
+        The ``parent`` links are changed with a single UPDATE, which bypasses
+        MPTT's per-node bookkeeping, and the nested set columns of the affected
+        trees are then recomputed by one ``TreeService._renumber`` pass instead
+        of once per moved employee. Moved reports keep their relative order.
+
+        Args:
+            manager_id: The manager whose reports move.
+            new_manager_id: Their new manager; None makes every moved employee
+                the root of a tree of their own.
+            include_manager: Move the manager themselves (and so the whole
+                subtree) instead of their reports.
+
+        Returns:
+            TransferResult: The number of moved employees and renumbered rows.
+
+        Raises:
+            ValueError: If a manager doesn't exist or if the new manager is part
+                of the moved subtrees.
+        """
+        with transaction.atomic():
+            ids = (
+                [manager_id] if new_manager_id is None else [manager_id, new_manager_id]
+            )
+            managers = {
+                employee.pk: employee
+                for employee in Employee.objects.select_for_update()
+                .filter(pk__in=ids)
+                .only("id", "parent_id", "tree_id", "lft", "rght")
+            }
+            if len(managers) != len(set(ids)):
+                raise ValueError(_("Employee not found"))
+            manager = managers[manager_id]
+            new_manager = managers.get(new_manager_id)
+
+            if new_manager is not None and new_manager.tree_id == manager.tree_id:
+                # The new manager may not be below anyone who moves.
+                lowest = manager.lft if include_manager else manager.lft + 1
+                if lowest <= new_manager.lft <= manager.rght:
+                    raise ValueError(
+                        _("An employee can't report to someone below them.")
+                    )
+
+            tree_ids = {manager.tree_id}
+            if new_manager is not None:
+                tree_ids.add(new_manager.tree_id)
+            TreeService._lock_trees(tree_ids)
+
+            if include_manager:
+                moved = Employee.objects.filter(pk=manager_id)
+            else:
+                moved = Employee.objects.filter(parent_id=manager_id)
+            count = moved.exclude(parent_id=new_manager_id).update(
+                parent_id=new_manager_id
+            )
+            if not count:
+                return TransferResult(0, 0)
+            renumbered = TreeService._renumber(tree_ids)
+
+        bump_generation("employee")
+        bump_generation("tree")
+        return TransferResult(count, renumbered)
+
+    @staticmethod
+    def _get_search_queryset(search_query: str) -> QuerySet:
+        """
+        Builds a ranked queryset of the employees matching a search query.
+
+        On PostgreSQL the query is matched against the trigger-maintained
+        ``search_document`` (full-text, ``websearch_to_tsquery`` syntax) or, for
+        partial words and typos, against ``search_text`` by trigram word
+        similarity. Both predicates are served by GIN indexes. Other databases
+        fall back to case-insensitive substring matching.
+
+        Args:
+            search_query: The query string to search for employees.
+
+        Returns:
+            QuerySet: The matching employees, best matches first.
+        """
+        try:
+            hire_date = datetime.strptime(search_query, "%Y-%m-%d").date()
+        except ValueError:
+            hire_date = None
+
+        employees = Employee.objects.all()
+        if connections[employees.db].vendor == "postgresql":
+            query = SearchQuery(search_query, config="simple", search_type="websearch")
+            condition = Q(search_document=query) | Q(
+                search_text__trigram_word_similar=search_query
+            )
+            if hire_date is not None:
+                condition |= Q(hire_date=hire_date)
+            return (
+                employees.filter(condition)
+                .annotate(
+                    rank=SearchRank(F("search_document"), query)
+                    + TrigramWordSimilarity(search_query, "search_text")
+                )
+                .order_by("-rank", "id")
+            )
+
+        condition = (
+            Q(full_name__icontains=search_query)
+            | Q(email__icontains=search_query)
+            | Q(position_id__in=get_position_registry().matching(search_query))
+            | Q(parent__full_name__icontains=search_query)
+        )
+        if hire_date is not None:
+            condition |= Q(hire_date=hire_date)
+        return employees.filter(condition).order_by("full_name", "id")
+
+    @staticmethod
+    def _autocomplete_employees(query: str, limit: int = 10) -> List[dict]:
+        """
+        Find the best matches for a partial name or email, for type-ahead.
+
+        Matches come from the in-process type-ahead index; while this process is
+        still building it, they come from the search query instead.
+
+        Args:
+            query: What the user typed so far.
+            limit: The maximum number of matches (default: 10).
+
+        Returns:
+            List[dict]: The ``id``, ``full_name`` and ``email`` of each match.
+        """
+        index = get_typeahead_index()
+        if index is None:
+            return list(
+                EmployeeService._get_search_queryset(query).values(
+                    "id", "full_name", "email"
+                )[:limit]
+            )
+        return [
+            {"id": match.id, "full_name": match.full_name, "email": match.email}
+            for match in index.search(query, limit)
+        ]
 
     @staticmethod
     def _search_employees(
-        search_query: str, items_per_page: int = 15
-    ) -> List[Employee]:
+        search_query: str,
+        page_number: int = 1,
+        items_per_page: int = 15,
+        hire_date_range: Optional[HireDateRange] = None,
+    ) -> Page:
         """
         Search employees by the given query and paginate the results.
 
         Args:
             search_query: The query string to search for employees.
+            page_number: The page number of the results to retrieve (default: 1).
             items_per_page: The number of items per page (default: 15).
+            hire_date_range: Only search employees hired in this range.
 
         Returns:
-            A List object containing a subset of matching employees.
+            Page: A Page object containing a subset of matching employees.
         """
-        try:
-            search_date = datetime.strptime(search_query, "%Y-%m-%d")
-            employees = Employee.objects.filter(
-                Q(full_name__icontains=search_query)
-                | Q(email__icontains=search_query)
-                | Q(position__icontains=search_query)
-                | Q(parent__full_name__icontains=search_query)
-                | Q(
-                    hire_date__date__gte=search_date
-                )  # Поиск даты больше или равной указанной
-                | Q(
-                    hire_date__date__lte=search_date
-                )  # Поиск даты меньше или равной указанной
+        employees = EmployeeService._as_rows(
+            EmployeeService._filter_by_hire_date(
+                EmployeeService._get_search_queryset(search_query), hire_date_range
             )
-        except ValueError:
-            employees = Employee.objects.none()
-        paginator = Paginator(employees, items_per_page)
+        )
+        paginator = CountingPaginator(employees, items_per_page)
+        return paginator.get_page(page_number)
 
-        try:
-            page = paginator.get_page(1)
-        except EmptyPage:
-            return None
-        return page
+    @staticmethod
+    def _get_export_rows(
+        sort_by: str,
+        search_query: str = "",
+        hire_date_range: Optional[HireDateRange] = None,
+    ) -> QuerySet:
+        """
+        Retrieves every employee of the list, in the order the list shows them.
+
+        Search results keep their ranking and other lists are sorted by
+        ``sort_by``, as on the list pages. Rows come from the denormalized
+        columns of the employee table, without joins, and the ``(column, id)``
+        sort is served by the same indexes as the list.
+
+        Args:
+            sort_by: The field to sort the employees by, one of the keys of ``SORT_FIELDS``.
+            search_query: Only include employees matching this query.
+            hire_date_range: Only include employees hired in this range.
+
+        Returns:
+            QuerySet: Named tuples of ``LIST_FIELDS``.
+        """
+        if search_query:
+            employees = EmployeeService._filter_by_hire_date(
+                EmployeeService._get_search_queryset(search_query), hire_date_range
+            )
+        else:
+            employees = EmployeeService._get_sorted_employees(sort_by, hire_date_range)
+        return EmployeeService._as_rows(employees)
 
     @staticmethod
     def _delete_employee(self, employee_id: UUID) -> bool:
@@ -127,47 +473,102 @@ class EmployeeService:
             return False
 
     @staticmethod
-    def _get_sorted_employees(sort_by: str) -> QuerySet:
+    def _get_sorted_employees(
+        sort_by: str, hire_date_range: Optional[HireDateRange] = None
+    ) -> QuerySet:
         """
         Retrieves a sorted list of employees based on the provided sort field.
 
         Args:
             sort_by: The field to sort the employees by. Must be one of the following: "full_name",
-                    "position", "hire_date", "email", "supervisor".
+                    "position", "hire_date", "email", "manager".
+            hire_date_range: Only include employees hired in this range.
 
         Returns:
             QuerySet: A sorted QuerySet of Employee objects.
         """
-        valid_sort_fields = [
-            "full_name",
-            "position",
-            "hire_date",
-            "email",
-            "parent",
-        ]
-        if sort_by not in valid_sort_fields:
-            sort_by = "parent"
+        sort_by = EmployeeService._get_sort_field(sort_by)
+        employees = EmployeeService._filter_by_hire_date(
+            Employee.objects.all(), hire_date_range
+        )
 
-        return Employee.objects.order_by(sort_by)
+        return employees.order_by(sort_by, "id")
+
+    @staticmethod
+    def _get_sort_field(sort_by: str) -> str:
+        """
+        Maps a sort option of the list to the column it sorts by.
+
+        Positions and managers are sorted by their names, which are copied into
+        indexed columns of the employee table by a database trigger.
+
+        Args:
+            sort_by: The requested sort option.
+
+        Returns:
+            str: The column to sort by; the full name for unknown options.
+        """
+        return SORT_FIELDS.get(sort_by, "full_name")
+
+    @staticmethod
+    def _get_keyset_page(
+        sort_by: str,
+        cursor: Optional[str],
+        items_per_page: int,
+        hire_date_range: Optional[HireDateRange] = None,
+    ) -> KeysetPage:
+        """
+        Retrieves a page of employees using keyset pagination.
+
+        The page is located by the opaque ``cursor`` of a neighbouring page instead
+        of an offset, and no total count is computed, so every page costs the same
+        however deep it is.
+
+        Args:
+            sort_by: The field to sort the employees by.
+            cursor: The ``next_cursor`` or ``previous_cursor`` of another page, or
+                None for the first page.
+            items_per_page: The number of items to display per page.
+            hire_date_range: Only include employees hired in this range.
+
+        Returns:
+            KeysetPage: The requested page.
+        """
+        paginator = KeysetPaginator(
+            EmployeeService._as_rows(
+                EmployeeService._filter_by_hire_date(
+                    Employee.objects.all(), hire_date_range
+                )
+            ),
+            EmployeeService._get_sort_field(sort_by),
+            items_per_page,
+        )
+        return paginator.get_page(cursor)
 
     @staticmethod
     def _get_paginated_employees(
-        self, sort_by: str, page_number: int, items_per_page: int
+        sort_by: str,
+        page_number: int,
+        items_per_page: int,
+        hire_date_range: Optional[HireDateRange] = None,
     ) -> List:
         """
         Retrieves a paginated list of employees based on the given sorting criteria.
 
         Args:
-            sort_by: The field to sort the employees by. Can be one of 'name', 'age', or 'salary'.
+            sort_by: The field to sort the employees by, one of the keys of ``SORT_FIELDS``.
             page_number: The page number of the results to retrieve.
             items_per_page: The number of items to display per page.
+            hire_date_range: Only include employees hired in this range.
 
         Returns:
             Page: A Page object containing the requested employees.
         """
-        employees = self._get_sorted_employees(sort_by)
+        employees = EmployeeService._as_rows(
+            EmployeeService._get_sorted_employees(sort_by, hire_date_range)
+        )
 
-        paginator = Paginator(employees, items_per_page)
+        paginator = CountingPaginator(employees, items_per_page)
         page = paginator.get_page(page_number)
 
         return page
@@ -0,0 +1,192 @@
+import bz2
+import gzip
+import json
+import lzma
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Union
+
+from django.core import serializers
+from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.translation import gettext_lazy as _
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+
+FIXTURE_FORMATS = ("json", "jsonl")
+
+
+def _open_zstd(path, mode):
+    if zstandard is None:
+        raise ValueError(
+            _("Install the 'zstandard' package to read or write .zst fixtures.")
+        )
+    return zstandard.open(path, mode, encoding="utf-8")
+
+
+COMPRESSION_OPENERS = {
+    ".gz": lambda path, mode: gzip.open(path, mode, encoding="utf-8"),
+    ".bz2": lambda path, mode: bz2.open(path, mode, encoding="utf-8"),
+    ".xz": lambda path, mode: lzma.open(path, mode, encoding="utf-8"),
+    ".lzma": lambda path, mode: lzma.open(path, mode, encoding="utf-8"),
+    ".zst": _open_zstd,
+}
+
+
+def fixture_format(path: Union[str, Path]) -> str:
+    """
+    Determine the serialization format of a fixture from its file name.
+
+    ``employees.jsonl.gz`` is a gzip compressed JSON Lines fixture, ``employees.json``
+    a plain JSON one.
+
+    Args:
+        path: The fixture path.
+
+    Returns:
+        str: ``"json"`` or ``"jsonl"``.
+
+    Raises:
+        ValueError: If the extension is not a supported fixture format.
+    """
+    suffixes = Path(path).suffixes
+    if suffixes and suffixes[-1] in COMPRESSION_OPENERS:
+        suffixes = suffixes[:-1]
+    fmt = suffixes[-1].lstrip(".") if suffixes else ""
+    if fmt not in FIXTURE_FORMATS:
+        raise ValueError(
+            _("Unsupported fixture format: %(path)s") % {"path": str(path)}
+        )
+    return fmt
+
+
+def open_fixture(path: Union[str, Path], mode: str = "rt") -> IO[str]:
+    """
+    Open a fixture as a text stream, transparently (de)compressing it based on
+    the file extension.
+
+    Args:
+        path: The fixture path.
+        mode: ``"rt"`` to read or ``"wt"`` to write.
+
+    Returns:
+        IO[str]: The text stream.
+    """
+    opener = COMPRESSION_OPENERS.get(Path(path).suffix)
+    if opener is None:
+        return open(path, mode, encoding="utf-8")
+    return opener(path, mode)
+
+
+def _iter_json_array(stream: IO[str], chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Yield the items of a JSON array one at a time without loading the whole
+    document into memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    exhausted = False
+    started = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            if buffer[position] == "," and not started:
+                break
+            position += 1
+        if position < len(buffer):
+            char = buffer[position]
+            if not started:
+                if char != "[":
+                    raise ValueError(_("A JSON fixture must contain an array."))
+                started = True
+                position += 1
+                continue
+            if char == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            else:
+                yield item
+                continue
+        elif exhausted:
+            raise ValueError(_("Unexpected end of JSON fixture."))
+
+        chunk = stream.read(chunk_size)
+        exhausted = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def read_fixture(path: Union[str, Path]) -> Iterator[dict]:
+    """
+    Stream the records of a JSON or JSON Lines fixture, optionally compressed.
+
+    Args:
+        path: The fixture path.
+
+    Returns:
+        Iterator[dict]: The serialized records in file order.
+    """
+    fmt = fixture_format(path)
+    with open_fixture(path, "rt") as stream:
+        if fmt == "jsonl":
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(stream)
+
+
+class FixtureWriter:
+    """
+    Write a Django fixture one record at a time.
+
+    Records are serialized compactly as soon as they are written, so memory use
+    doesn't grow with the size of the fixture. Both formats, optionally gzip,
+    bz2 or xz compressed, can be loaded with ``manage.py loaddata``.
+    """
+
+    def __init__(self, path: Union[str, Path], fmt: Optional[str] = None) -> None:
+        self.format = fmt or fixture_format(path)
+        self.stream = open_fixture(path, "wt")
+        self.count = 0
+        if self.format == "json":
+            self.stream.write("[")
+
+    def write(self, record: dict) -> None:
+        """
+        Write a single serialized record (``{"model": ..., "pk": ..., "fields": ...}``).
+        """
+        data = json.dumps(record, cls=DjangoJSONEncoder, separators=(",", ":"))
+        if self.format == "json":
+            self.stream.write(",\n" if self.count else "\n")
+            self.stream.write(data)
+        else:
+            self.stream.write(data)
+            self.stream.write("\n")
+        self.count += 1
+
+    def write_objects(self, objs: Iterable[models.Model]) -> None:
+        """
+        Serialize and write model instances with all their concrete fields.
+        """
+        for record in serializers.serialize("python", objs):
+            self.write(record)
+
+    def close(self) -> None:
+        if self.format == "json":
+            self.stream.write("\n]\n")
+        self.stream.close()
+
+    def __enter__(self) -> "FixtureWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,266 @@
+import re
+import hashlib
+import random
+import uuid
+from datetime import date
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from faker import Faker
+from django.utils.translation import gettext_lazy as _
+
+
+# Faker output is generated in fixed-size chunks, each seeded from the dataset
+# seed and its own offset, so the data does not depend on the number of workers.
+PEOPLE_CHUNK_SIZE = 10_000
+
+
+class GeneratedEmployee(NamedTuple):
+    id: UUID
+    parent_id: Optional[UUID]
+    level: int
+    full_name: str
+    email: str
+    hire_date: date
+    position_name: str
+
+
+def parse_fan_out(spec: str) -> Callable[[random.Random], int]:
+    """
+    Parse a fan-out distribution specification.
+
+    Supported forms are ``fixed:N``, ``uniform:MIN-MAX`` and ``geometric:MEAN``.
+
+    Args:
+        spec: The distribution specification.
+
+    Returns:
+        Callable[[random.Random], int]: A function drawing a number of direct reports.
+
+    Raises:
+        ValueError: If the specification can't be parsed.
+    """
+    kind, _sep, value = spec.partition(":")
+    try:
+        if kind == "fixed":
+            count = int(value)
+            if count >= 1:
+                return lambda rng: count
+        elif kind == "uniform":
+            low, high = (int(part) for part in value.split("-"))
+            if 1 <= low <= high:
+                return lambda rng: rng.randint(low, high)
+        elif kind == "geometric":
+            mean = float(value)
+            if mean >= 1:
+                return lambda rng: 1 + int(rng.expovariate(1 / mean))
+    except ValueError:
+        pass
+    raise ValueError(_("Invalid fan-out distribution: %(spec)s") % {"spec": spec})
+
+
+def parse_position_mix(spec: str) -> Dict[str, float]:
+    """
+    Parse a position mix specification like ``Employee=60,Intern=10,QA=5``.
+
+    Args:
+        spec: Comma separated ``name=weight`` pairs.
+
+    Returns:
+        Dict[str, float]: The weight of every position name.
+
+    Raises:
+        ValueError: If the specification can't be parsed, an entry has no name or a
+            negative weight, or no position has a positive weight.
+    """
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _sep, weight = item.rpartition("=")
+        try:
+            value = float(weight)
+        except ValueError:
+            value = None
+        if not name.strip() or value is None or not value >= 0:
+            raise ValueError(_("Invalid position mix entry: %(item)s") % {"item": item})
+        mix[name.strip()] = value
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError(
+            _("The position mix needs a positive weight: %(spec)s") % {"spec": spec}
+        )
+    return mix
+
+
+def _generate_people(
+    seed: int, start: int, end: int, hired_from: date, hired_to: date
+) -> List[Tuple[str, str, date]]:
+    """
+    Generate names, emails and hire dates for employees ``start`` to ``end``.
+
+    Runs in worker processes, so it must not touch the database.
+    """
+    fake = Faker()
+    fake.seed_instance(seed * 1_000_003 + start)
+    people = []
+    for index in range(start, end):
+        first_name = re.sub(r"[^a-zA-Z]", "", fake.first_name())
+        last_name = re.sub(r"[^a-zA-Z]", "", fake.last_name())
+        full_name = f"{first_name} {last_name}"[:50]
+        email = f"{first_name}.{last_name}.{index}@{fake.free_email_domain()}".lower()
+        hire_date = fake.date_between_dates(hired_from, hired_to)
+        people.append((full_name, email, hire_date))
+    return people
+
+
+class OrgGenerator:
+    """
+    Deterministic synthetic organisation generator.
+
+    The same arguments always produce the same employees, ids and hierarchy,
+    regardless of the number of worker processes used to run Faker.
+    """
+
+    def __init__(
+        self,
+        employees: int,
+        seed: int = 0,
+        depth: int = 6,
+        fan_out: str = "uniform:2-8",
+        position_mix: Optional[Dict[str, float]] = None,
+        root_position: str = "CEO",
+        hired_from: date = date(2019, 1, 1),
+        hired_to: date = date(2023, 12, 31),
+        workers: int = 1,
+    ) -> None:
+        if employees < 1:
+            raise ValueError(_("At least one employee is required."))
+        if depth < 1 or (depth == 1 and employees > 1):
+            raise ValueError(_("The depth is too small for the number of employees."))
+        self.employees = employees
+        self.seed = seed
+        self.depth = depth
+        self.draw_fan_out = parse_fan_out(fan_out)
+        self.position_mix = position_mix or {"Employee": 1.0}
+        self.root_position = root_position
+        self.hired_from = hired_from
+        self.hired_to = hired_to
+        self.workers = max(1, workers)
+        self.digest = hashlib.sha256()
+        self._hierarchy: Optional[List[Tuple[UUID, Optional[UUID]]]] = None
+        self._levels: List[int] = []
+
+    def _build_structure(
+        self, rng: random.Random
+    ) -> Tuple[List[Optional[int]], List[int]]:
+        """
+        Assign every employee index a parent index, breadth first.
+
+        Each manager draws its number of reports from the fan-out distribution.
+        When every node above the target depth has been used, they are visited
+        again and get additional reports until the head count is reached.
+
+        Returns:
+            Tuple[List[Optional[int]], List[int]]: The parent index and level of
+            every employee.
+        """
+        parents: List[Optional[int]] = [None]
+        levels = [0]
+        queue = deque([0])
+        while len(parents) < self.employees:
+            if not queue:
+                queue.extend(
+                    index
+                    for index, level in enumerate(levels)
+                    if level < self.depth - 1
+                )
+            manager = queue.popleft()
+            reports = min(self.draw_fan_out(rng), self.employees - len(parents))
+            for _report in range(reports):
+                parents.append(manager)
+                levels.append(levels[manager] + 1)
+                if levels[manager] + 1 < self.depth - 1:
+                    queue.append(len(parents) - 1)
+        return parents, levels
+
+    def _people(self) -> Iterator[Tuple[str, str, date]]:
+        """
+        Yield generated people in employee index order, using a process pool
+        when more than one worker is configured.
+        """
+        starts = range(0, self.employees, PEOPLE_CHUNK_SIZE)
+        args = [
+            (
+                self.seed,
+                start,
+                min(start + PEOPLE_CHUNK_SIZE, self.employees),
+                self.hired_from,
+                self.hired_to,
+            )
+            for start in starts
+        ]
+        if self.workers == 1 or len(args) == 1:
+            for chunk_args in args:
+                yield from _generate_people(*chunk_args)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in executor.map(_generate_people, *zip(*args)):
+                yield from chunk
+
+    def hierarchy(self) -> List[Tuple[UUID, Optional[UUID]]]:
+        """
+        Build the reporting structure without generating any personal data.
+
+        Returns:
+            List[Tuple[UUID, Optional[UUID]]]: ``(id, parent_id)`` pairs in breadth
+            first order.
+        """
+        if self._hierarchy is None:
+            rng = random.Random(self.seed)
+            parents, self._levels = self._build_structure(rng)
+            ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _id in parents]
+            self._hierarchy = [
+                (ids[index], ids[parent] if parent is not None else None)
+                for index, parent in enumerate(parents)
+            ]
+        return self._hierarchy
+
+    def generate(self) -> Iterator[GeneratedEmployee]:
+        """
+        Generate the organisation, managers before their reports.
+
+        Returns:
+            Iterator[GeneratedEmployee]: The generated employees in breadth first order.
+        """
+        hierarchy = self.hierarchy()
+        rng = random.Random(f"{self.seed}:positions")
+        names = list(self.position_mix)
+        weights = list(self.position_mix.values())
+        self.digest = hashlib.sha256()
+
+        for index, person in enumerate(self._people()):
+            if index == 0:
+                position_name = self.root_position
+            else:
+                position_name = rng.choices(names, weights)[0]
+            employee_id, parent_id = hierarchy[index]
+            employee = GeneratedEmployee(
+                id=employee_id,
+                parent_id=parent_id,
+                level=self._levels[index],
+                full_name=person[0],
+                email=person[1],
+                hire_date=person[2],
+                position_name=position_name,
+            )
+            self.digest.update(repr(tuple(employee)).encode())
+            yield employee
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        The SHA-256 digest of everything generated so far, used to check that two
+        runs produced identical datasets.
+        """
+        return self.digest.hexdigest()
@@ -0,0 +1,535 @@
+import csv
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Union
+
+from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.bulk import BulkInsertService
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.fixtures import (
+    COMPRESSION_OPENERS,
+    open_fixture,
+    read_fixture,
+)
+from apps.employee.service.positions import (
+    get_position_registry,
+    invalidate_position_registry,
+)
+from apps.employee.service.tree import TreeService
+from apps.employee.service.typeahead import invalidate_typeahead_index
+
+
+# Fields that are validated in batches (foreign keys) or computed after the load
+# (nested set columns), and are therefore skipped by the per-row validation.
+DEFERRED_FIELDS = ["parent", "position", "lft", "rght", "tree_id", "level"]
+EMPLOYEE_FIELDS = ["full_name", "email", "hire_date", "position", "parent"]
+REQUIRED_CSV_COLUMNS = ["full_name", "email", "hire_date"]
+EMAIL_NAMESPACE = uuid.UUID("0a3c2d0e-6a3e-4a53-9a55-5bd0b3f1a7c4")
+
+
+class ImportIssue(NamedTuple):
+    row: int
+    pk: str
+    message: str
+
+
+class ImportResult(NamedTuple):
+    rows: int
+    created: int
+    updated: int
+    errors: List[ImportIssue]
+    elapsed: float
+
+
+def read_csv(path: Union[str, Path]) -> Iterator[dict]:
+    """
+    Stream an HR export CSV as fixture style records.
+
+    The ``full_name``, ``email`` and ``hire_date`` columns are required; ``id``,
+    ``position`` (a position name), ``parent`` (the manager's id) and
+    ``show_supervisors`` are optional. Rows without an id get one derived from
+    the email, so re-importing the same export updates the same employees.
+
+    Raises:
+        ValueError: If a required column is missing.
+    """
+    with open_fixture(path, "rt") as stream:
+        reader = csv.DictReader(stream)
+        missing = [
+            column
+            for column in REQUIRED_CSV_COLUMNS
+            if column not in (reader.fieldnames or [])
+        ]
+        if missing:
+            raise ValueError(
+                _("The CSV file has no %(columns)s column.")
+                % {"columns": ", ".join(missing)}
+            )
+        for row in reader:
+            # Short rows leave the missing cells None; such rows are rejected
+            # when they are validated.
+            pk = row.get("id")
+            if not pk and row["email"]:
+                pk = str(uuid.uuid5(EMAIL_NAMESPACE, row["email"]))
+            fields = {
+                "full_name": row["full_name"],
+                "email": row["email"],
+                "hire_date": row["hire_date"],
+                "position_name": row.get("position") or None,
+                "parent": row.get("parent") or None,
+            }
+            if row.get("show_supervisors"):
+                fields["show_supervisors"] = row["show_supervisors"].lower() in (
+                    "1",
+                    "true",
+                    "yes",
+                )
+            yield {"model": "employee.employee", "pk": pk, "fields": fields}
+
+
+def read_records(path: Union[str, Path]) -> Iterator[dict]:
+    """
+    Stream records from a CSV, JSON or JSON Lines file, optionally compressed.
+    """
+    suffixes = Path(path).suffixes
+    if suffixes and suffixes[-1] in COMPRESSION_OPENERS:
+        suffixes = suffixes[:-1]
+    if suffixes and suffixes[-1] == ".csv":
+        return read_csv(path)
+    return read_fixture(path)
+
+
+class ImportCheckpoint:
+    """
+    Progress of an import, saved after every committed batch so an interrupted
+    import can resume where it stopped.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]], source: str) -> None:
+        self.path = Path(path) if path else None
+        self.source = source
+        self.rows = 0
+        self.pending_parents: Dict[str, str] = {}
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        state = json.loads(self.path.read_text())
+        if state["source"] != self.source:
+            raise ValueError(
+                _("The checkpoint %(path)s belongs to another import.")
+                % {"path": str(self.path)}
+            )
+        self.rows = state["rows"]
+        self.pending_parents = state["pending_parents"]
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps(
+                {
+                    "source": self.source,
+                    "rows": self.rows,
+                    "pending_parents": self.pending_parents,
+                }
+            )
+        )
+        temporary.replace(self.path)
+
+    def clear(self) -> None:
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+
+
+class EmployeeImporter:
+    """
+    Stream employees and positions into the database in validated batches.
+
+    Rows are inserted without MPTT bookkeeping (new employees get placeholder
+    nested set values) and the tree is renumbered once after the last batch.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 5000,
+        use_copy: bool = False,
+        checkpoint: Optional[Union[str, Path]] = None,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.checkpoint_path = checkpoint
+        self.progress = progress
+        self.created = 0
+        self.updated = 0
+        self.errors: List[ImportIssue] = []
+        self.position_ids = set()
+        self.position_names: Dict[str, uuid.UUID] = {}
+        self.unplaceable: Dict[uuid.UUID, str] = {}
+
+    def _import(self, path: Union[str, Path], resume: bool = False) -> ImportResult:
+        """
+        Import the given file.
+
+        Args:
+            path: A CSV, JSON or JSON Lines file, optionally compressed.
+            resume: Continue from the checkpoint of an interrupted import.
+
+        Returns:
+            ImportResult: Row counts, validation errors and elapsed time.
+        """
+        started = time.monotonic()
+        checkpoint = self._get_checkpoint(str(Path(path).resolve()))
+        if resume:
+            checkpoint.load()
+        else:
+            checkpoint.clear()
+
+        self.position_names = get_position_registry().ids()
+        self.position_ids = set(self.position_names.values())
+        self._check_managers(path)
+
+        rows = 0
+        batch = []
+        with Employee.objects.disable_mptt_updates():
+            for record in read_records(path):
+                rows += 1
+                if rows <= checkpoint.rows:
+                    continue
+                batch.append((rows, record))
+                if len(batch) >= self.batch_size:
+                    self._commit_batch(batch, checkpoint, rows, started)
+                    batch = []
+            if batch:
+                self._commit_batch(batch, checkpoint, rows, started)
+
+            self._link_pending_parents(checkpoint)
+            try:
+                TreeService._renumber()
+            except ValueError:
+                # An accepted row relied on the new manager of a row that was
+                # rejected when it was validated.
+                self._detach_unplaceable()
+                TreeService._renumber()
+
+        bump_generation("employee")
+        bump_generation("position")
+        bump_generation("tree")
+        invalidate_position_registry()
+        invalidate_typeahead_index()
+        checkpoint.clear()
+        return ImportResult(
+            rows, self.created, self.updated, self.errors, time.monotonic() - started
+        )
+
+    def _get_checkpoint(self, source: str) -> ImportCheckpoint:
+        """
+        Return where the progress of importing ``source`` is saved.
+        """
+        return ImportCheckpoint(self.checkpoint_path, source)
+
+    def _reject(self, row: int, record: Any, error: Union[Exception, str]) -> None:
+        """
+        Report a record that is not imported.
+        """
+        message = (
+            "; ".join(error.messages)
+            if isinstance(error, ValidationError)
+            else str(error)
+        )
+        pk = record.get("pk") if isinstance(record, dict) else None
+        self.errors.append(ImportIssue(row, str(pk), message))
+
+    def _check_managers(self, path: Union[str, Path]) -> None:
+        """
+        Read the managers of the file ahead of the import and find the employees
+        that could not be placed in the tree, because they are on a reporting
+        cycle or their manager doesn't exist, so that they are rejected before
+        the first batch is committed.
+        """
+        managers = {}
+        for record in read_records(path):
+            try:
+                if record["model"] != "employee.employee":
+                    continue
+                fields = record["fields"]
+                managers[uuid.UUID(str(record["pk"]))] = (
+                    uuid.UUID(str(fields["parent"])) if fields.get("parent") else None
+                )
+            except (AttributeError, KeyError, TypeError, ValueError):
+                # Rejected with the reason when the record itself is imported.
+                continue
+        links = dict(
+            Employee.objects.values_list("id", "parent_id").iterator(chunk_size=10000)
+        )
+        self.unplaceable = self._find_unplaceable(links, managers)
+
+    @staticmethod
+    def _find_unplaceable(
+        links: Dict[uuid.UUID, Optional[uuid.UUID]],
+        managers: Dict[uuid.UUID, Optional[uuid.UUID]],
+    ) -> Dict[uuid.UUID, str]:
+        """
+        Find the manager changes that would leave employees unreachable from a root.
+
+        Dropping a change keeps the current manager of an existing employee and
+        leaves out a new one, whose reports are then dropped in turn.
+
+        Args:
+            links: The current manager of every employee.
+            managers: The managers to set; employees missing from ``links`` are new.
+
+        Returns:
+            Dict[uuid.UUID, str]: The employees of ``managers`` whose change must
+            be dropped, with the reason.
+        """
+        dropped = {}
+        while True:
+            parents = dict(links)
+            parents.update(
+                (node_id, parent_id)
+                for node_id, parent_id in managers.items()
+                if node_id not in dropped
+            )
+            placed = {}
+            found = {}
+            for node_id in managers:
+                if node_id in dropped:
+                    continue
+                path = []
+                on_path = set()
+                current = node_id
+                outcome = None
+                while outcome is None:
+                    if current is None:
+                        outcome = True
+                    elif current in placed:
+                        outcome = placed[current]
+                    elif current in on_path:
+                        cycle = path[path.index(current) :]
+                        for member in cycle:
+                            if member in managers and member not in dropped:
+                                found[member] = str(
+                                    _("The employee is part of a reporting cycle.")
+                                )
+                        outcome = False
+                    elif current not in parents:
+                        found[path[-1]] = str(
+                            _("Unknown manager %(id)s") % {"id": current}
+                        )
+                        outcome = False
+                    else:
+                        on_path.add(current)
+                        path.append(current)
+                        current = parents[current]
+                for member in path:
+                    placed[member] = outcome
+            if not found:
+                return dropped
+            dropped.update(found)
+
+    def _detach_unplaceable(self) -> None:
+        """
+        Make the employees that are not reachable from a root report to nobody.
+        """
+        links = dict(
+            Employee.objects.values_list("id", "parent_id").iterator(chunk_size=10000)
+        )
+        detached = self._find_unplaceable(dict.fromkeys(links), links)
+        with transaction.atomic():
+            Employee.objects.bulk_update(
+                [Employee(id=node_id, parent_id=None) for node_id in detached],
+                ["parent"],
+                batch_size=1000,
+            )
+        for node_id, message in detached.items():
+            self.errors.append(
+                ImportIssue(
+                    0,
+                    str(node_id),
+                    str(
+                        _("%(message)s The manager was removed.") % {"message": message}
+                    ),
+                )
+            )
+
+    def _commit_batch(
+        self, batch: list, checkpoint: ImportCheckpoint, rows: int, started: float
+    ) -> None:
+        positions = []
+        employees = []
+        for row, record in batch:
+            model = record.get("model") if isinstance(record, dict) else None
+            if model == "employee.position":
+                positions.append((row, record))
+            elif model == "employee.employee":
+                employees.append((row, record))
+            else:
+                self._reject(
+                    row, record, _("Unknown model %(model)s") % {"model": model}
+                )
+        with transaction.atomic():
+            self._import_positions(positions)
+            self._import_employees(employees, checkpoint)
+        if positions:
+            # The batch bypassed the Position signals; an import resumed in
+            # this process must not start from the old registry.
+            invalidate_position_registry()
+        checkpoint.rows = rows
+        checkpoint.save()
+        if self.progress is not None:
+            self.progress(rows, time.monotonic() - started)
+
+    def _import_positions(self, records: list) -> None:
+        positions = []
+        for row, record in records:
+            try:
+                position = Position(
+                    id=uuid.UUID(str(record["pk"])),
+                    position_name=record["fields"]["position_name"],
+                )
+                position.clean_fields()
+            except (KeyError, TypeError, ValueError, ValidationError) as error:
+                self._reject(row, record, error)
+                continue
+            positions.append(position)
+        if not positions:
+            return
+
+        existing = set(
+            Position.objects.filter(
+                pk__in=[position.id for position in positions]
+            ).values_list("pk", flat=True)
+        )
+        Position.objects.bulk_create(
+            [position for position in positions if position.id not in existing]
+        )
+        Position.objects.bulk_update(
+            [position for position in positions if position.id in existing],
+            ["position_name"],
+        )
+        for position in positions:
+            self.position_ids.add(position.id)
+            self.position_names[position.position_name] = position.id
+
+    def _position_id(self, fields: dict) -> Optional[uuid.UUID]:
+        """
+        Resolve the position of a record, creating positions referenced by name
+        in CSV files.
+        """
+        if fields.get("position_name"):
+            name = fields["position_name"]
+            if name not in self.position_names:
+                position = Position.objects.create(position_name=name)
+                self.position_ids.add(position.id)
+                self.position_names[name] = position.id
+            return self.position_names[name]
+        if fields.get("position"):
+            position_id = uuid.UUID(str(fields["position"]))
+            if position_id not in self.position_ids:
+                raise ValidationError(
+                    _("Unknown position %(id)s") % {"id": position_id}
+                )
+            return position_id
+        return None
+
+    def _import_employees(self, records: list, checkpoint: ImportCheckpoint) -> None:
+        employees = []
+        for row, record in records:
+            try:
+                fields = record["fields"]
+                employee_id = uuid.UUID(str(record["pk"]))
+                if employee_id in self.unplaceable:
+                    raise ValidationError(self.unplaceable[employee_id])
+                employee = Employee(
+                    id=employee_id,
+                    full_name=fields["full_name"],
+                    email=fields["email"],
+                    hire_date=fields["hire_date"],
+                    show_supervisors=fields.get("show_supervisors", True),
+                    position_id=self._position_id(fields),
+                    parent_id=uuid.UUID(str(fields["parent"]))
+                    if fields.get("parent")
+                    else None,
+                    tree_id=0,
+                    lft=0,
+                    rght=0,
+                    level=0,
+                )
+                employee.clean_fields(exclude=DEFERRED_FIELDS)
+            except (
+                AttributeError,
+                KeyError,
+                TypeError,
+                ValueError,
+                ValidationError,
+            ) as error:
+                self._reject(row, record, error)
+                continue
+            employees.append(employee)
+
+        batch_ids = {employee.id for employee in employees}
+        parent_ids = {employee.parent_id for employee in employees} - batch_ids - {None}
+        known_parents = set(
+            Employee.objects.filter(pk__in=parent_ids).values_list("pk", flat=True)
+        )
+        for employee in employees:
+            if (
+                employee.parent_id is not None
+                and employee.parent_id not in batch_ids | known_parents
+            ):
+                # The manager comes later in the file; link it after the last batch.
+                checkpoint.pending_parents[str(employee.id)] = str(employee.parent_id)
+                employee.parent_id = None
+
+        existing = set(
+            Employee.objects.filter(pk__in=batch_ids).values_list("pk", flat=True)
+        )
+        created = [employee for employee in employees if employee.id not in existing]
+        updated = [employee for employee in employees if employee.id in existing]
+        BulkInsertService._bulk_insert(
+            Employee, created, batch_size=self.batch_size, use_copy=self.use_copy
+        )
+        Employee.objects.bulk_update(
+            updated, EMPLOYEE_FIELDS + ["show_supervisors"], batch_size=1000
+        )
+        self.created += len(created)
+        self.updated += len(updated)
+
+    def _link_pending_parents(self, checkpoint: ImportCheckpoint) -> None:
+        """
+        Set the managers that were referenced before they were imported.
+        """
+        pending = list(checkpoint.pending_parents.items())
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start : start + self.batch_size]
+            known = {
+                str(pk)
+                for pk in Employee.objects.filter(
+                    pk__in=[parent_id for _child_id, parent_id in chunk]
+                ).values_list("pk", flat=True)
+            }
+            links = []
+            for child_id, parent_id in chunk:
+                if parent_id in known:
+                    links.append(
+                        Employee(id=uuid.UUID(child_id), parent_id=uuid.UUID(parent_id))
+                    )
+                else:
+                    self.errors.append(
+                        ImportIssue(
+                            0,
+                            child_id,
+                            str(_("Unknown manager %(id)s") % {"id": parent_id}),
+                        )
+                    )
+            with transaction.atomic():
+                Employee.objects.bulk_update(links, ["parent"], batch_size=1000)
@@ -0,0 +1,283 @@
+import time
+from uuid import UUID
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Employee
+from apps.employee.service.tree import TreeService
+from apps.employee.service.treewrites import MAX_QUEUED_SECONDS, UNPLACED_LFT
+
+# The columns read for every node by the integrity scan, in ``(tree_id, lft)``
+# order.
+CHECK_FIELDS = ("id", "parent_id", "tree_id", "lft", "rght", "level")
+MAX_ISSUES_PER_TREE = 20
+
+
+class TreeIssue(NamedTuple):
+    tree_id: int
+    node_id: UUID
+    message: str
+
+
+class TreeCheck(NamedTuple):
+    """
+    The result of an integrity scan: the corrupted trees with (up to
+    ``MAX_ISSUES_PER_TREE`` of) their issues, the total number of issues found
+    in each, and the other trees their rows have parents in.
+    """
+
+    trees: int
+    rows: int
+    issues: Dict[int, List[TreeIssue]]
+    issue_counts: Dict[int, int]
+    linked_trees: Dict[int, Set[int]]
+    elapsed: float
+
+
+class TreeRepair(NamedTuple):
+    tree_ids: Tuple[int, ...]
+    rows: int
+    elapsed: float
+    error: Optional[str] = None
+
+
+class _OpenNode(NamedTuple):
+    id: UUID
+    rght: int
+
+
+class TreeIntegrityService:
+    """
+    Validate the nested set columns against the ``parent`` links and repair
+    only the trees that drifted.
+
+    The check is a single streaming scan of the table in ``(tree_id, lft)``
+    order, the order of the ``employee_tree_lft_idx`` index. Walking a tree in
+    that order visits it depth first, so a stack of the open nodes (as deep as
+    the tree) is enough to check that the ``lft``/``rght`` numbers are
+    consecutive, properly nested and consistent with ``parent`` and ``level``.
+    """
+
+    @staticmethod
+    def _check_tree(tree_id: int, rows: Iterable[Tuple]) -> Iterable[TreeIssue]:
+        """
+        Yield the issues of one tree, given its ``CHECK_FIELDS`` rows in ``lft``
+        order.
+        """
+        stack: List[_OpenNode] = []
+        counter = 0
+        roots = 0
+
+        def close(node: _OpenNode) -> Iterable[TreeIssue]:
+            nonlocal counter
+            if node.rght != counter + 1:
+                yield TreeIssue(
+                    tree_id,
+                    node.id,
+                    _("rght is %(rght)s, expected %(expected)s")
+                    % {"rght": node.rght, "expected": counter + 1},
+                )
+            counter = node.rght
+
+        for node_id, parent_id, _tree_id, lft, rght, level in rows:
+            while stack and stack[-1].rght < lft:
+                yield from close(stack.pop())
+
+            if lft != counter + 1:
+                yield TreeIssue(
+                    tree_id,
+                    node_id,
+                    _("lft is %(lft)s, expected %(expected)s")
+                    % {"lft": lft, "expected": counter + 1},
+                )
+            counter = lft
+
+            expected_parent = stack[-1].id if stack else None
+            if parent_id != expected_parent:
+                yield TreeIssue(
+                    tree_id,
+                    node_id,
+                    _("parent is %(parent)s but the node is nested under %(nested)s")
+                    % {"parent": parent_id, "nested": expected_parent},
+                )
+            if parent_id is None:
+                roots += 1
+                if roots > 1:
+                    yield TreeIssue(tree_id, node_id, _("second root in the tree"))
+            if level != len(stack):
+                yield TreeIssue(
+                    tree_id,
+                    node_id,
+                    _("level is %(level)s, expected %(expected)s")
+                    % {"level": level, "expected": len(stack)},
+                )
+
+            if rght <= lft:
+                yield TreeIssue(tree_id, node_id, _("rght is not larger than lft"))
+                counter = max(counter, rght)
+            elif stack and rght >= stack[-1].rght:
+                yield TreeIssue(tree_id, node_id, _("the node extends past its parent"))
+            else:
+                stack.append(_OpenNode(node_id, rght))
+
+        while stack:
+            yield from close(stack.pop())
+
+    @staticmethod
+    def _get_unplaced(tree_ids: Optional[Iterable[int]] = None) -> Iterable[TreeIssue]:
+        """
+        Yield an issue for every row without a place in its tree: inserted
+        without a tree (``tree_id=0``), or queued (``lft=0``, see
+        ``TreeWriteService``) longer than ``MAX_QUEUED_SECONDS`` or in a tree
+        that has no placed root. Rows that are still waiting for the flush of
+        their tree are skipped.
+        """
+        placed_root = Employee.objects.filter(
+            tree_id=OuterRef("tree_id"), parent__isnull=True
+        ).exclude(lft=UNPLACED_LFT)
+        pending = Q(
+            ~Q(tree_id=0),
+            Exists(placed_root),
+            updated_at__gte=timezone.now() - timedelta(seconds=MAX_QUEUED_SECONDS),
+        )
+        queryset = Employee.objects.filter(Q(tree_id=0) | Q(lft=UNPLACED_LFT))
+        if tree_ids is not None:
+            queryset = queryset.filter(tree_id__in=list(tree_ids))
+        for node_id, tree_id in (
+            queryset.exclude(pending).order_by("tree_id").values_list("id", "tree_id")
+        ):
+            yield TreeIssue(tree_id, node_id, _("the node is not placed in the tree"))
+
+    @staticmethod
+    def _check(tree_ids: Optional[Iterable[int]] = None) -> TreeCheck:
+        """
+        Validate the nested set invariants of every tree in one streaming scan.
+
+        Args:
+            tree_ids: Check only these trees; all trees when None.
+
+        Returns:
+            TreeCheck: The corrupted trees and their issues.
+        """
+        started = time.monotonic()
+        # Rows without a place are checked apart by ``_get_unplaced``.
+        queryset = Employee.objects.exclude(tree_id=0).exclude(lft=UNPLACED_LFT)
+        if tree_ids is not None:
+            queryset = queryset.filter(tree_id__in=list(tree_ids))
+        rows = (
+            queryset.order_by("tree_id", "lft")
+            .values_list(*CHECK_FIELDS)
+            .iterator(chunk_size=10000)
+        )
+
+        trees = rows_checked = 0
+        issues: Dict[int, List[TreeIssue]] = {}
+        issue_counts: Dict[int, int] = {}
+
+        def counted(tree_rows: Iterable[Tuple]) -> Iterable[Tuple]:
+            nonlocal rows_checked
+            for row in tree_rows:
+                rows_checked += 1
+                yield row
+
+        def found(issue: TreeIssue) -> None:
+            issue_counts[issue.tree_id] = issue_counts.get(issue.tree_id, 0) + 1
+            if issue_counts[issue.tree_id] <= MAX_ISSUES_PER_TREE:
+                issues.setdefault(issue.tree_id, []).append(issue)
+
+        for tree_id, tree_rows in groupby(rows, key=itemgetter(2)):
+            trees += 1
+            for issue in TreeIntegrityService._check_tree(tree_id, counted(tree_rows)):
+                found(issue)
+        for issue in TreeIntegrityService._get_unplaced(tree_ids):
+            rows_checked += 1
+            found(issue)
+
+        # Rows whose parent sits in another tree can only be renumbered together
+        # with that tree.
+        linked_trees: Dict[int, Set[int]] = {}
+        if issues:
+            for tree_id, parent_tree_id in (
+                Employee.objects.filter(tree_id__in=list(issues))
+                .exclude(parent__isnull=True)
+                .exclude(parent__tree_id=F("tree_id"))
+                .values_list("tree_id", "parent__tree_id")
+                .distinct()
+            ):
+                linked_trees.setdefault(tree_id, set()).add(parent_tree_id)
+
+        return TreeCheck(
+            trees,
+            rows_checked,
+            issues,
+            issue_counts,
+            linked_trees,
+            time.monotonic() - started,
+        )
+
+    @staticmethod
+    def _repair_groups(check: TreeCheck) -> List[Tuple[int, ...]]:
+        """
+        Group the corrupted trees with the trees their rows point into, so every
+        group can be renumbered on its own.
+        """
+        groups: Dict[int, Set[int]] = {}
+        for tree_id in check.issues:
+            group = {tree_id} | check.linked_trees.get(tree_id, set())
+            for other in list(group):
+                if other in groups:
+                    group |= groups[other]
+            for other in group:
+                groups[other] = group
+        unique = {id(group): group for group in groups.values()}
+        return sorted(tuple(sorted(group)) for group in unique.values())
+
+    @staticmethod
+    def _repair(
+        check: TreeCheck,
+        dry_run: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[TreeRepair]:
+        """
+        Recompute the nested set columns of the corrupted trees only.
+
+        Every group of trees is locked and renumbered from its ``parent`` links
+        in its own transaction, and only the rows whose position actually
+        drifted are written, unlike ``Employee.objects.rebuild()`` which
+        rewrites every row of every tree.
+
+        Args:
+            check: The result of ``_check``.
+            dry_run: Only count the rows that would be rewritten.
+            progress: Called after every group with the number of groups done
+                and the number of groups.
+
+        Returns:
+            List[TreeRepair]: What was (or would be) rewritten per group of
+                trees; groups whose ``parent`` links form a cycle are reported
+                with an ``error`` and left untouched.
+        """
+        repairs = []
+        groups = TreeIntegrityService._repair_groups(check)
+        for done, tree_ids in enumerate(groups, 1):
+            started = time.monotonic()
+            try:
+                with transaction.atomic():
+                    TreeService._lock_trees(tree_ids)
+                    rows = TreeService._renumber(tree_ids, dry_run=dry_run)
+            except ValueError as error:
+                repairs.append(
+                    TreeRepair(tree_ids, 0, time.monotonic() - started, str(error))
+                )
+            else:
+                repairs.append(TreeRepair(tree_ids, rows, time.monotonic() - started))
+            if progress is not None:
+                progress(done, len(groups))
+        return repairs
@@ -0,0 +1,415 @@
+import json
+import logging
+from uuid import UUID
+from typing import Any, Callable, Dict, Optional
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import InterfaceError, OperationalError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Employee, Job
+from apps.employee.service.importer import EmployeeImporter, ImportCheckpoint
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.seeding import SeedService
+from apps.employee.service.tree import TreeService
+from apps.employee.service.wipe import EmployeeWipeService
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a job is retried from its checkpoint instead of failing.
+RETRYABLE_ERRORS = (OperationalError, InterfaceError, SoftTimeLimitExceeded)
+# The rejected rows of an import listed in the result of its job.
+MAX_JOB_ERRORS = 20
+
+
+class JobCancelled(Exception):
+    """
+    Raised at the next chunk boundary of a job whose cancellation was requested.
+    """
+
+
+class JobContext:
+    """
+    What a job handler sees of its job: the parameters, the checkpoint saved by
+    the previous attempt and ``report``, to call after every chunk.
+    """
+
+    def __init__(self, job: Job) -> None:
+        self.job = job
+        self.chunk_size = settings.EMPLOYEE_JOB_CHUNK_SIZE
+
+    @property
+    def params(self) -> dict:
+        return self.job.params
+
+    @property
+    def checkpoint(self) -> dict:
+        return self.job.checkpoint
+
+    def report(
+        self,
+        done: int,
+        total: Optional[int] = None,
+        checkpoint: Optional[dict] = None,
+    ) -> None:
+        """
+        Save the progress of the job and the checkpoint a retry resumes from,
+        then stop the job if it was cancelled.
+
+        Args:
+            done: The units of work done so far.
+            total: The units of work of the whole job, when known.
+            checkpoint: The state to resume from.
+
+        Raises:
+            JobCancelled: If the cancellation of the job was requested.
+        """
+        fields: Dict[str, Any] = {"done": done}
+        if total is not None:
+            fields["total"] = total
+        if checkpoint is not None:
+            self.job.checkpoint = checkpoint
+            fields["checkpoint"] = checkpoint
+        Job.objects.filter(pk=self.job.pk).update(**fields)
+        if Job.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise JobCancelled
+
+
+class JobImportCheckpoint(ImportCheckpoint):
+    """
+    The progress of an import saved on its job instead of in a file.
+    """
+
+    def __init__(self, context: JobContext, source: str) -> None:
+        super().__init__(None, source)
+        self.context = context
+
+    def load(self) -> None:
+        state = self.context.checkpoint
+        if state.get("source") == self.source:
+            self.rows = state["rows"]
+            self.pending_parents = state["pending_parents"]
+
+    def save(self) -> None:
+        self.context.report(
+            self.rows,
+            checkpoint={
+                "source": self.source,
+                "rows": self.rows,
+                "pending_parents": self.pending_parents,
+            },
+        )
+
+    def clear(self) -> None:
+        pass
+
+
+class JobImporter(EmployeeImporter):
+    def __init__(self, context: JobContext, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.context = context
+
+    def _get_checkpoint(self, source: str) -> ImportCheckpoint:
+        return JobImportCheckpoint(self.context, source)
+
+
+class JobService:
+    """
+    Run bulk employee operations in Celery workers instead of in requests.
+
+    A job is a ``Job`` row and a ``run_job`` task. Its handler works in chunks
+    and calls ``JobContext.report`` after each one, which saves the progress
+    served by the status endpoint along with a checkpoint, and stops the job
+    once its cancellation was requested. A task that is retried (after a
+    database error, the soft time limit or the loss of its worker, as tasks are
+    acknowledged late) resumes from the checkpoint, and a task delivered for a
+    job that has already finished does nothing.
+    """
+
+    @staticmethod
+    def _submit(kind: str, params: dict, user=None) -> Job:
+        """
+        Create a job and queue its task once the transaction commits.
+
+        Args:
+            kind: One of ``Job.Kind``.
+            params: The cleaned data of the form of the kind.
+            user: Who submitted the job.
+
+        Returns:
+            Job: The new job, or the identical one that is still pending or
+                running.
+        """
+        from apps.employee.tasks import run_job
+
+        params = json.loads(json.dumps(params, cls=DjangoJSONEncoder))
+        active = Job.objects.filter(
+            kind=kind, params=params, status__in=Job.ACTIVE_STATUSES
+        ).first()
+        if active is not None:
+            return active
+        job = Job.objects.create(
+            kind=kind,
+            params=params,
+            created_by=user if user is not None and user.is_authenticated else None,
+        )
+        transaction.on_commit(lambda: run_job.delay(str(job.pk)))
+        return job
+
+    @staticmethod
+    def _get_job(job_id: UUID) -> Job:
+        """
+        Raises:
+            ValueError: If the job doesn't exist.
+        """
+        try:
+            return Job.objects.get(pk=job_id)
+        except Job.DoesNotExist:
+            raise ValueError(_("Job not found"))
+
+    @staticmethod
+    def _cancel(job_id: UUID) -> Job:
+        """
+        Cancel a pending job right away, or ask a running one to stop after its
+        current chunk.
+
+        Raises:
+            ValueError: If the job doesn't exist.
+        """
+        with transaction.atomic():
+            try:
+                job = Job.objects.select_for_update().get(pk=job_id)
+            except Job.DoesNotExist:
+                raise ValueError(_("Job not found"))
+            if job.status == Job.Status.PENDING:
+                job.status = Job.Status.CANCELLED
+                job.finished_at = timezone.now()
+            elif job.status == Job.Status.RUNNING:
+                job.cancel_requested = True
+            job.save(update_fields=["status", "cancel_requested", "finished_at"])
+        return job
+
+    @staticmethod
+    def _start(job_id: UUID) -> Optional[Job]:
+        """
+        Mark a job as running for one more attempt.
+
+        Returns:
+            Optional[Job]: The job; None if it doesn't exist or has finished.
+        """
+        with transaction.atomic():
+            job = Job.objects.select_for_update().filter(pk=job_id).first()
+            if job is None or job.status not in Job.ACTIVE_STATUSES:
+                return None
+            job.status = Job.Status.RUNNING
+            job.attempts += 1
+            if job.started_at is None:
+                job.started_at = timezone.now()
+            job.save(update_fields=["status", "attempts", "started_at"])
+        return job
+
+    @staticmethod
+    def _finish(
+        job_id: UUID, status: str, result: Optional[dict] = None, error: str = ""
+    ) -> None:
+        Job.objects.filter(pk=job_id).update(
+            status=status, result=result, error=error, finished_at=timezone.now()
+        )
+
+    @staticmethod
+    def _run(job_id: UUID) -> None:
+        """
+        Run a job, or resume it from its checkpoint.
+
+        Raises:
+            RETRYABLE_ERRORS: The job stays running, for the task to retry it.
+        """
+        job = JobService._start(job_id)
+        if job is None:
+            return
+        try:
+            result = JOB_HANDLERS[job.kind](JobContext(job))
+        except JobCancelled:
+            JobService._finish(job.pk, Job.Status.CANCELLED)
+        except RETRYABLE_ERRORS:
+            raise
+        except Exception as error:
+            logger.exception("Job %s failed", job.pk)
+            JobService._finish(job.pk, Job.Status.FAILED, error=str(error))
+        else:
+            JobService._finish(job.pk, Job.Status.SUCCEEDED, result=result)
+
+    @staticmethod
+    def _to_dict(job: Job) -> dict:
+        """
+        Serialize a job for the status endpoint.
+        """
+
+        def timestamp(value):
+            return value.isoformat() if value is not None else None
+
+        return {
+            "id": str(job.pk),
+            "kind": job.kind,
+            "status": job.status,
+            "done": job.done,
+            "total": job.total,
+            "progress": job.done / job.total if job.total else None,
+            "result": job.result,
+            "error": job.error,
+            "cancel_requested": job.cancel_requested,
+            "attempts": job.attempts,
+            "created_at": timestamp(job.created_at),
+            "started_at": timestamp(job.started_at),
+            "finished_at": timestamp(job.finished_at),
+        }
+
+    @staticmethod
+    def _renumber_after_cancel(tree_ids=None) -> None:
+        """
+        Renumber the trees a cancelled job left half written.
+        """
+        try:
+            TreeService._renumber(tree_ids)
+        except ValueError:
+            logger.exception("Could not renumber the trees of a cancelled job")
+
+    @staticmethod
+    def _seed(context: JobContext) -> dict:
+        """
+        Write a seeded organisation; progress is counted in employees.
+        """
+        params = context.params
+        employees = params["employees"]
+        first_tree_id = context.checkpoint.get("first_tree_id")
+        if first_tree_id is None:
+            SeedService._create_positions()
+            first_tree_id = SeedService._next_tree_id()
+            context.report(0, employees, {"first_tree_id": first_tree_id, "written": 0})
+
+        def progress(written: int, elapsed: float) -> None:
+            context.report(
+                written,
+                employees,
+                {"first_tree_id": first_tree_id, "written": written},
+            )
+
+        try:
+            result = SeedService._seed(
+                employees,
+                seed=params["seed"],
+                depth=params["depth"],
+                fan_out=params["fan_out"],
+                batch_size=context.chunk_size,
+                progress=progress,
+                first_tree_id=first_tree_id,
+                resume_from=context.checkpoint.get("written", 0),
+            )
+        except JobCancelled:
+            # The managers written so far form a tree of their own.
+            JobService._renumber_after_cancel([first_tree_id])
+            raise
+        return {
+            "employees": employees,
+            "tree_id": first_tree_id,
+            "fingerprint": result.fingerprint,
+        }
+
+    @staticmethod
+    def _wipe(context: JobContext) -> dict:
+        """
+        Delete a tree, a subtree or, in chunks, every employee.
+        """
+        params = context.params
+        if params.get("tree_id") is not None:
+            return {"deleted": EmployeeWipeService._delete_tree(params["tree_id"])}
+        if params.get("subtree"):
+            return {
+                "deleted": EmployeeWipeService._delete_subtree(UUID(params["subtree"]))
+            }
+
+        total = context.checkpoint.get("total")
+        if total is None:
+            total = Employee.objects.count()
+            context.report(0, total, {"total": total, "deleted": 0})
+        before = context.checkpoint.get("deleted", 0)
+
+        def progress(deleted: int) -> None:
+            context.report(
+                before + deleted, total, {"total": total, "deleted": before + deleted}
+            )
+
+        try:
+            deleted = EmployeeWipeService._delete_in_chunks(
+                chunk_size=context.chunk_size,
+                include_positions=params.get("include_positions", True),
+                progress=progress,
+            )
+        except JobCancelled:
+            # The deepest levels are gone, leaving gaps in the nested sets.
+            JobService._renumber_after_cancel()
+            raise
+        return {"deleted": before + deleted}
+
+    @staticmethod
+    def _import(context: JobContext) -> dict:
+        """
+        Import a file the workers can read; progress is counted in rows.
+        """
+        params = context.params
+        importer = JobImporter(
+            context,
+            batch_size=context.chunk_size,
+            use_copy=params.get("use_copy", False),
+        )
+        try:
+            result = importer._import(params["path"], resume=True)
+        except JobCancelled:
+            # Place the rows imported so far.
+            JobService._renumber_after_cancel()
+            raise
+        return {
+            "rows": result.rows,
+            "created": result.created,
+            "updated": result.updated,
+            "rejected": len(result.errors),
+            "errors": [issue._asdict() for issue in result.errors[:MAX_JOB_ERRORS]],
+        }
+
+    @staticmethod
+    def _repair_tree(context: JobContext) -> dict:
+        """
+        Check the org tree and renumber the corrupted trees; progress is
+        counted in groups of trees repaired together.
+        """
+        params = context.params
+        check = TreeIntegrityService._check(params.get("tree_ids"))
+        repairs = TreeIntegrityService._repair(
+            check,
+            dry_run=params.get("dry_run", False),
+            progress=lambda done, total: context.report(done, total),
+        )
+        return {
+            "trees": check.trees,
+            "rows": check.rows,
+            "corrupted": sorted(check.issues),
+            "repairs": [
+                {
+                    "tree_ids": list(repair.tree_ids),
+                    "rows": repair.rows,
+                    "error": repair.error,
+                }
+                for repair in repairs
+            ],
+        }
+
+
+JOB_HANDLERS: Dict[str, Callable[[JobContext], dict]] = {
+    Job.Kind.SEED: JobService._seed,
+    Job.Kind.WIPE: JobService._wipe,
+    Job.Kind.IMPORT: JobService._import,
+    Job.Kind.REPAIR_TREE: JobService._repair_tree,
+}
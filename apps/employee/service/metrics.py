@@ -0,0 +1,89 @@
+from typing import Dict, NamedTuple
+
+from django.core.cache import cache
+
+
+METRIC_KEY = "metric:{name}:{field}"
+METRIC_FIELDS = ("count", "total", "max", "last")
+COUNTER_KEY = "counter:{name}"
+
+
+class MetricSummary(NamedTuple):
+    """
+    The samples recorded for a metric by every worker since the cache was last
+    cleared.
+    """
+
+    count: int
+    total: int
+    max: int
+    last: int
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+def record_metric(name: str, value: int) -> None:
+    """
+    Record one sample of a metric in the shared cache.
+
+    The counters are incremented atomically; ``max`` is read before it is
+    written, so a concurrent larger sample may occasionally be lost.
+
+    Args:
+        name: The name of the metric, including its unit, like
+            ``"tree_lock_wait_us"``.
+        value: The sample.
+    """
+    for field, amount in (("count", 1), ("total", value)):
+        key = METRIC_KEY.format(name=name, field=field)
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+    cache.set(METRIC_KEY.format(name=name, field="last"), value, timeout=None)
+    max_key = METRIC_KEY.format(name=name, field="max")
+    if value > cache.get(max_key, 0):
+        cache.set(max_key, value, timeout=None)
+
+
+def get_metric(name: str) -> MetricSummary:
+    """
+    Return the samples recorded for a metric.
+
+    Args:
+        name: The name of the metric.
+
+    Returns:
+        MetricSummary: Its counters; all zero when nothing was recorded.
+    """
+    keys = {field: METRIC_KEY.format(name=name, field=field) for field in METRIC_FIELDS}
+    values = cache.get_many(keys.values())
+    return MetricSummary(*(values.get(keys[field], 0) for field in METRIC_FIELDS))
+
+
+def increment_counter(name: str, amount: int = 1) -> None:
+    """
+    Increment a counter shared by every worker, with a single cache write.
+
+    Args:
+        name: The name of the counter, like ``"list_cache_hits"``.
+        amount: How much to add.
+    """
+    key = COUNTER_KEY.format(name=name)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+
+
+def get_counters(*names: str) -> Dict[str, int]:
+    """
+    Return the values of several counters; zero for those never incremented.
+    """
+    keys = {name: COUNTER_KEY.format(name=name) for name in names}
+    values = cache.get_many(keys.values())
+    return {name: values.get(key, 0) for name, key in keys.items()}
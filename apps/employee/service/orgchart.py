@@ -0,0 +1,229 @@
+import json
+import time
+from uuid import UUID
+from typing import Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.db.models.query_utils import DeferredAttribute
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Employee
+from apps.employee.service.caching import bump_generation, get_generation
+
+FOREST = "forest"
+SNAPSHOT_KEY = "orgchart:{tree}:{position}:{node}:{version}"
+STALE_KEY = "orgchart:stale:{node}"
+SNAPSHOT_FIELDS = ("id", "full_name", "position_name", "parent_id")
+
+
+class OrgChartService:
+    """
+    Serialized org chart snapshots, for the whole organisation and per subtree.
+
+    A snapshot is cached under a key made of the ``tree`` generation (bumped by
+    bulk writes that bypass signals), the ``position`` generation (position
+    renames) and a version of its root node. Saving, moving or deleting one
+    employee bumps the versions of its ancestors and of the forest only, so
+    every other subtree snapshot stays cached.
+
+    A missing snapshot is rebuilt by a single worker, the one that wins the
+    ``cache.add`` lock; the others serve the previous snapshot of the same
+    subtree in the meantime, or wait for the rebuild if there is none.
+    """
+
+    @staticmethod
+    def _node_name(node_id: Optional[UUID]) -> str:
+        return FOREST if node_id is None else str(node_id)
+
+    @staticmethod
+    def _snapshot_key(node_id: Optional[UUID]) -> str:
+        node = OrgChartService._node_name(node_id)
+        return SNAPSHOT_KEY.format(
+            tree=get_generation("tree"),
+            position=get_generation("position"),
+            node=node,
+            version=get_generation(f"orgchart:{node}"),
+        )
+
+    @staticmethod
+    def _assemble(rows: Iterable[Tuple]) -> List[dict]:
+        """
+        Nest ``SNAPSHOT_FIELDS`` rows read in ``lft`` order (per tree), in which
+        every manager comes before their reports; rows whose manager wasn't read
+        are roots.
+        """
+        roots, nodes = [], {}
+        for node_id, full_name, position_name, parent_id in rows:
+            node = {"id": str(node_id), "name": full_name, "position": position_name}
+            nodes[node_id] = node
+            parent = nodes.get(parent_id)
+            if parent is None:
+                roots.append(node)
+            else:
+                parent.setdefault("children", []).append(node)
+        return roots
+
+    @staticmethod
+    def _build(node_id: Optional[UUID] = None) -> str:
+        """
+        Serialize the subtree of an employee, or the whole organisation, from a
+        single ``lft``-ordered scan.
+
+        Args:
+            node_id: The root of the subtree; every tree when None.
+
+        Returns:
+            str: The JSON list of root nodes with nested ``children``.
+
+        Raises:
+            ValueError: If the employee doesn't exist.
+        """
+        employees = Employee.objects.values_list(*SNAPSHOT_FIELDS)
+        if node_id is None:
+            employees = employees.order_by("tree_id", "lft")
+        else:
+            root = (
+                Employee.objects.filter(pk=node_id)
+                .values_list("tree_id", "lft", "rght")
+                .first()
+            )
+            if root is None:
+                raise ValueError(_("Employee not found"))
+            tree_id, lft, rght = root
+            employees = employees.filter(
+                tree_id=tree_id, lft__gte=lft, lft__lt=rght
+            ).order_by("lft")
+        rows = employees.iterator(chunk_size=10000)
+        return json.dumps(OrgChartService._assemble(rows), separators=(",", ":"))
+
+    @staticmethod
+    def _get_snapshot(node_id: Optional[UUID] = None) -> str:
+        """
+        Return the cached snapshot of a subtree (or of every tree), rebuilding
+        it if needed.
+
+        Args:
+            node_id: The root of the subtree; every tree when None.
+
+        Returns:
+            str: The serialized snapshot.
+
+        Raises:
+            ValueError: If the employee doesn't exist.
+        """
+        key = OrgChartService._snapshot_key(node_id)
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        timeout = getattr(settings, "EMPLOYEE_ORG_CHART_TIMEOUT", 60 * 60 * 24)
+        lock_timeout = getattr(settings, "EMPLOYEE_ORG_CHART_LOCK_TIMEOUT", 60)
+        stale_key = STALE_KEY.format(node=OrgChartService._node_name(node_id))
+
+        if cache.add(f"{key}:lock", 1, timeout=lock_timeout):
+            try:
+                snapshot = OrgChartService._build(node_id)
+                cache.set_many({key: snapshot, stale_key: snapshot}, timeout)
+            finally:
+                cache.delete(f"{key}:lock")
+            return snapshot
+
+        stale = cache.get(stale_key)
+        if stale is not None:
+            return stale
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            snapshot = cache.get(key)
+            if snapshot is not None:
+                return snapshot
+        # The rebuilding worker died or is too slow; don't cache what we build.
+        return OrgChartService._build(node_id)
+
+    @staticmethod
+    def _get_tree_snapshot(tree_id: int) -> str:
+        """
+        Return the cached snapshot of one tree, i.e. of the subtree of its root.
+
+        Args:
+            tree_id: The tree.
+
+        Returns:
+            str: The serialized snapshot.
+
+        Raises:
+            ValueError: If the tree doesn't exist.
+        """
+        root_id = (
+            Employee.objects.filter(tree_id=tree_id, parent__isnull=True)
+            .values_list("id", flat=True)
+            .first()
+        )
+        if root_id is None:
+            raise ValueError(_("Tree not found"))
+        return OrgChartService._get_snapshot(root_id)
+
+    @staticmethod
+    def _get_changed_node_ids(employee: Employee, deleted: bool = False) -> Set[UUID]:
+        """
+        The ids of the subtrees whose snapshots contained an employee before a
+        save or delete, or contain them after it.
+
+        Those are the employee and the ancestors of their old and new manager.
+        Moving an employee never changes the ancestors of either manager, so
+        both chains are read with one query, whether or not the tree was
+        renumbered yet. The old manager is the one the instance was loaded
+        with (see ``Employee.save``).
+
+        Args:
+            employee: The saved or deleted employee.
+            deleted: Whether the employee was deleted.
+        """
+        parent_ids = {employee.parent_id}
+        if not deleted:
+            old_parent_id = getattr(
+                employee,
+                "_loaded_parent_id",
+                employee._mptt_cached_fields.get("parent"),
+            )
+            if old_parent_id is not DeferredAttribute:
+                parent_ids.add(old_parent_id)
+        parent_ids.discard(None)
+        return {employee.pk} | OrgChartService._get_chain_ids(parent_ids)
+
+    @staticmethod
+    def _get_chain_ids(node_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        The ids of some placed employees and of everyone above them, read with
+        one query: the rows whose ``lft``/``rght`` range encloses theirs.
+
+        Args:
+            node_ids: The employees.
+        """
+        node_ids = set(node_ids)
+        if not node_ids:
+            return set()
+        enclosed = Employee.objects.filter(
+            pk__in=node_ids,
+            tree_id=OuterRef("tree_id"),
+            lft__gte=OuterRef("lft"),
+            lft__lte=OuterRef("rght"),
+        )
+        return set(
+            Employee.objects.filter(Exists(enclosed)).values_list("id", flat=True)
+        )
+
+    @staticmethod
+    def _invalidate(node_ids: Iterable[UUID]) -> None:
+        """
+        Invalidate the snapshots of the given subtrees and of the whole
+        organisation.
+
+        Args:
+            node_ids: The roots of the subtrees that changed, usually a node and
+                its ancestors.
+        """
+        for node in {str(node_id) for node_id in node_ids} | {FOREST}:
+            bump_generation(f"orgchart:{node}")
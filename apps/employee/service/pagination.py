@@ -0,0 +1,156 @@
+import json
+import base64
+import binascii
+from typing import Any, List, Optional, Tuple
+
+from django.db.models import F, Q
+from django.db.models.query import QuerySet
+from django.core.exceptions import ValidationError
+
+
+class KeysetPage:
+    """
+    A page of results fetched with keyset (cursor) pagination.
+
+    Unlike ``django.core.paginator.Page`` it doesn't know the total number of
+    results or its page number, only whether there are results before and after it.
+    """
+
+    def __init__(
+        self,
+        object_list: List[Any],
+        next_cursor: Optional[str],
+        previous_cursor: Optional[str],
+    ) -> None:
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset ordered by one field plus the primary key as tie-breaker.
+
+    A page is located by the sort key of the row next to it instead of an
+    OFFSET, so fetching any page costs one index range scan of ``per_page + 1``
+    rows no matter how deep it is. NULL sort values are ordered last.
+    """
+
+    def __init__(self, queryset: QuerySet, sort_field: str, per_page: int) -> None:
+        self.queryset = queryset
+        self.field = queryset.model._meta.get_field(sort_field)
+        self.key = self.field.attname
+        self.pk_key = queryset.model._meta.pk.attname
+        self.per_page = per_page
+
+    def _encode(self, obj: Any, direction: str) -> str:
+        value = getattr(obj, self.key)
+        data = {
+            "d": direction,
+            "v": None if value is None else str(value),
+            "id": str(getattr(obj, self.pk_key)),
+        }
+        raw = json.dumps(data, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode(self, cursor: str) -> Optional[Tuple[str, Any, Any]]:
+        """
+        Decode a cursor into ``(direction, value, pk)``; invalid cursors decode to None.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            data = json.loads(raw)
+            value = data["v"]
+            if value is not None:
+                value = self.field.to_python(value)
+            pk = self.queryset.model._meta.pk.to_python(data["id"])
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            return None
+        if data.get("d") not in ("next", "previous"):
+            return None
+        return data["d"], value, pk
+
+    def _after(self, value: Any, pk: Any) -> Q:
+        if value is None:
+            return Q(**{f"{self.key}__isnull": True, "pk__gt": pk})
+        condition = Q(**{f"{self.key}__gte": value}) & (
+            Q(**{f"{self.key}__gt": value}) | Q(pk__gt=pk)
+        )
+        if self.field.null:
+            condition |= Q(**{f"{self.key}__isnull": True})
+        return condition
+
+    def _before(self, value: Any, pk: Any) -> Q:
+        if value is None:
+            return Q(**{f"{self.key}__isnull": False}) | Q(
+                **{f"{self.key}__isnull": True, "pk__lt": pk}
+            )
+        return Q(**{f"{self.key}__lte": value}) & (
+            Q(**{f"{self.key}__lt": value}) | Q(pk__lt=pk)
+        )
+
+    def get_queryset(self, cursor: Optional[str] = None) -> QuerySet:
+        """
+        Build the query that fetches the page identified by ``cursor``: the rows
+        past the cursor in sort order (in reverse for previous pages), plus one
+        to tell whether there are more.
+
+        Args:
+            cursor: A token from ``next_cursor``/``previous_cursor`` of another page.
+
+        Returns:
+            QuerySet: The sliced queryset.
+        """
+        return self._get_queryset(self._decode(cursor) if cursor else None)
+
+    def _get_queryset(self, decoded: Optional[Tuple[str, Any, Any]]) -> QuerySet:
+        if decoded is None:
+            queryset = self.queryset.order_by(F(self.key).asc(nulls_last=True), "pk")
+        elif decoded[0] == "next":
+            queryset = self.queryset.filter(self._after(*decoded[1:])).order_by(
+                F(self.key).asc(nulls_last=True), "pk"
+            )
+        else:
+            queryset = self.queryset.filter(self._before(*decoded[1:])).order_by(
+                F(self.key).desc(nulls_first=True), "-pk"
+            )
+        return queryset[: self.per_page + 1]
+
+    def get_page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """
+        Return the page identified by ``cursor``, or the first page.
+
+        Args:
+            cursor: A token from ``next_cursor``/``previous_cursor`` of another page.
+
+        Returns:
+            KeysetPage: The requested page.
+        """
+        decoded = self._decode(cursor) if cursor else None
+        rows = list(self._get_queryset(decoded))
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if decoded is not None and decoded[0] == "previous":
+            rows.reverse()
+
+        forward = decoded is None or decoded[0] == "next"
+        came_from_other_side = decoded is not None
+        has_next = has_more if forward else came_from_other_side
+        has_previous = came_from_other_side if forward else has_more
+        return KeysetPage(
+            rows,
+            self._encode(rows[-1], "next") if rows and has_next else None,
+            self._encode(rows[0], "previous") if rows and has_previous else None,
+        )
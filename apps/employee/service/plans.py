@@ -0,0 +1,85 @@
+import json
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from django.db import connections
+from django.db.models.query import QuerySet
+
+from apps.employee.models import Employee
+from apps.employee.service.pagination import KeysetPaginator
+from apps.employee.service.employees import SORT_FIELDS, EmployeeService
+
+
+class SortPlan(NamedTuple):
+    sort_by: str
+    page: str
+    # None when the plan can't be checked (not PostgreSQL).
+    index_only_order: Optional[bool]
+    nodes: List[str]
+    plan: str
+
+
+class QueryPlanService:
+    @staticmethod
+    def _walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        yield node
+        for child in node.get("Plans", ()):
+            yield from QueryPlanService._walk(child)
+
+    @staticmethod
+    def _explain(queryset: QuerySet) -> SortPlan:
+        """
+        Explain a list query and tell whether its order comes from an index.
+
+        The order comes from an index when the plan neither sorts nor scans the
+        whole employee table.
+
+        Args:
+            queryset: The query to explain.
+
+        Returns:
+            SortPlan: The verdict and the plan, ``sort_by`` and ``page`` left empty.
+        """
+        if connections[queryset.db].vendor != "postgresql":
+            return SortPlan("", "", None, [], queryset.explain())
+
+        plan = queryset.explain(format="json")
+        root = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+        nodes, index_only_order = [], True
+        for node in QueryPlanService._walk(root):
+            relation = node.get("Relation Name")
+            nodes.append(
+                f"{node['Node Type']} on {relation}" if relation else node["Node Type"]
+            )
+            if node["Node Type"] == "Sort" or (
+                node["Node Type"] == "Seq Scan" and relation == Employee._meta.db_table
+            ):
+                index_only_order = False
+        return SortPlan("", "", index_only_order, nodes, json.dumps(root, indent=2))
+
+    @staticmethod
+    def _check_sort_plans(per_page: int = 15) -> List[SortPlan]:
+        """
+        Explain the first page and a following page of the employee list for
+        every sort option, as fetched by keyset pagination.
+
+        Args:
+            per_page: The page size to explain.
+
+        Returns:
+            List[SortPlan]: One plan per sort option and page.
+        """
+        plans = []
+        for sort_by in SORT_FIELDS:
+            paginator = KeysetPaginator(
+                Employee.objects.all(),
+                EmployeeService._get_sort_field(sort_by),
+                per_page,
+            )
+            first = paginator.get_page()
+            pages = [("first", None)]
+            if first.next_cursor:
+                pages.append(("next", first.next_cursor))
+            for page, cursor in pages:
+                plan = QueryPlanService._explain(paginator.get_queryset(cursor))
+                plans.append(plan._replace(sort_by=sort_by, page=page))
+        return plans
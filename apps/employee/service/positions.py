@@ -0,0 +1,140 @@
+import time
+import threading
+from uuid import UUID
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from apps.employee.models import Position
+from apps.employee.service.caching import get_generation
+
+
+class PositionRegistry:
+    """
+    This process's copy of the positions table: a dozen rows that change
+    rarely, but are looked up by every form render, seed run and import.
+
+    The registry is loaded with one query and tagged with the ``position``
+    cache generation, which ``Position`` signals and the bulk services bump on
+    every change. Lookups compare the generation at most every
+    ``EMPLOYEE_POSITION_REGISTRY_CHECK_INTERVAL`` seconds and reload when it
+    moved; changes made in this process reload it right away.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._names: Dict[UUID, str] = {}
+        self._ids: Dict[str, UUID] = {}
+        self.generation: Optional[int] = None
+        self.checked_at = 0.0
+
+    def load(self) -> None:
+        """
+        Read every position with a single query.
+        """
+        generation = get_generation("position")
+        names = dict(Position.objects.values_list("id", "position_name"))
+        ids = {name: position_id for position_id, name in names.items()}
+        with self._lock:
+            self._names, self._ids = names, ids
+            self.generation = generation
+            self.checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """
+        Reload the positions on the next lookup.
+        """
+        self.generation = None
+
+    def refresh(self) -> "PositionRegistry":
+        """
+        Reload the positions if they were invalidated or changed elsewhere.
+
+        Returns:
+            PositionRegistry: The registry itself.
+        """
+        if self.generation is None:
+            self.load()
+            return self
+        interval = getattr(settings, "EMPLOYEE_POSITION_REGISTRY_CHECK_INTERVAL", 5)
+        if time.monotonic() - self.checked_at >= interval:
+            if get_generation("position") == self.generation:
+                self.checked_at = time.monotonic()
+            else:
+                self.load()
+        return self
+
+    def name(self, position_id: Optional[UUID]) -> str:
+        """
+        Return the name of a position; empty for None or unknown ids.
+        """
+        return self._names.get(position_id, "")
+
+    def id_for(self, position_name: str) -> Optional[UUID]:
+        """
+        Return the id of the position with this name, or None.
+        """
+        return self._ids.get(position_name)
+
+    def ids(self, names: Optional[Iterable[str]] = None) -> Dict[str, UUID]:
+        """
+        Return the ids of the given positions (of every position when None) by
+        name; unknown names are left out.
+        """
+        if names is None:
+            return dict(self._ids)
+        return {name: self._ids[name] for name in names if name in self._ids}
+
+    def matching(self, query: str) -> List[UUID]:
+        """
+        Return the ids of the positions whose name contains ``query``, ignoring
+        case.
+        """
+        query = query.lower()
+        return [
+            position_id
+            for position_id, name in self._names.items()
+            if query in name.lower()
+        ]
+
+    def choices(self) -> List[Tuple[str, str]]:
+        """
+        Return ``(id, name)`` pairs of every position, sorted by name, for
+        choice fields.
+        """
+        return sorted(
+            ((str(position_id), name) for position_id, name in self._names.items()),
+            key=lambda choice: choice[1],
+        )
+
+    def get(self, position_id: UUID) -> Position:
+        """
+        Return a position as a model instance, without a query.
+
+        Raises:
+            Position.DoesNotExist: If there is no such position.
+        """
+        if position_id not in self._names:
+            raise Position.DoesNotExist(position_id)
+        return Position.from_db(
+            Position.objects.db,
+            ["id", "position_name"],
+            [position_id, self._names[position_id]],
+        )
+
+
+_registry = PositionRegistry()
+
+
+def get_position_registry() -> PositionRegistry:
+    """
+    Return this process's position registry, loading or reloading it if needed.
+    """
+    return _registry.refresh()
+
+
+def invalidate_position_registry() -> None:
+    """
+    Make this process reload the positions on the next lookup.
+    """
+    _registry.invalidate()
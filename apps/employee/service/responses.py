@@ -0,0 +1,166 @@
+import time
+import hashlib
+from typing import Callable, Dict, Iterable, Tuple
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.translation import get_language
+
+from apps.employee.service.caching import get_generations
+from apps.employee.service.metrics import (
+    MetricSummary,
+    get_counters,
+    get_metric,
+    increment_counter,
+    record_metric,
+)
+
+RESPONSE_KEY = "response:{page}:{generations}:{language}:{variant}"
+# The groups of cached values a page is built from: any write to employees or
+# positions, including bulk writes that bypass signals, bumps one of them.
+RESPONSE_GENERATIONS = ("employee", "position", "tree")
+# The cached pages, as reported by the cache metrics endpoint.
+CACHED_PAGES = ("list", "detail")
+
+
+class ResponseCacheService:
+    """
+    Cache the rendered pages of the employee list and detail views.
+
+    Pages are keyed by their variant (the list parameters, the employee id)
+    and by the generations of ``RESPONSE_GENERATIONS``, so a write invalidates
+    every page at once without looking for keys to delete; the old pages
+    expire on their own. Only anonymous GET requests are cached, as the pages
+    of signed-in users show links and messages of their own.
+
+    A missing page is rendered by a single worker, the one that wins the
+    ``cache.add`` lock; the others wait for it instead of running the same
+    queries. Hits, misses and render times are counted per page.
+    """
+
+    @staticmethod
+    def _is_cacheable(request: HttpRequest) -> bool:
+        return (
+            getattr(settings, "EMPLOYEE_RESPONSE_CACHE_TIMEOUT", 0) > 0
+            and request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+            and not len(messages.get_messages(request))
+        )
+
+    @staticmethod
+    def _key(page: str, variant: Iterable[Tuple[str, str]]) -> str:
+        """
+        Build the cache key of a page.
+
+        Args:
+            page: One of ``CACHED_PAGES``.
+            variant: The ``(name, value)`` pairs the page depends on.
+
+        Returns:
+            str: The key, which changes with every generation bump.
+        """
+        digest = hashlib.sha1(
+            "&".join(f"{name}={value}" for name, value in variant).encode()
+        ).hexdigest()
+        return RESPONSE_KEY.format(
+            page=page,
+            generations=".".join(map(str, get_generations(*RESPONSE_GENERATIONS))),
+            language=get_language(),
+            variant=digest,
+        )
+
+    @staticmethod
+    def _to_response(cached: Tuple[bytes, str]) -> HttpResponse:
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    @staticmethod
+    def _render(
+        page: str, key: str, render: Callable[[], HttpResponse]
+    ) -> HttpResponse:
+        """
+        Render a page and cache it if it is a plain 200 response.
+        """
+        started = time.perf_counter()
+        response = render()
+        if isinstance(response, SimpleTemplateResponse):
+            response.render()
+        record_metric(
+            f"{page}_cache_render_ms", int((time.perf_counter() - started) * 1000)
+        )
+        if response.status_code == 200 and not response.streaming:
+            cache.set(
+                key,
+                (response.content, response["Content-Type"]),
+                settings.EMPLOYEE_RESPONSE_CACHE_TIMEOUT,
+            )
+        return response
+
+    @staticmethod
+    def _get_or_render(
+        page: str,
+        request: HttpRequest,
+        variant: Iterable[Tuple[str, str]],
+        render: Callable[[], HttpResponse],
+    ) -> HttpResponse:
+        """
+        Return the cached page, or render it.
+
+        Args:
+            page: One of ``CACHED_PAGES``.
+            request: The request; only anonymous GET requests are cached.
+            variant: The ``(name, value)`` pairs the page depends on.
+            render: Renders the page on a miss.
+
+        Returns:
+            HttpResponse: The page.
+        """
+        if not ResponseCacheService._is_cacheable(request):
+            return render()
+
+        key = ResponseCacheService._key(page, variant)
+        cached = cache.get(key)
+        if cached is not None:
+            increment_counter(f"{page}_cache_hits")
+            return ResponseCacheService._to_response(cached)
+
+        increment_counter(f"{page}_cache_misses")
+        lock_timeout = getattr(settings, "EMPLOYEE_RESPONSE_CACHE_LOCK_TIMEOUT", 10)
+        if cache.add(f"{key}:lock", 1, timeout=lock_timeout):
+            try:
+                return ResponseCacheService._render(page, key, render)
+            finally:
+                cache.delete(f"{key}:lock")
+
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            cached = cache.get(key)
+            if cached is not None:
+                return ResponseCacheService._to_response(cached)
+            if not cache.get(f"{key}:lock"):
+                # The rendering worker gave up, e.g. on a 404.
+                break
+        return render()
+
+    @staticmethod
+    def _get_metrics() -> Dict[str, dict]:
+        """
+        Return the hits, misses and render times of every cached page.
+        """
+        metrics = {}
+        for page in CACHED_PAGES:
+            counters = get_counters(f"{page}_cache_hits", f"{page}_cache_misses")
+            hits = counters[f"{page}_cache_hits"]
+            misses = counters[f"{page}_cache_misses"]
+            render_ms: MetricSummary = get_metric(f"{page}_cache_render_ms")
+            metrics[page] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else None,
+                "render_ms": {**render_ms._asdict(), "mean": render_ms.mean},
+            }
+        return metrics
@@ -0,0 +1,189 @@
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+
+from django.db.models import Max
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.bulk import BulkInsertService
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.fixtures import FixtureWriter
+from apps.employee.service.generator import OrgGenerator
+from apps.employee.service.positions import get_position_registry
+from apps.employee.service.tree import compute_tree_positions
+from apps.employee.service.typeahead import invalidate_typeahead_index
+
+# The positions of seeded organisations; the first one is the root's.
+POSITION_NAMES = [
+    "CEO",
+    "Team Lead",
+    "Employee",
+    "Intern",
+    "Data Analyst",
+    "Mechanical engineer",
+    "HR",
+    "UI Developer",
+    "UI/UX",
+    "Backend Architect",
+    "Frontend Architect",
+    "Software Tester",
+    "QA",
+]
+
+
+class SeedResult(NamedTuple):
+    written: int
+    first_tree_id: int
+    fingerprint: str
+
+
+class SeedService:
+    """
+    Write reproducible synthetic organisations, for the ``seed_employees``
+    command and the seeding job.
+    """
+
+    @staticmethod
+    def _create_positions(
+        names: Iterable[str] = POSITION_NAMES, writer: Optional[FixtureWriter] = None
+    ) -> None:
+        """
+        Create the positions that don't exist yet.
+
+        Args:
+            names: The position names.
+            writer: Also write the positions to this fixture.
+        """
+        registry = get_position_registry()
+        positions = []
+        for position_name in names:
+            position_id = registry.id_for(position_name)
+            if position_id is None:
+                positions.append(Position.objects.create(position_name=position_name))
+            else:
+                positions.append(registry.get(position_id))
+        if writer is not None:
+            writer.write_objects(positions)
+
+    @staticmethod
+    def _next_tree_id() -> int:
+        return (Employee.objects.aggregate(Max("tree_id"))["tree_id__max"] or 0) + 1
+
+    @staticmethod
+    def _seed(
+        employees: int,
+        seed: int,
+        depth: int = 6,
+        fan_out: str = "uniform:2-8",
+        position_mix: Optional[Dict[str, float]] = None,
+        workers: int = 1,
+        batch_size: int = 5000,
+        use_copy: bool = False,
+        writer: Optional[FixtureWriter] = None,
+        progress: Optional[Callable[[int, float], None]] = None,
+        first_tree_id: Optional[int] = None,
+        resume_from: int = 0,
+    ) -> SeedResult:
+        """
+        Generate an organisation and write it as a new tree with batched bulk
+        inserts; the same seed and shape always produce the same dataset.
+
+        The ids are part of the generated data, so an interrupted run can be
+        resumed: the first ``resume_from`` employees are skipped, as are those
+        of the next batch that were written before the interruption.
+
+        Args:
+            employees: The number of employees.
+            seed: The random seed.
+            depth: The maximum number of management levels.
+            fan_out: The distribution of direct reports, see ``parse_fan_out``.
+            position_mix: The weights of the positions below the root; every
+                position of ``POSITION_NAMES`` equally when None.
+            workers: The processes generating personal data.
+            batch_size: The rows written per transaction.
+            use_copy: Use COPY instead of INSERT on PostgreSQL.
+            writer: Also write the employees to this fixture.
+            progress: Called after every batch with the number of employees
+                written so far (including skipped ones) and the elapsed time.
+            first_tree_id: The tree id of the organisation; the next free one
+                when None. Must be the same when resuming.
+            resume_from: The number of employees written by the interrupted run.
+
+        Returns:
+            SeedResult: The rows written, the tree id and the dataset
+                fingerprint.
+        """
+        if position_mix is None:
+            position_mix = {name: 1.0 for name in POSITION_NAMES[1:]}
+        generator = OrgGenerator(
+            employees,
+            seed=seed,
+            depth=depth,
+            fan_out=fan_out,
+            position_mix=position_mix,
+            root_position=POSITION_NAMES[0],
+            workers=workers,
+        )
+
+        SeedService._create_positions(
+            sorted(set(position_mix) - set(POSITION_NAMES)), writer
+        )
+        position_ids = get_position_registry().ids()
+
+        if first_tree_id is None:
+            first_tree_id = SeedService._next_tree_id()
+        hierarchy = generator.hierarchy()
+        tree_positions = compute_tree_positions(hierarchy, first_tree_id=first_tree_id)
+        written_before = set()
+        if resume_from:
+            written_before = set(
+                Employee.objects.filter(
+                    pk__in=[
+                        employee_id
+                        for employee_id, _parent_id in hierarchy[
+                            resume_from : resume_from + batch_size
+                        ]
+                    ]
+                ).values_list("pk", flat=True)
+            )
+
+        def records():
+            # Skipped employees are generated all the same, to keep the random
+            # sequence of the others.
+            for index, generated in enumerate(generator.generate()):
+                if index < resume_from or generated.id in written_before:
+                    continue
+                tree_position = tree_positions[generated.id]
+                employee = Employee(
+                    id=generated.id,
+                    full_name=generated.full_name,
+                    email=generated.email,
+                    hire_date=generated.hire_date,
+                    position_id=position_ids.get(generated.position_name),
+                    show_supervisors=True,
+                    parent_id=generated.parent_id,
+                    tree_id=tree_position.tree_id,
+                    lft=tree_position.lft,
+                    rght=tree_position.rght,
+                    level=tree_position.level,
+                )
+                if writer is not None:
+                    writer.write_objects([employee])
+                yield employee
+
+        skipped = resume_from + len(written_before)
+
+        def report(written: int, elapsed: float) -> None:
+            if progress is not None:
+                progress(skipped + written, elapsed)
+
+        written = BulkInsertService._bulk_insert(
+            Employee,
+            records(),
+            batch_size=batch_size,
+            use_copy=use_copy,
+            progress=report,
+        )
+        # Bulk inserts skip the signals that invalidate org chart snapshots and
+        # update the type-ahead index.
+        bump_generation("tree")
+        invalidate_typeahead_index()
+        return SeedResult(written, first_tree_id, generator.fingerprint)
@@ -0,0 +1,502 @@
+import time
+from uuid import UUID
+from collections import defaultdict
+from typing import (
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from django.db import connections, router, transaction
+from django.db.models import Case, IntegerField, Max, Q, Value, When
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Employee
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.metrics import record_metric
+
+
+# The columns read for every node of the tree API.
+TREE_NODE_FIELDS = (
+    "id",
+    "full_name",
+    "position_name",
+    "parent_id",
+    "tree_id",
+    "lft",
+    "rght",
+    "level",
+)
+MAX_TREE_DEPTH = 3
+MAX_TREE_NODES = 2000
+MAX_TREE_MOVES = 500
+# The first key of the PostgreSQL advisory locks taken on trees; the second is
+# the tree id.
+TREE_LOCK_NAMESPACE = 0x4D505454
+
+
+class TreePosition(NamedTuple):
+    tree_id: int
+    lft: int
+    rght: int
+    level: int
+
+
+class TreeMove(NamedTuple):
+    """
+    Move an employee under a new parent (a root when None), at ``position``
+    among its new siblings; after the last one when None.
+    """
+
+    id: UUID
+    parent_id: Optional[UUID]
+    position: Optional[int] = None
+
+
+def compute_tree_positions(
+    nodes: Iterable[Tuple[Hashable, Optional[Hashable]]],
+    first_tree_id: int = 1,
+    root_tree_ids: Optional[Mapping[Hashable, int]] = None,
+) -> Dict[Hashable, TreePosition]:
+    """
+    Compute MPTT ``tree_id``/``lft``/``rght``/``level`` values for a forest in one pass.
+
+    Siblings keep the order in which they appear in ``nodes`` and every root
+    starts a new tree, numbered from ``first_tree_id``.
+
+    Args:
+        nodes: Pairs of ``(node_id, parent_id)``; ``parent_id`` is None for roots.
+        first_tree_id: The tree id given to the first root without a fixed tree id.
+        root_tree_ids: Tree ids to keep for some of the roots.
+
+    Returns:
+        Dict[Hashable, TreePosition]: The nested set position of every node.
+
+    Raises:
+        ValueError: If some nodes are not reachable from a root (unknown parent or cycle).
+    """
+    children = defaultdict(list)
+    roots = []
+    total = 0
+    for node_id, parent_id in nodes:
+        total += 1
+        if parent_id is None:
+            roots.append(node_id)
+        else:
+            children[parent_id].append(node_id)
+
+    root_tree_ids = root_tree_ids or {}
+    next_tree_id = first_tree_id
+    positions = {}
+    for root_id in roots:
+        tree_id = root_tree_ids.get(root_id)
+        if tree_id is None:
+            tree_id = next_tree_id
+            next_tree_id += 1
+        lefts = {root_id: 1}
+        counter = 2
+        stack = [(root_id, 0, iter(children.get(root_id, ())))]
+        while stack:
+            node_id, level, pending = stack[-1]
+            child_id = next(pending, None)
+            if child_id is None:
+                stack.pop()
+                positions[node_id] = TreePosition(
+                    tree_id, lefts.pop(node_id), counter, level
+                )
+                counter += 1
+            else:
+                lefts[child_id] = counter
+                counter += 1
+                stack.append((child_id, level + 1, iter(children.get(child_id, ()))))
+
+    if len(positions) != total:
+        raise ValueError(
+            _("%(count)s nodes are not reachable from a root node.")
+            % {"count": total - len(positions)}
+        )
+    return positions
+
+
+class TreeService:
+    @staticmethod
+    def _renumber(
+        tree_ids: Optional[Iterable[int]] = None,
+        batch_size: int = 1000,
+        placements: Sequence[TreeMove] = (),
+        dry_run: bool = False,
+    ) -> int:
+        """
+        Recompute the nested set columns from the ``parent`` links in a single pass.
+
+        Unlike ``Employee.objects.rebuild()``, which issues a query per node, this
+        reads the affected rows once ordered by ``lft``, so siblings keep their
+        current order, and only writes back the rows whose position changed.
+        Existing roots keep their tree id; rows that were inserted without a tree
+        (``tree_id=0``) or whose placement was deferred (``lft=0``, see
+        ``TreeWriteService``) are appended after their existing siblings.
+
+        Args:
+            tree_ids: Renumber only these trees; all trees when None.
+            batch_size: The number of rows per UPDATE statement.
+            placements: Moves whose ``parent`` is already saved; their nodes are
+                put at the requested position among their siblings.
+            dry_run: Only count the rows whose position would change.
+
+        Returns:
+            int: The number of updated rows (or rows to update, for a dry run).
+
+        Raises:
+            ValueError: If some rows are not reachable from a root.
+        """
+        queryset = Employee.objects.all()
+        if tree_ids is not None:
+            queryset = queryset.filter(tree_id__in=list(tree_ids))
+        rows = (
+            queryset.annotate(
+                unplaced=Case(
+                    When(Q(tree_id=0) | Q(lft=0), then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+            .order_by("unplaced", "tree_id", "lft")
+            .values_list("id", "parent_id", "tree_id", "lft", "rght", "level")
+        )
+
+        with transaction.atomic():
+            current = {}
+            pairs = []
+            root_tree_ids = {}
+            claimed = set()
+            for node_id, parent_id, tree_id, lft, rght, level in rows.iterator(
+                chunk_size=10000
+            ):
+                current[node_id] = TreePosition(tree_id, lft, rght, level)
+                pairs.append((node_id, parent_id))
+                if parent_id is None and tree_id and tree_id not in claimed:
+                    root_tree_ids[node_id] = tree_id
+                    claimed.add(tree_id)
+            if placements:
+                pairs = TreeService._place(pairs, placements)
+
+            max_tree_id = Employee.objects.aggregate(Max("tree_id"))["tree_id__max"]
+            positions = compute_tree_positions(
+                pairs,
+                first_tree_id=(max_tree_id or 0) + 1,
+                root_tree_ids=root_tree_ids,
+            )
+
+            changed = [
+                Employee(id=node_id, **position._asdict())
+                for node_id, position in positions.items()
+                if current[node_id] != position
+            ]
+            if dry_run:
+                return len(changed)
+            Employee.objects.bulk_update(
+                changed, ["tree_id", "lft", "rght", "level"], batch_size=batch_size
+            )
+        if changed:
+            bump_generation("employee")
+            bump_generation("tree")
+        return len(changed)
+
+    @staticmethod
+    def _lock_trees(tree_ids: Iterable[int], shared: bool = False) -> None:
+        """
+        Lock trees against concurrent restructuring until the end of the
+        transaction, in ``tree_id`` order so that two writers never deadlock.
+
+        On PostgreSQL these are transaction-level advisory locks keyed on the
+        tree id, which don't touch the rows themselves; elsewhere the roots of
+        the trees are locked. The time spent waiting is recorded as the
+        ``tree_lock_wait_us`` metric.
+
+        Args:
+            tree_ids: The trees to lock.
+            shared: Take a shared lock, which only excludes the exclusive ones:
+                writers that defer the placement of their rows to a later
+                renumbering hold it so that they don't block each other.
+        """
+        tree_ids = sorted(set(tree_ids))
+        if not tree_ids:
+            return
+        started = time.perf_counter()
+        connection = connections[router.db_for_write(Employee)]
+        if connection.vendor == "postgresql":
+            function = (
+                "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+            )
+            with connection.cursor() as cursor:
+                for tree_id in tree_ids:
+                    cursor.execute(
+                        f"SELECT {function}(%s, %s)", [TREE_LOCK_NAMESPACE, tree_id]
+                    )
+        else:
+            list(
+                Employee.objects.select_for_update()
+                .filter(tree_id__in=tree_ids, parent__isnull=True)
+                .order_by("tree_id")
+                .values_list("id", flat=True)
+            )
+        record_metric(
+            "tree_lock_wait_us", int((time.perf_counter() - started) * 1_000_000)
+        )
+
+    @staticmethod
+    def _try_lock_tree(tree_id: int) -> bool:
+        """
+        Lock a tree like ``_lock_trees`` if nobody else holds a lock on it.
+
+        Returns:
+            bool: Whether the lock was taken. Databases without advisory locks
+                always return True.
+        """
+        connection = connections[router.db_for_write(Employee)]
+        if connection.vendor != "postgresql":
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_try_advisory_xact_lock(%s, %s)",
+                [TREE_LOCK_NAMESPACE, tree_id],
+            )
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def _place(
+        pairs: List[Tuple[UUID, Optional[UUID]]], placements: Sequence[TreeMove]
+    ) -> List[Tuple[UUID, Optional[UUID]]]:
+        """
+        Reorder ``(node_id, parent_id)`` pairs so that, applied one after the
+        other, every placement puts its node at its position among its siblings.
+        """
+        children = defaultdict(list)
+        for node_id, parent_id in pairs:
+            children[parent_id].append(node_id)
+        for move in placements:
+            siblings = children[move.parent_id]
+            siblings.remove(move.id)
+            position = len(siblings) if move.position is None else move.position
+            siblings.insert(max(0, min(position, len(siblings))), move.id)
+        return [
+            (node_id, parent_id)
+            for parent_id, node_ids in children.items()
+            for node_id in node_ids
+        ]
+
+    @staticmethod
+    def _apply_moves(moves: Sequence[TreeMove]) -> Set[Optional[UUID]]:
+        """
+        Apply a batch of moves in one transaction.
+
+        Every affected tree is locked (in ``tree_id`` order) for the whole
+        batch, the new parents are saved with one UPDATE, and the nested set
+        columns are recomputed by a single ``_renumber`` pass that also puts
+        every node at its requested position, instead of one MPTT move per node.
+
+        Args:
+            moves: The moves, applied in order.
+
+        Returns:
+            Set[Optional[UUID]]: The old and new parents of the moved employees.
+
+        Raises:
+            ValueError: If an employee doesn't exist or if a move would make
+                someone report to themselves.
+        """
+        ids = {move.id for move in moves} | {
+            move.parent_id for move in moves if move.parent_id is not None
+        }
+
+        with transaction.atomic():
+            locked = set()
+            while True:
+                nodes = {
+                    node_id: (parent_id, tree_id)
+                    for node_id, parent_id, tree_id in Employee.objects.filter(
+                        pk__in=ids
+                    ).values_list("id", "parent_id", "tree_id")
+                }
+                if len(nodes) != len(ids):
+                    raise ValueError(_("Employee not found"))
+                tree_ids = {tree_id for _parent_id, tree_id in nodes.values()}
+                if tree_ids <= locked:
+                    break
+                # A concurrent move may have changed the trees in the meantime,
+                # hence the second look once the trees are locked.
+                TreeService._lock_trees(tree_ids - locked)
+                locked |= tree_ids
+
+            parents = {move.id: move.parent_id for move in moves}
+            affected = {nodes[node_id][0] for node_id in parents} | set(
+                parents.values()
+            )
+            Employee.objects.bulk_update(
+                [
+                    Employee(id=node_id, parent_id=parent_id)
+                    for node_id, parent_id in parents.items()
+                ],
+                ["parent"],
+            )
+            try:
+                TreeService._renumber(tree_ids, placements=moves)
+            except ValueError:
+                raise ValueError(_("An employee can't report to someone below them."))
+
+        bump_generation("employee")
+        bump_generation("tree")
+        return affected
+
+    @staticmethod
+    def _move_nodes(moves: Sequence[TreeMove]) -> dict:
+        """
+        Apply a batch of drag-and-drop moves with ``_apply_moves``.
+
+        Args:
+            moves: The moves, applied in order.
+
+        Returns:
+            dict: ``{"levels": [...], "descendants": {...}}``: the first page of
+                the reports of every old and new parent, as returned by
+                ``_get_tree_level``, and the new headcount of them and of their
+                ancestors, so the client re-renders only what changed.
+
+        Raises:
+            ValueError: If an employee doesn't exist, if there are too many
+                moves, or if a move would make someone report to themselves.
+        """
+        if len(moves) > MAX_TREE_MOVES:
+            raise ValueError(
+                _("At most %(count)s moves are allowed at once.")
+                % {"count": MAX_TREE_MOVES}
+            )
+        affected = TreeService._apply_moves(moves)
+
+        levels = [
+            TreeService._get_tree_level(parent_id)
+            for parent_id in sorted(affected, key=lambda node_id: str(node_id or ""))
+        ]
+        ranges = Q()
+        for tree_id, lft, rght in Employee.objects.filter(
+            pk__in=[node_id for node_id in affected if node_id is not None]
+        ).values_list("tree_id", "lft", "rght"):
+            ranges |= Q(tree_id=tree_id, lft__lte=lft, rght__gte=rght)
+        descendants = {}
+        if ranges:
+            descendants = {
+                str(node_id): (rght - lft - 1) // 2
+                for node_id, lft, rght in Employee.objects.filter(ranges).values_list(
+                    "id", "lft", "rght"
+                )
+            }
+        return {"levels": levels, "descendants": descendants}
+
+    @staticmethod
+    def _node_to_dict(row: Tuple) -> dict:
+        """
+        Serialize a ``TREE_NODE_FIELDS`` row for the tree API.
+
+        Whether a node has reports and how many people are below it follow from
+        its ``lft``/``rght`` range alone: a subtree of ``n`` nodes spans ``2n``
+        consecutive numbers.
+        """
+        node_id, full_name, position_name, parent_id, tree_id, lft, rght, level = row
+        return {
+            "id": str(node_id),
+            "full_name": full_name,
+            "position_name": position_name,
+            "parent_id": str(parent_id) if parent_id else None,
+            "level": level,
+            "has_children": rght - lft > 1,
+            "descendants": (rght - lft - 1) // 2,
+        }
+
+    @staticmethod
+    def _get_tree_level(
+        parent_id: Optional[UUID] = None,
+        depth: int = 1,
+        after: Optional[int] = None,
+        limit: int = 200,
+    ) -> dict:
+        """
+        Return one page of the direct reports of an employee (or of the roots)
+        and, for ``depth > 1``, the levels below them.
+
+        Every level is read with one ``parent_id IN (...)`` lookup, so the cost
+        depends on the number of returned nodes only, never on the size of the
+        organisation. Nested levels stop being loaded once ``MAX_TREE_NODES``
+        nodes are returned; nodes whose reports are loaded carry a
+        ``children`` list, the others are expanded by a later request.
+
+        Args:
+            parent_id: The employee whose reports to return; the roots when None.
+            depth: How many levels to return (at most ``MAX_TREE_DEPTH``).
+            after: The ``next`` value of the previous page of the first level.
+            limit: The number of nodes on the first level.
+
+        Returns:
+            dict: ``{"parent": ..., "nodes": [...], "next": ...}``.
+
+        Raises:
+            ValueError: If the parent employee doesn't exist.
+        """
+        depth = max(1, min(depth, MAX_TREE_DEPTH))
+        employees = Employee.objects.values_list(*TREE_NODE_FIELDS)
+
+        if parent_id is None:
+            level = employees.filter(parent__isnull=True).order_by("tree_id")
+            key = "tree_id"
+        else:
+            if not Employee.objects.filter(pk=parent_id).exists():
+                raise ValueError(_("Employee not found"))
+            level = employees.filter(parent_id=parent_id).order_by("lft")
+            key = "lft"
+        if after is not None:
+            level = level.filter(**{f"{key}__gt": after})
+
+        rows = list(level[: limit + 1])
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = rows[-1][TREE_NODE_FIELDS.index(key)]
+
+        nodes = [TreeService._node_to_dict(row) for row in rows]
+        total = len(nodes)
+        frontier = {node["id"]: node for node in nodes if node["has_children"]}
+        for _level in range(depth - 1):
+            if not frontier:
+                break
+            # One row past the room left tells whether the level fits, without
+            # reading the whole level of a wide organisation.
+            room = MAX_TREE_NODES - total
+            children = list(
+                employees.filter(parent_id__in=list(frontier)).order_by(
+                    "tree_id", "lft"
+                )[: room + 1]
+            )
+            if len(children) > room:
+                break
+            total += len(children)
+            for node in frontier.values():
+                node["children"] = []
+            next_frontier = {}
+            for row in children:
+                child = TreeService._node_to_dict(row)
+                frontier[child["parent_id"]]["children"].append(child)
+                if child["has_children"]:
+                    next_frontier[child["id"]] = child
+            frontier = next_frontier
+
+        return {
+            "parent": str(parent_id) if parent_id else None,
+            "nodes": nodes,
+            "next": next_after,
+        }
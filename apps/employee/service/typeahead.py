@@ -0,0 +1,437 @@
+import re
+import time
+import heapq
+import threading
+from uuid import UUID
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from apps.employee.models import Employee
+from apps.employee.service.caching import bump_generation, get_generation
+
+# Trigram lookups stop collecting candidates once this many are found; the
+# rarest trigrams of the query are used first, so the best matches are kept.
+MAX_TRIGRAM_CANDIDATES = 500
+MIN_TRIGRAM_SIMILARITY = 0.3
+WORD_SEPARATORS = re.compile(r"[^\w]+")
+# Every change to the indexed employees bumps the "typeahead" generation and is
+# published under it, so other processes apply the same changes in the same
+# order. A process further behind than MAX_TYPEAHEAD_DELTAS changes, or than the
+# time the changes are kept, rebuilds its index instead.
+TYPEAHEAD_DELTA_KEY = "typeahead:delta:{generation}"
+TYPEAHEAD_DELTA_TIMEOUT = 60 * 60
+MAX_TYPEAHEAD_DELTAS = 1000
+# How long (seconds) a missing change is waited for: another process may have
+# bumped the generation and not published the change yet.
+TYPEAHEAD_DELTA_WAIT = 10
+# Published instead of the changes by writers that bypass the model signals.
+REBUILD = "rebuild"
+
+TypeaheadChange = Tuple[UUID, Optional[str], Optional[str]]
+
+
+class TypeaheadMatch(NamedTuple):
+    id: UUID
+    full_name: str
+    email: str
+    score: float
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def _trigrams(value: str) -> Set[str]:
+    """
+    Split a string into trigrams the way pg_trgm does: words are separated by
+    anything but letters and digits, and padded with two spaces in front and one
+    behind.
+    """
+    grams = set()
+    for word in WORD_SEPARATORS.split(value.lower()):
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _trigram_text(full_name: str, email: str) -> str:
+    # The email domain is shared by most employees, so it would only add huge
+    # posting lists that select nothing.
+    return f"{full_name} {email.partition('@')[0]}"
+
+
+class TypeaheadIndex:
+    """
+    An in-memory prefix and trigram index over employee names and emails.
+
+    Entries live in parallel arrays addressed by a slot number: the UUIDs are
+    packed into one ``bytearray``, names and emails are plain lists, and a
+    ``bytearray`` flags deleted slots. The prefix index is a sorted list of keys
+    (the full name, every later word of it, and the email) with a parallel
+    ``array`` of slots, searched with ``bisect``. The trigram index maps each
+    trigram to an ``array`` of slots.
+
+    Updates append a new slot and retire the old one instead of rewriting the
+    arrays; their prefix keys go to a small sorted list searched alongside the
+    big one. ``_compact`` drops the retired slots and merges the new keys once
+    either grows past a share of the index.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._ids = bytearray()
+        self._names: List[str] = []
+        self._emails: List[str] = []
+        self._alive = bytearray()
+        self._slots: Dict[UUID, int] = {}
+        self._keys: List[str] = []
+        self._key_slots = array("I")
+        self._new_keys: List[Tuple[str, int]] = []
+        self._trigrams: Dict[str, array] = {}
+        self.generation: Optional[int] = None
+        self.checked_at = 0.0
+        self._missing: Optional[Tuple[int, float]] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @staticmethod
+    def _prefix_keys(full_name: str, email: str) -> Iterable[str]:
+        name = _normalize(full_name)
+        yield name
+        yield from name.split()[1:]
+        if email:
+            yield email.lower()
+
+    def _append(self, employee_id: UUID, full_name: str, email: str) -> int:
+        slot = len(self._names)
+        self._ids += employee_id.bytes
+        self._names.append(full_name)
+        self._emails.append(email)
+        self._alive.append(1)
+        self._slots[employee_id] = slot
+        trigrams = self._trigrams
+        for gram in _trigrams(_trigram_text(full_name, email)):
+            postings = trigrams.get(gram)
+            if postings is None:
+                postings = trigrams[gram] = array("I")
+            postings.append(slot)
+        return slot
+
+    def build(self, rows: Iterable[Tuple[UUID, str, str]]) -> None:
+        """
+        Replace the contents of the index.
+
+        Args:
+            rows: ``(id, full_name, email)`` tuples.
+        """
+        fresh = TypeaheadIndex()
+        keys = []
+        for employee_id, full_name, email in rows:
+            slot = fresh._append(employee_id, full_name, email)
+            keys.extend((key, slot) for key in self._prefix_keys(full_name, email))
+        keys.sort()
+        fresh._keys = [key for key, _ in keys]
+        fresh._key_slots = array("I", (slot for _, slot in keys))
+
+        with self._lock:
+            self._ids, self._names, self._emails = (
+                fresh._ids,
+                fresh._names,
+                fresh._emails,
+            )
+            self._alive, self._slots = fresh._alive, fresh._slots
+            self._keys, self._key_slots = fresh._keys, fresh._key_slots
+            self._new_keys = []
+            self._trigrams = fresh._trigrams
+            self._missing = None
+            self.checked_at = time.monotonic()
+
+    def load(self) -> None:
+        """
+        Build the index from a single scan of the employee table.
+
+        Changes published while the table is read are applied again by the next
+        ``catch_up``, which is harmless.
+        """
+        generation = get_generation("typeahead")
+        self.build(
+            Employee.objects.order_by()
+            .values_list("id", "full_name", "email")
+            .iterator()
+        )
+        self.generation = generation
+
+    def upsert(self, employee_id: UUID, full_name: str, email: str) -> None:
+        """
+        Add an employee, or replace the indexed name and email of an existing one.
+        """
+        with self._lock:
+            old = self._slots.get(employee_id)
+            if old is not None:
+                if (self._names[old], self._emails[old]) == (full_name, email):
+                    return
+                self._alive[old] = 0
+            slot = self._append(employee_id, full_name, email)
+            for key in self._prefix_keys(full_name, email):
+                insort(self._new_keys, (key, slot))
+            self._compact_if_needed()
+
+    def remove(self, employee_id: UUID) -> None:
+        """
+        Remove an employee from the index.
+        """
+        with self._lock:
+            slot = self._slots.pop(employee_id, None)
+            if slot is not None:
+                self._alive[slot] = 0
+                self._compact_if_needed()
+
+    def catch_up(self) -> bool:
+        """
+        Apply the changes published since the index was built or last caught up,
+        in generation order, whichever process made them.
+
+        Returns:
+            bool: False if the index must be rebuilt instead: it is too far
+            behind, a change is no longer available, or a writer bypassed the
+            signals. A missing change is waited for ``TYPEAHEAD_DELTA_WAIT``
+            seconds first, as it may still be being published; the changes
+            after it are applied once it arrives.
+        """
+        generation = self.generation
+        if generation is None:
+            return False
+        current = get_generation("typeahead")
+        if current - generation > MAX_TYPEAHEAD_DELTAS:
+            return False
+        generations = range(generation + 1, current + 1)
+        deltas = cache.get_many(
+            [TYPEAHEAD_DELTA_KEY.format(generation=number) for number in generations]
+        )
+        with self._lock:
+            for number in generations:
+                if number <= self.generation:
+                    continue
+                delta = deltas.get(TYPEAHEAD_DELTA_KEY.format(generation=number))
+                if delta is None:
+                    if self._missing is None or self._missing[0] != number:
+                        self._missing = (number, time.monotonic())
+                    return time.monotonic() - self._missing[1] < TYPEAHEAD_DELTA_WAIT
+                if delta == REBUILD:
+                    return False
+                for employee_id, full_name, email in delta:
+                    if full_name is None:
+                        self.remove(employee_id)
+                    else:
+                        self.upsert(employee_id, full_name, email)
+                self.generation = number
+        return True
+
+    def _compact_if_needed(self) -> None:
+        if len(self._names) - len(self._slots) > max(
+            len(self._slots) // 4, 1000
+        ) or len(self._new_keys) > max(len(self._keys) // 64, 1000):
+            self._compact()
+
+    def _compact(self) -> None:
+        rows = [
+            (UUID(bytes=bytes(self._ids[slot * 16 : slot * 16 + 16])), name, email)
+            for slot, (name, email) in enumerate(zip(self._names, self._emails))
+            if self._alive[slot]
+        ]
+        self.build(rows)
+
+    def _match(self, slot: int, score: float) -> TypeaheadMatch:
+        return TypeaheadMatch(
+            UUID(bytes=bytes(self._ids[slot * 16 : slot * 16 + 16])),
+            self._names[slot],
+            self._emails[slot],
+            score,
+        )
+
+    def _prefix_matches(self, query: str) -> Iterator[Tuple[str, int]]:
+        """
+        Yield the ``(key, slot)`` pairs of the keys starting with ``query``, in
+        key order, from both the built and the newly added keys.
+        """
+        start = bisect_left(self._keys, query)
+        built = zip(
+            islice(self._keys, start, None), islice(self._key_slots, start, None)
+        )
+        new = islice(self._new_keys, bisect_left(self._new_keys, (query,)), None)
+        for key, slot in heapq.merge(built, new):
+            if not key.startswith(query):
+                return
+            yield key, slot
+
+    def search(self, query: str, limit: int = 10) -> List[TypeaheadMatch]:
+        """
+        Find the employees whose name or email best match a partial query.
+
+        Prefix matches come first (the start of the name or email before a later
+        word of the name), then, if there aren't enough of them, employees that
+        share most trigrams with the query, which tolerates typos.
+
+        Args:
+            query: What the user typed so far.
+            limit: The maximum number of matches.
+
+        Returns:
+            List[TypeaheadMatch]: The best matches, best first.
+        """
+        query = _normalize(query)
+        if not query or limit <= 0:
+            return []
+
+        with self._lock:
+            found: Dict[int, float] = {}
+            # Collect a few more than needed: whole-name prefixes outrank
+            # later-word prefixes that may sort before them.
+            for key, slot in self._prefix_matches(query):
+                if len(found) >= limit * 4:
+                    break
+                if self._alive[slot] and slot not in found:
+                    name = _normalize(self._names[slot])
+                    found[slot] = 2.0 if name.startswith(query) or key == query else 1.5
+
+            query_grams = _trigrams(query)
+            if len(found) < limit and len(query) >= 3:
+                postings = sorted(
+                    (
+                        self._trigrams[gram]
+                        for gram in query_grams
+                        if gram in self._trigrams
+                    ),
+                    key=len,
+                )
+                candidates: Set[int] = set()
+                for slots in postings:
+                    room = MAX_TRIGRAM_CANDIDATES - len(candidates)
+                    if room <= 0:
+                        break
+                    candidates.update(slots if len(slots) <= room else slots[:room])
+                scored = []
+                for slot in candidates:
+                    if not self._alive[slot] or slot in found:
+                        continue
+                    grams = _trigrams(
+                        _trigram_text(self._names[slot], self._emails[slot])
+                    )
+                    # pg_trgm word similarity: the share of the query's trigrams
+                    # present in the entry.
+                    score = len(query_grams & grams) / len(query_grams)
+                    if score >= MIN_TRIGRAM_SIMILARITY:
+                        scored.append((score, slot))
+                for score, slot in heapq.nlargest(limit - len(found), scored):
+                    found[slot] = score
+
+            matches = [self._match(slot, score) for slot, score in found.items()]
+        matches.sort(key=lambda match: (-match.score, match.full_name))
+        return matches[:limit]
+
+
+_index = TypeaheadIndex()
+_build_lock = threading.Lock()
+_building = False
+
+
+def _build_index() -> None:
+    global _building
+    try:
+        _index.load()
+    finally:
+        _building = False
+        connections.close_all()
+
+
+def warm_typeahead_index() -> None:
+    """
+    Start building this process's type-ahead index in a background thread,
+    unless a build is already running.
+    """
+    global _building
+    with _build_lock:
+        if _building:
+            return
+        _building = True
+    threading.Thread(target=_build_index, name="typeahead-index", daemon=True).start()
+
+
+def get_typeahead_index() -> Optional[TypeaheadIndex]:
+    """
+    Return this process's type-ahead index, or None while it is being built.
+
+    Saves and deletes made in this process are applied as soon as they commit.
+    Changes made elsewhere are applied from the published deltas at most every
+    ``EMPLOYEE_TYPEAHEAD_MAX_STALENESS`` seconds; the index is only rebuilt, in
+    the background while the current one keeps serving, when they can't be.
+
+    Returns:
+        Optional[TypeaheadIndex]: The index, if it has been built.
+    """
+    if _index.generation is None:
+        warm_typeahead_index()
+        return None
+
+    max_staleness = getattr(settings, "EMPLOYEE_TYPEAHEAD_MAX_STALENESS", 300)
+    if time.monotonic() - _index.checked_at >= max_staleness:
+        _index.checked_at = time.monotonic()
+        if not _index.catch_up():
+            warm_typeahead_index()
+    return _index
+
+
+def publish_typeahead_changes(changes: List[TypeaheadChange]) -> None:
+    """
+    Publish changes to the indexed employees to every process, and apply them
+    and any earlier ones to this process's index.
+
+    Args:
+        changes: ``(id, full_name, email)`` of saved employees and
+            ``(id, None, None)`` of deleted ones.
+    """
+    generation = bump_generation("typeahead")
+    cache.set(
+        TYPEAHEAD_DELTA_KEY.format(generation=generation),
+        changes,
+        TYPEAHEAD_DELTA_TIMEOUT,
+    )
+    if _index.generation is not None and not _index.catch_up():
+        warm_typeahead_index()
+
+
+def invalidate_typeahead_index() -> None:
+    """
+    Make every process rebuild its index, after employees were written without
+    the model signals (bulk inserts, imports, wipes).
+    """
+    generation = bump_generation("typeahead")
+    cache.set(
+        TYPEAHEAD_DELTA_KEY.format(generation=generation),
+        REBUILD,
+        TYPEAHEAD_DELTA_TIMEOUT,
+    )
+
+
+def index_employee(employee: Employee) -> None:
+    """
+    Publish a saved employee once the transaction commits.
+    """
+    change = (employee.pk, employee.full_name, employee.email)
+    transaction.on_commit(lambda: publish_typeahead_changes([change]))
+
+
+def unindex_employee(employee: Employee) -> None:
+    """
+    Publish a deleted employee once the transaction commits.
+    """
+    change = (employee.pk, None, None)
+    transaction.on_commit(lambda: publish_typeahead_changes([change]))
@@ -0,0 +1,179 @@
+from uuid import UUID
+from typing import Callable, Optional
+
+from django.db import connections, router, transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils.translation import gettext_lazy as _
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.positions import invalidate_position_registry
+from apps.employee.service.tree import TreeService
+from apps.employee.service.typeahead import invalidate_typeahead_index
+
+
+class EmployeeWipeService:
+    """
+    Delete employees without Django's deletion collector.
+
+    ``QuerySet.delete()`` loads every instance to emit signals and to run the
+    SET_NULL cascades of ``parent`` and ``position``, and MPTT closes the gap in
+    the tree after every node. The methods below issue plain range deletes
+    (``QuerySet._raw_delete``) in an order that never leaves a dangling
+    reference, so none of that work is needed.
+    """
+
+    @staticmethod
+    def _truncate() -> bool:
+        """
+        Empty the employee and position tables with a single TRUNCATE.
+
+        Returns:
+            bool: False if the database doesn't support TRUNCATE (not PostgreSQL).
+        """
+        using = router.db_for_write(Employee)
+        connection = connections[using]
+        if connection.vendor != "postgresql":
+            return False
+        quote = connection.ops.quote_name
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                "TRUNCATE {}, {}".format(
+                    quote(Employee._meta.db_table), quote(Position._meta.db_table)
+                )
+            )
+        bump_generation("employee")
+        bump_generation("tree")
+        invalidate_typeahead_index()
+        bump_generation("position")
+        invalidate_position_registry()
+        return True
+
+    @staticmethod
+    def _delete_in_chunks(
+        chunk_size: int = 10000,
+        include_positions: bool = True,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Delete all employees in chunks, deepest level first, so no chunk removes a
+        manager whose reports still exist. Every chunk is committed on its own to
+        keep lock times short.
+
+        Args:
+            chunk_size: The number of rows deleted per statement.
+            include_positions: Delete the positions once the employees are gone.
+            progress: Called with the total number of deleted rows after every chunk.
+
+        Returns:
+            int: The number of deleted employees.
+        """
+        using = router.db_for_write(Employee)
+        deleted = 0
+        max_level = Employee.objects.aggregate(Max("level"))["level__max"] or 0
+
+        for level in range(max_level, -1, -1):
+            while True:
+                with transaction.atomic(using=using):
+                    ids = list(
+                        Employee.objects.filter(level__gte=level)
+                        .order_by()
+                        .values_list("pk", flat=True)[:chunk_size]
+                    )
+                    if not ids:
+                        break
+                    # Nested set values may be stale (e.g. after an interrupted
+                    # import); detach any report still pointing into the chunk.
+                    Employee.objects.filter(parent_id__in=ids).exclude(
+                        pk__in=ids
+                    ).update(parent=None)
+                    deleted += Employee.objects.filter(pk__in=ids)._raw_delete(using)
+                if progress is not None:
+                    progress(deleted)
+
+        bump_generation("employee")
+        bump_generation("tree")
+        invalidate_typeahead_index()
+        if include_positions:
+            with transaction.atomic(using=using):
+                Position.objects.all()._raw_delete(using)
+            bump_generation("position")
+            invalidate_position_registry()
+        return deleted
+
+    @staticmethod
+    def _delete_tree(tree_id: int) -> int:
+        """
+        Delete a whole tree with one range delete on ``tree_id``.
+
+        Args:
+            tree_id: The tree to delete.
+
+        Returns:
+            int: The number of deleted employees.
+        """
+        using = router.db_for_write(Employee)
+        with transaction.atomic(using=using):
+            deleted = Employee.objects.filter(tree_id=tree_id)._raw_delete(using)
+        bump_generation("employee")
+        bump_generation("tree")
+        invalidate_typeahead_index()
+        return deleted
+
+    @staticmethod
+    def _delete_subtree(employee_id: UUID) -> int:
+        """
+        Delete an employee and everyone below them with one range delete on
+        ``lft``/``rght``, then renumber the rest of the tree.
+
+        Reports whose placement is still queued (``lft=0``, see
+        ``TreeWriteService``) are outside the range; they are deleted with the
+        manager they were queued under.
+
+        Args:
+            employee_id: The root of the subtree to delete.
+
+        Returns:
+            int: The number of deleted employees.
+
+        Raises:
+            ValueError: If the employee doesn't exist.
+        """
+        using = router.db_for_write(Employee)
+        with transaction.atomic(using=using):
+            locked = None
+            while True:
+                node = (
+                    Employee.objects.filter(pk=employee_id)
+                    .values("tree_id", "lft", "rght", "parent_id")
+                    .first()
+                )
+                if node is None:
+                    raise ValueError(_("Employee not found"))
+                if node["tree_id"] == locked:
+                    break
+                # The employee may have been moved to another tree in the
+                # meantime, hence the second look once the tree is locked.
+                TreeService._lock_trees([node["tree_id"]])
+                locked = node["tree_id"]
+
+            deleted = Employee.objects.filter(
+                tree_id=locked, lft__gte=node["lft"], rght__lte=node["rght"]
+            )._raw_delete(using)
+            while True:
+                orphans = Employee.objects.filter(
+                    ~Exists(Employee.objects.filter(pk=OuterRef("parent_id"))),
+                    tree_id=locked,
+                    lft=0,
+                    parent__isnull=False,
+                )
+                orphans_deleted = orphans._raw_delete(using)
+                if not orphans_deleted:
+                    break
+                deleted += orphans_deleted
+            if node["parent_id"] is not None:
+                TreeService._renumber([locked])
+        bump_generation("employee")
+        bump_generation("tree")
+        invalidate_typeahead_index()
+        return deleted
@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.dispatch import receiver
+from django.db.models.signals import post_delete, post_save
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.orgchart import OrgChartService
+from apps.employee.service.positions import invalidate_position_registry
+from apps.employee.service.typeahead import index_employee, unindex_employee
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def invalidate_employee_caches(sender, **kwargs) -> None:
+    """
+    Invalidate cached values derived from employees or positions once the
+    transaction commits, so a page rendered before the change is not cached
+    under the new generation.
+    """
+    name = sender._meta.model_name
+    transaction.on_commit(lambda: bump_generation(name))
+
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def reload_position_registry(sender, **kwargs) -> None:
+    """
+    Make this process reload its position registry once the transaction
+    commits; other processes notice the bumped generation.
+    """
+    transaction.on_commit(invalidate_position_registry)
+
+
+@receiver(post_save, sender=Employee)
+def update_typeahead_index(sender, instance: Employee, **kwargs) -> None:
+    """
+    Keep this process's type-ahead index in step with saved employees.
+    """
+    index_employee(instance)
+
+
+@receiver(post_delete, sender=Employee)
+def remove_from_typeahead_index(sender, instance: Employee, **kwargs) -> None:
+    """
+    Drop deleted employees from this process's type-ahead index.
+    """
+    unindex_employee(instance)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_org_chart(sender, instance: Employee, **kwargs) -> None:
+    """
+    Invalidate the org chart snapshots that contained the employee before the
+    change or contain it now, once the transaction commits.
+    """
+    node_ids = OrgChartService._get_changed_node_ids(
+        instance, deleted=kwargs["signal"] is post_delete
+    )
+    transaction.on_commit(lambda: OrgChartService._invalidate(node_ids))
@@ -0,0 +1,25 @@
+from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+
+from apps.employee.models import Job
+from apps.employee.service.jobs import RETRYABLE_ERRORS, JobService
+
+
+@shared_task(bind=True, max_retries=5)
+def run_job(self, job_id: str) -> None:
+    """
+    Run a background job (see ``JobService``).
+
+    A job that reaches the soft time limit goes on from its checkpoint in a new
+    task; one that hits a database error is retried from it with an
+    exponential backoff, and fails once the retries are exhausted.
+    """
+    try:
+        JobService._run(job_id)
+    except SoftTimeLimitExceeded:
+        run_job.delay(job_id)
+    except RETRYABLE_ERRORS as error:
+        if self.request.retries >= self.max_retries:
+            JobService._finish(job_id, Job.Status.FAILED, error=str(error))
+            raise
+        raise self.retry(exc=error, countdown=10 * 2**self.request.retries)
@@ -0,0 +1,91 @@
+import unittest
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.employee.models import Employee
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.counting import (
+    CachedCount,
+    CountingPaginator,
+    EstimatedCount,
+    ExactCount,
+    get_count_strategy,
+)
+
+
+class CountStrategyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            Employee.objects.create(
+                full_name="Employee {}".format(number),
+                email="employee{}@example.com".format(number),
+                hire_date=date(2020 + number, 1, 1),
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.hired_late = Employee.objects.filter(hire_date__year__gte=2023)
+
+    def test_exact(self):
+        self.assertEqual(ExactCount().count(Employee.objects.all()), (5, False))
+        self.assertEqual(ExactCount().count(self.hired_late), (2, False))
+
+    def test_cached_until_the_generation_changes(self):
+        strategy = CachedCount()
+        self.assertEqual(strategy.count(self.hired_late), (2, False))
+
+        Employee.objects.filter(hire_date__year=2020).update(hire_date=date(2024, 1, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.count(self.hired_late), (2, False))
+        # Other filters are counted on their own.
+        self.assertEqual(strategy.count(Employee.objects.all()), (5, False))
+
+        bump_generation("employee")
+        self.assertEqual(strategy.count(self.hired_late), (3, False))
+
+    def test_estimate_falls_back_to_an_exact_count(self):
+        with self.assertNumQueries(1 if connection.vendor != "postgresql" else 2):
+            self.assertEqual(EstimatedCount().count(self.hired_late), (2, False))
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "planner estimates")
+    def test_estimate(self):
+        count, is_estimate = EstimatedCount(threshold=0).count(self.hired_late)
+
+        self.assertTrue(is_estimate)
+        self.assertGreaterEqual(count, 0)
+        # The whole table is estimated from its statistics, which a table that
+        # was never analyzed doesn't have (reltuples is -1): it is counted.
+        with CaptureQueriesContext(connection) as queries:
+            EstimatedCount(threshold=0).count(Employee.objects.all())
+        self.assertIn("reltuples", queries[0]["sql"])
+
+    def test_settings(self):
+        with override_settings(EMPLOYEE_COUNT_STRATEGY="exact"):
+            self.assertIs(type(get_count_strategy()), ExactCount)
+        with override_settings(
+            EMPLOYEE_COUNT_STRATEGY="cached", EMPLOYEE_COUNT_CACHE_TIMEOUT=5
+        ):
+            self.assertEqual(get_count_strategy().timeout, 5)
+        with override_settings(
+            EMPLOYEE_COUNT_STRATEGY="estimated", EMPLOYEE_COUNT_ESTIMATE_THRESHOLD=7
+        ):
+            self.assertEqual(get_count_strategy().threshold, 7)
+
+    def test_paginator(self):
+        class Estimate(ExactCount):
+            def count(self, queryset):
+                return 1000, True
+
+        paginator = CountingPaginator(
+            Employee.objects.order_by("hire_date"), 2, count_strategy=Estimate()
+        )
+
+        self.assertEqual(paginator.num_pages, 500)
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertEqual(len(paginator.page(2)), 2)
@@ -0,0 +1,190 @@
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employee.models import Employee
+from apps.employee.service import employees
+from apps.employee.service.employees import EmployeeService
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.positions import invalidate_position_registry
+from apps.employee.service.tree import compute_tree_positions
+
+
+class OrgTestCase(TestCase):
+    """
+    An org of one tree: a -> (b -> (c -> (d, e), f), g), and h on its own.
+    """
+
+    parents = {
+        "a": None,
+        "b": "a",
+        "c": "b",
+        "d": "c",
+        "e": "c",
+        "f": "b",
+        "g": "a",
+        "h": None,
+    }
+
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        self.ids = {name: uuid.uuid4() for name in self.parents}
+        positions = compute_tree_positions(
+            (self.ids[name], self.ids[parent] if parent else None)
+            for name, parent in self.parents.items()
+        )
+        Employee.objects.bulk_create(
+            Employee(
+                id=self.ids[name],
+                full_name="Employee {}".format(name),
+                email="{}@example.com".format(name),
+                hire_date=date(2020, 1, 1),
+                parent_id=self.ids[parent] if parent else None,
+                **positions[self.ids[name]]._asdict(),
+            )
+            for name, parent in self.parents.items()
+        )
+
+    def get(self, name):
+        return Employee.objects.get(pk=self.ids[name])
+
+    def name(self, employee_id):
+        return next(name for name, pk in self.ids.items() if pk == employee_id)
+
+
+class OrgSummaryTest(OrgTestCase):
+    def test_summary(self):
+        employee = self.get("c")
+
+        with self.assertNumQueries(2):
+            summary = EmployeeService._get_org_summary(employee)
+
+        self.assertEqual([self.name(row.id) for row in summary.supervisors], ["a", "b"])
+        self.assertEqual(
+            [self.name(row.id) for row in summary.direct_reports], ["d", "e"]
+        )
+        self.assertEqual(summary.direct_report_count, 2)
+        self.assertEqual((summary.headcount, summary.depth), (2, 2))
+
+    def test_top_of_a_tree(self):
+        summary = EmployeeService._get_org_summary(self.get("a"))
+
+        self.assertEqual(list(summary.supervisors), [])
+        self.assertEqual((summary.headcount, summary.depth), (6, 0))
+        self.assertEqual(EmployeeService._get_org_summary(self.get("h")).headcount, 0)
+
+    @mock.patch.object(employees, "MAX_DIRECT_REPORTS", 1)
+    def test_long_report_lists_are_counted(self):
+        employee = self.get("a")
+
+        with self.assertNumQueries(3):
+            summary = EmployeeService._get_org_summary(employee)
+
+        self.assertEqual(len(summary.direct_reports), 1)
+        self.assertEqual(summary.direct_report_count, 2)
+
+    def test_model_chain(self):
+        self.assertEqual(
+            [self.name(row.pk) for row in self.get("d").get_supervisors()],
+            ["a", "b", "c"],
+        )
+
+    def test_detail_page(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        response = self.client.get(
+            reverse("employee:employee_detail", args=[self.ids["c"]])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [self.name(row.id) for row in response.context["supervisors"]], ["a", "b"]
+        )
+        self.assertEqual(response.context["headcount"], 2)
+        self.assertEqual(response.context["depth"], 2)
+
+
+class TransferReportsTest(OrgTestCase):
+    def assertParents(self, expected):
+        parents = dict(Employee.objects.values_list("pk", "parent_id"))
+        self.assertEqual(
+            {
+                name: self.name(parents[self.ids[name]])
+                if parents[self.ids[name]]
+                else None
+                for name in expected
+            },
+            expected,
+        )
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+
+    def test_reports_move_with_their_subtrees(self):
+        result = EmployeeService._transfer_reports(self.ids["b"], self.ids["g"])
+
+        self.assertEqual(result.moved, 2)
+        self.assertParents({"b": "a", "c": "g", "d": "c", "f": "g"})
+        new_manager = self.get("g")
+        self.assertEqual((new_manager.rght - new_manager.lft - 1) // 2, 4)
+
+    def test_the_manager_moves_too(self):
+        result = EmployeeService._transfer_reports(
+            self.ids["b"], self.ids["h"], include_manager=True
+        )
+
+        self.assertEqual(result.moved, 1)
+        self.assertParents({"a": None, "b": "h", "c": "b", "g": "a"})
+        self.assertEqual(self.get("d").tree_id, self.get("h").tree_id)
+
+    def test_reports_become_roots(self):
+        EmployeeService._transfer_reports(self.ids["c"], None)
+
+        self.assertParents({"d": None, "e": None})
+        self.assertEqual(len({self.get("d").tree_id, self.get("e").tree_id}), 2)
+
+    def test_nothing_to_move(self):
+        result = EmployeeService._transfer_reports(self.ids["h"], self.ids["a"])
+
+        self.assertEqual(result, (0, 0))
+
+    def test_invalid_transfers(self):
+        for manager, new_manager, include_manager in [
+            ("b", "d", False),
+            ("b", "b", True),
+            ("b", "f", True),
+        ]:
+            with self.subTest(manager=manager, new_manager=new_manager):
+                with self.assertRaises(ValueError):
+                    EmployeeService._transfer_reports(
+                        self.ids[manager], self.ids[new_manager], include_manager
+                    )
+        with self.assertRaises(ValueError):
+            EmployeeService._transfer_reports(self.ids["b"], uuid.uuid4())
+        self.assertParents({"c": "b", "f": "b"})
+
+    def test_model_method(self):
+        self.get("c").transfer_supervisors(self.get("f"))
+
+        self.assertParents({"d": "f", "e": "f"})
+
+    def test_endpoint(self):
+        url = reverse("employee:employee_transfer")
+        data = {"manager": self.ids["b"], "new_manager": self.ids["g"]}
+        self.assertEqual(self.client.post(url, data).status_code, 302)
+
+        self.client.force_login(
+            get_user_model().objects.create_user("hr", password="secret")
+        )
+        invalid = self.client.post(url, {**data, "new_manager": self.ids["d"]})
+        self.assertEqual(invalid.status_code, 400)
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["moved"], 2)
+        self.assertParents({"c": "g", "f": "g"})
@@ -0,0 +1,161 @@
+import csv
+import io
+import uuid
+import zipfile
+from collections import namedtuple
+from datetime import date
+from unittest import mock
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employee.models import Employee
+from apps.employee.service.exports import EXPORT_COLUMNS, EmployeeExportService
+
+Row = namedtuple("Row", [field for field, _header in EXPORT_COLUMNS])
+
+SHEET = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def read_xlsx(content):
+    """
+    Read the cells of the worksheet back as ``{reference: (style, value)}``.
+    """
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    cells = {}
+    for cell in sheet.iter(SHEET + "c"):
+        if cell.get("t") == "inlineStr":
+            value = cell.find(SHEET + "is").find(SHEET + "t").text
+        else:
+            value = int(cell.find(SHEET + "v").text)
+        cells[cell.get("r")] = (cell.get("s"), value)
+    return cells
+
+
+class ExportWriterTest(TestCase):
+    def setUp(self):
+        self.rows = [
+            Row(
+                uuid.UUID(int=1),
+                "Ann <Lee> & Co",
+                "CEO",
+                date(2020, 1, 1),
+                "ann@example.com",
+                None,
+            ),
+            Row(
+                uuid.UUID(int=2),
+                'Bob\x07 "Bobby" O\'Neil',
+                None,
+                date(1900, 3, 1),
+                "bob@example.com",
+                "Ann <Lee> & Co",
+            ),
+        ]
+
+    def test_csv(self):
+        content = b"".join(EmployeeExportService._stream_csv(self.rows))
+
+        lines = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(lines[0], [header for _field, header in EXPORT_COLUMNS])
+        self.assertEqual(
+            lines[2],
+            [
+                str(uuid.UUID(int=2)),
+                'Bob\x07 "Bobby" O\'Neil',
+                "",
+                "1900-03-01",
+                "bob@example.com",
+                "Ann <Lee> & Co",
+            ],
+        )
+
+    def test_xlsx(self):
+        content = b"".join(EmployeeExportService._stream_xlsx(self.rows))
+
+        cells = read_xlsx(content)
+        self.assertEqual(cells["A1"], (None, "id"))
+        self.assertEqual(cells["F1"], (None, "manager"))
+        self.assertEqual(cells["B2"], (None, "Ann <Lee> & Co"))
+        # 2020-01-01 and 1900-03-01 as days since 1899-12-30, date formatted.
+        self.assertEqual(cells["D2"], ("1", 43831))
+        self.assertEqual(cells["D3"], ("1", 61))
+        # Control characters are dropped, empty values leave no cell.
+        self.assertEqual(cells["B3"], (None, 'Bob "Bobby" O\'Neil'))
+        self.assertNotIn("F2", cells)
+        self.assertNotIn("C3", cells)
+        self.assertEqual(len(cells), 6 + 5 + 5)
+
+    def test_xlsx_parts(self):
+        content = b"".join(EmployeeExportService._stream_xlsx([]))
+
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(
+                sorted(archive.namelist()),
+                [
+                    "[Content_Types].xml",
+                    "_rels/.rels",
+                    "xl/_rels/workbook.xml.rels",
+                    "xl/styles.xml",
+                    "xl/workbook.xml",
+                    "xl/worksheets/sheet1.xml",
+                ],
+            )
+        self.assertEqual(len(read_xlsx(content)), len(EXPORT_COLUMNS))
+
+    @mock.patch("apps.employee.service.exports.EXPORT_CHUNK_BYTES", 1024)
+    @mock.patch("apps.employee.service.exports.XLSX_ROWS_PER_WRITE", 10)
+    def test_xlsx_is_streamed_in_chunks(self):
+        rows = [
+            self.rows[0]._replace(id=uuid.UUID(int=number), email=uuid.uuid4().hex)
+            for number in range(2000)
+        ]
+
+        chunks = list(EmployeeExportService._stream_xlsx(iter(rows)))
+
+        self.assertGreater(len(chunks), 1)
+        cells = read_xlsx(b"".join(chunks))
+        self.assertEqual(cells["A2001"], (None, str(uuid.UUID(int=1999))))
+        self.assertEqual(cells["E2001"], (None, rows[-1].email))
+        self.assertNotIn("A2002", cells)
+
+
+class EmployeeExportViewTest(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user("admin", password="secret")
+        )
+        for number, name in enumerate(["Cleo", "Abe", "Bea"], start=1):
+            Employee.objects.create(
+                full_name=name,
+                email=f"{name.lower()}@example.com",
+                hire_date=date(2020, 1, number),
+            )
+
+    def export(self, **params):
+        return self.client.get(reverse("employee:employee_export"), params)
+
+    def test_xlsx_download(self):
+        response = self.export(format="xlsx", sort_by="full_name")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(".xlsx", response["Content-Disposition"])
+        cells = read_xlsx(b"".join(response.streaming_content))
+        self.assertEqual(
+            [cells[f"B{number}"][1] for number in range(2, 5)], ["Abe", "Bea", "Cleo"]
+        )
+
+    def test_csv_download_with_filters(self):
+        response = self.export(format="csv", hired_from="2020-01-02")
+
+        lines = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual([line[1] for line in lines[1:]], ["Abe", "Bea"])
+
+    def test_unsupported_format(self):
+        self.assertEqual(self.export(format="pdf").status_code, 400)
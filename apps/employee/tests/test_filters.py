@@ -0,0 +1,59 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employee.forms import EmployeeFilterForm
+from apps.employee.service.employees import HireDateRange
+
+
+class EmployeeFilterFormTest(TestCase):
+    def hire_date_range(self, **data):
+        return EmployeeFilterForm(data).get_hire_date_range()
+
+    def test_no_filters(self):
+        self.assertIsNone(self.hire_date_range())
+
+    def test_filters_are_combined_into_one_half_open_range(self):
+        self.assertEqual(
+            self.hire_date_range(hired_from="2020-03-01", hired_to="2020-12-31"),
+            HireDateRange(date(2020, 3, 1), date(2021, 1, 1)),
+        )
+        self.assertEqual(
+            self.hire_date_range(hired_year="2020", hired_quarter="4"),
+            HireDateRange(date(2020, 10, 1), date(2021, 1, 1)),
+        )
+        self.assertEqual(
+            self.hire_date_range(
+                hired_year="2020", hired_quarter="2", hired_from="2020-05-10"
+            ),
+            HireDateRange(date(2020, 5, 10), date(2020, 7, 1)),
+        )
+
+    @mock.patch("django.utils.timezone.localdate", return_value=date(2024, 3, 1))
+    def test_hired_within_days(self, localdate):
+        self.assertEqual(
+            self.hire_date_range(hired_within_days="30"),
+            HireDateRange(date(2024, 1, 31), None),
+        )
+
+    def test_quarter_needs_a_year(self):
+        form = EmployeeFilterForm({"hired_quarter": "2"})
+        self.assertIsNone(form.get_hire_date_range())
+        self.assertIn("hired_year", form.errors)
+
+    def test_out_of_range_dates_are_form_errors(self):
+        for data in (
+            {"hired_within_days": "99999999"},
+            {"hired_to": "9999-12-31"},
+        ):
+            form = EmployeeFilterForm(data)
+            self.assertIsNone(form.get_hire_date_range())
+            self.assertTrue(form.errors)
+
+    def test_list_shows_out_of_range_filters_as_errors(self):
+        for query in ("hired_within_days=99999999", "hired_to=9999-12-31"):
+            response = self.client.get(reverse("employee:employee_list") + "?" + query)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context["filter_form"].errors)
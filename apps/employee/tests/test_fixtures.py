@@ -0,0 +1,113 @@
+import json
+import shutil
+import tempfile
+import uuid
+from datetime import date
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.employee.models import Position
+from apps.employee.service.fixtures import (
+    FixtureWriter,
+    fixture_format,
+    open_fixture,
+)
+
+RECORDS = [
+    {
+        "model": "employee.position",
+        "pk": str(uuid.UUID(int=1)),
+        "fields": {"position_name": "CEO"},
+    },
+    {
+        "model": "employee.position",
+        "pk": str(uuid.UUID(int=2)),
+        "fields": {"position_name": "Zoë Ängström"},
+    },
+]
+
+
+class FixtureFormatTest(TestCase):
+    def test_formats(self):
+        self.assertEqual(fixture_format("employees.json"), "json")
+        self.assertEqual(fixture_format("data/employees.jsonl"), "jsonl")
+        self.assertEqual(fixture_format("employees.jsonl.gz"), "jsonl")
+        self.assertEqual(fixture_format("employees.json.xz"), "json")
+
+    def test_unsupported_formats(self):
+        for path in ["employees.csv", "employees.gz", "employees", "employees.xml.bz2"]:
+            with self.subTest(path=path), self.assertRaises(ValueError):
+                fixture_format(path)
+
+
+class FixtureWriterTest(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, records=RECORDS):
+        path = self.directory / name
+        with FixtureWriter(path) as writer:
+            for record in records:
+                writer.write(record)
+        self.assertEqual(writer.count, len(records))
+        return path
+
+    def test_json(self):
+        path = self.write("positions.json")
+
+        content = path.read_text(encoding="utf-8")
+        self.assertEqual(json.loads(content), RECORDS)
+        # Compact separators, one record per line.
+        self.assertIn(
+            '\n{"model":"employee.position","pk":"%s",' % uuid.UUID(int=1), content
+        )
+
+    def test_empty_json(self):
+        self.assertEqual(json.loads(self.write("empty.json", []).read_text()), [])
+
+    def test_jsonl(self):
+        path = self.write("positions.jsonl")
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], RECORDS)
+
+    def test_compressed(self):
+        for name in ["positions.json.gz", "positions.jsonl.bz2", "positions.json.xz"]:
+            with self.subTest(name=name):
+                path = self.write(name)
+
+                self.assertNotIn(b"employee.position", path.read_bytes())
+                with open_fixture(path) as stream:
+                    content = stream.read()
+                if name.startswith("positions.jsonl"):
+                    records = [json.loads(line) for line in content.splitlines()]
+                else:
+                    records = json.loads(content)
+                self.assertEqual(records, RECORDS)
+
+    def test_write_objects(self):
+        position = Position(pk=uuid.UUID(int=3), position_name="QA")
+        path = self.directory / "objects.json"
+
+        with FixtureWriter(path) as writer:
+            writer.write_objects([position])
+            writer.write({"model": "x.y", "pk": 4, "fields": {"day": date(2020, 1, 2)}})
+
+        records = json.loads(path.read_text())
+        self.assertEqual(records[0]["fields"]["position_name"], "QA")
+        self.assertEqual(records[1]["fields"]["day"], "2020-01-02")
+
+    def test_loaddata(self):
+        for name in ["positions.json.gz", "positions.jsonl.bz2"]:
+            with self.subTest(name=name):
+                Position.objects.all().delete()
+
+                call_command("loaddata", str(self.write(name)), verbosity=0)
+
+                self.assertEqual(
+                    sorted(Position.objects.values_list("position_name", flat=True)),
+                    ["CEO", "Zoë Ängström"],
+                )
@@ -0,0 +1,137 @@
+import unittest
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import RequestFactory, TestCase
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.fragments import RowFragmentService
+from apps.employee.service.positions import invalidate_position_registry
+
+ROW_TEMPLATE = "employee/includes/employee_row.html"
+# Set before each change, which the trigger replaces with the time of the
+# transaction.
+OLD = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class RowFragmentTest(TestCase):
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+        self.rows = [
+            Employee.objects.create(
+                full_name="Employee {}".format(name),
+                email="{}@example.com".format(name),
+                hire_date=date(2020, 1, 1),
+            )
+            for name in "ab"
+        ]
+
+    def render(self, rows, request=None):
+        return RowFragmentService._render_rows(
+            ROW_TEMPLATE, rows, request or self.request
+        )
+
+    def test_rows_are_rendered_once(self):
+        first = self.render(self.rows)
+
+        with self.assertTemplateNotUsed(ROW_TEMPLATE):
+            second = self.render(self.rows)
+
+        self.assertEqual(second, first)
+        self.assertIn("Employee a", first[0])
+        self.assertEqual(
+            RowFragmentService._get_metrics(),
+            {"hits": 2, "misses": 2, "hit_ratio": 0.5},
+        )
+
+    def test_a_changed_row_gets_a_new_key(self):
+        self.render(self.rows)
+        changed = Employee.objects.get(pk=self.rows[0].pk)
+        changed.full_name = "Employee x"
+        changed.updated_at = OLD
+
+        rows = self.render([changed, self.rows[1]])
+
+        self.assertIn("Employee x", rows[0])
+        self.assertEqual(RowFragmentService._get_metrics()["misses"], 3)
+
+    def test_signed_in_users_get_rows_of_their_own(self):
+        anonymous = self.render(self.rows[:1])
+        self.request.user = SimpleNamespace(is_authenticated=True)
+
+        signed_in = self.render(self.rows[:1])
+
+        self.assertNotIn("btn-primary", anonymous[0])
+        self.assertIn("btn-primary", signed_in[0])
+
+    def test_repeated_rows(self):
+        rows = self.render([self.rows[0], self.rows[0]])
+
+        self.assertEqual(rows[0], rows[1])
+        self.assertEqual(RowFragmentService._get_metrics()["misses"], 1)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "updated_at trigger")
+class UpdatedAtTriggerTest(TestCase):
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        self.position = Position.objects.create(position_name="Engineer")
+        self.boss = Employee.objects.create(
+            full_name="Boss", email="boss@example.com", hire_date=date(2019, 1, 1)
+        )
+        self.report = Employee.objects.create(
+            full_name="Report",
+            email="report@example.com",
+            hire_date=date(2020, 1, 1),
+            position=self.position,
+            parent=self.boss,
+        )
+        Employee.objects.update(updated_at=OLD)
+
+    def updated_at(self, employee):
+        return Employee.objects.values_list("updated_at", flat=True).get(pk=employee.pk)
+
+    def test_insert(self):
+        employee = Employee.objects.create(
+            full_name="New",
+            email="new@example.com",
+            hire_date=date(2021, 1, 1),
+            updated_at=OLD,
+        )
+
+        self.assertNotEqual(self.updated_at(employee), OLD)
+
+    def test_shown_columns_touch_the_row(self):
+        Employee.objects.filter(pk=self.report.pk).update(email="new@example.com")
+
+        self.assertNotEqual(self.updated_at(self.report), OLD)
+        self.assertEqual(self.updated_at(self.boss), OLD)
+
+    def test_renumbering_does_not(self):
+        Employee.objects.update(lft=F("lft") + 10, rght=F("rght") + 10)
+
+        self.assertEqual(self.updated_at(self.boss), OLD)
+        self.assertEqual(self.updated_at(self.report), OLD)
+
+    def test_renames_touch_the_rows_that_show_the_name(self):
+        self.position.position_name = "Architect"
+        self.position.save()
+
+        self.assertNotEqual(self.updated_at(self.report), OLD)
+        self.assertEqual(self.updated_at(self.boss), OLD)
+
+        Employee.objects.update(updated_at=OLD)
+        self.boss.full_name = "Chief"
+        self.boss.save()
+
+        self.assertNotEqual(self.updated_at(self.report), OLD)
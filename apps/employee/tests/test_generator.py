@@ -0,0 +1,100 @@
+import random
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from apps.employee.service.generator import (
+    OrgGenerator,
+    parse_fan_out,
+    parse_position_mix,
+)
+
+
+class ParseFanOutTest(SimpleTestCase):
+    def test_distributions(self):
+        rng = random.Random(0)
+
+        self.assertEqual(parse_fan_out("fixed:3")(rng), 3)
+        self.assertTrue(
+            all(2 <= parse_fan_out("uniform:2-4")(rng) <= 4 for _draw in range(50))
+        )
+        self.assertTrue(
+            all(parse_fan_out("geometric:2.5")(rng) >= 1 for _draw in range(50))
+        )
+
+    def test_invalid_specifications(self):
+        for spec in ["", "fixed:0", "fixed:x", "uniform:5-2", "uniform:3", "poisson:2"]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_fan_out(spec)
+
+
+class ParsePositionMixTest(SimpleTestCase):
+    def test_mix(self):
+        self.assertEqual(
+            parse_position_mix(" Employee=60, QA Engineer=5,,Intern=0"),
+            {"Employee": 60.0, "QA Engineer": 5.0, "Intern": 0.0},
+        )
+
+    def test_invalid_entries_are_named(self):
+        for spec, entry in [
+            ("Employee=60,=40", "=40"),
+            ("Employee", "Employee"),
+            ("Employee=many", "Employee=many"),
+            ("Employee=60,Intern=-1", "Intern=-1"),
+            ("Employee=nan", "Employee=nan"),
+        ]:
+            with self.subTest(spec=spec):
+                with self.assertRaisesMessage(ValueError, entry):
+                    parse_position_mix(spec)
+
+    def test_a_positive_weight_is_required(self):
+        for spec in ["", "Employee=0,Intern=0"]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_position_mix(spec)
+
+
+class OrgGeneratorTest(SimpleTestCase):
+    def generate(self, **kwargs):
+        generator = OrgGenerator(**{"employees": 60, "seed": 7, **kwargs})
+        return list(generator.generate()), generator.fingerprint
+
+    def test_same_arguments_same_dataset(self):
+        employees, fingerprint = self.generate()
+
+        self.assertEqual(self.generate(), (employees, fingerprint))
+        self.assertNotEqual(self.generate(seed=8)[1], fingerprint)
+
+    def test_shape(self):
+        employees, _fingerprint = self.generate(depth=3, fan_out="fixed:2")
+
+        self.assertEqual(len(employees), 60)
+        self.assertEqual(len({employee.email for employee in employees}), 60)
+        levels = {employee.id: employee.level for employee in employees}
+        self.assertEqual(max(levels.values()), 2)
+        self.assertIsNone(employees[0].parent_id)
+        self.assertEqual(employees[0].position_name, "CEO")
+        for employee in employees[1:]:
+            # Managers come before their reports.
+            self.assertEqual(levels[employee.parent_id], employee.level - 1)
+
+    def test_position_mix(self):
+        employees, _fingerprint = self.generate(
+            employees=300, position_mix={"Employee": 1, "Intern": 0, "QA": 1}
+        )
+
+        names = Counter(employee.position_name for employee in employees[1:])
+        self.assertEqual(set(names), {"Employee", "QA"})
+
+    def test_hierarchy_does_not_depend_on_personal_data(self):
+        employees, _fingerprint = self.generate()
+
+        self.assertEqual(
+            OrgGenerator(60, seed=7).hierarchy(),
+            [(employee.id, employee.parent_id) for employee in employees],
+        )
+
+    def test_invalid_shape(self):
+        with self.assertRaises(ValueError):
+            OrgGenerator(0)
+        with self.assertRaises(ValueError):
+            OrgGenerator(5, depth=1)
@@ -0,0 +1,257 @@
+import io
+import json
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.importer import EmployeeImporter
+
+POSITION_ID = uuid.UUID("6d1f5c8e-0b7a-4a55-9d62-3f1e2a4c5b01")
+BOSS_ID = uuid.UUID("6d1f5c8e-0b7a-4a55-9d62-3f1e2a4c5b02")
+REPORT_ID = uuid.UUID("6d1f5c8e-0b7a-4a55-9d62-3f1e2a4c5b03")
+OTHER_ID = uuid.UUID("6d1f5c8e-0b7a-4a55-9d62-3f1e2a4c5b04")
+
+
+def employee_record(pk, full_name, parent=None):
+    return {
+        "model": "employee.employee",
+        "pk": str(pk),
+        "fields": {
+            "full_name": full_name,
+            "email": "{}@example.com".format(full_name.split()[0].lower()),
+            "hire_date": "2020-01-01",
+            "position": str(POSITION_ID),
+            "parent": str(parent) if parent else None,
+        },
+    }
+
+
+def position_record():
+    return {
+        "model": "employee.position",
+        "pk": str(POSITION_ID),
+        "fields": {"position_name": "QA"},
+    }
+
+
+class Interrupted(Exception):
+    pass
+
+
+class EmployeeImporterTest(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.checkpoint = self.directory / "import.checkpoint"
+
+    def write_fixture(self, records):
+        path = self.directory / "employees.jsonl"
+        path.write_text("".join(json.dumps(record) + "\n" for record in records))
+        return path
+
+    def test_resume_continues_after_the_last_committed_batch(self):
+        # The report comes before their manager, so the first batch leaves the
+        # link pending in the checkpoint.
+        path = self.write_fixture(
+            [
+                {
+                    "model": "employee.position",
+                    "pk": str(POSITION_ID),
+                    "fields": {"position_name": "QA"},
+                },
+                employee_record(REPORT_ID, "Report Person", parent=BOSS_ID),
+                employee_record(BOSS_ID, "Boss Person"),
+                employee_record(OTHER_ID, "Other Person", parent=BOSS_ID),
+            ]
+        )
+
+        def interrupt(rows, elapsed):
+            raise Interrupted
+
+        importer = EmployeeImporter(
+            batch_size=2, checkpoint=self.checkpoint, progress=interrupt
+        )
+        with self.assertRaises(Interrupted):
+            importer._import(path)
+        self.assertTrue(self.checkpoint.exists())
+        self.assertEqual(Employee.objects.count(), 1)
+
+        result = EmployeeImporter(batch_size=2, checkpoint=self.checkpoint)._import(
+            path, resume=True
+        )
+
+        self.assertEqual((result.rows, result.created, result.updated), (4, 2, 0))
+        self.assertEqual(result.errors, [])
+        self.assertFalse(self.checkpoint.exists())
+        self.assertEqual(Employee.objects.count(), 3)
+        self.assertEqual(Employee.objects.get(pk=REPORT_ID).parent_id, BOSS_ID)
+        self.assertEqual(Employee.objects.get(pk=OTHER_ID).parent_id, BOSS_ID)
+
+        boss = Employee.objects.get(pk=BOSS_ID)
+        self.assertEqual(boss.get_descendant_count(), 2)
+        self.assertEqual((boss.lft, boss.rght), (1, 6))
+
+    def test_reimport_updates_instead_of_duplicating(self):
+        path = self.write_fixture(
+            [
+                {
+                    "model": "employee.position",
+                    "pk": str(POSITION_ID),
+                    "fields": {"position_name": "QA"},
+                },
+                employee_record(BOSS_ID, "Boss Person"),
+            ]
+        )
+        EmployeeImporter()._import(path)
+        result = EmployeeImporter()._import(path)
+
+        self.assertEqual((result.created, result.updated), (0, 1))
+        self.assertEqual(Employee.objects.count(), 1)
+
+    def test_invalid_position_record_is_reported_not_raised(self):
+        path = self.write_fixture(
+            [
+                {
+                    "model": "employee.position",
+                    "pk": str(POSITION_ID),
+                    "fields": {"position_name": "QA", "unknown": 1},
+                },
+                {
+                    "model": "employee.position",
+                    "pk": str(uuid.uuid4()),
+                    "fields": {"title": "No name"},
+                },
+                {
+                    "model": "employee.position",
+                    "pk": "not a uuid",
+                    "fields": {"position_name": "Broken"},
+                },
+                employee_record(BOSS_ID, "Boss Person"),
+            ]
+        )
+        result = EmployeeImporter()._import(path)
+
+        self.assertEqual([issue.row for issue in result.errors], [2, 3])
+        self.assertEqual(Position.objects.get().position_name, "QA")
+        self.assertEqual(Employee.objects.get().position_id, POSITION_ID)
+
+    def test_malformed_records_are_reported(self):
+        path = self.write_fixture(
+            [
+                position_record(),
+                ["not", "a", "record"],
+                {"model": "employee.contract", "pk": str(uuid.uuid4())},
+                {"model": "employee.employee", "pk": str(uuid.uuid4())},
+                {"model": "employee.employee", "pk": str(OTHER_ID), "fields": []},
+                employee_record(BOSS_ID, "Boss Person"),
+            ]
+        )
+        result = EmployeeImporter()._import(path)
+
+        self.assertEqual([issue.row for issue in result.errors], [2, 3, 4, 5])
+        self.assertIn("employee.contract", result.errors[1].message)
+        self.assertEqual(list(Employee.objects.values_list("pk", flat=True)), [BOSS_ID])
+
+    def test_cycles_and_unknown_managers_are_rejected_before_any_commit(self):
+        missing_id, self_id, orphan_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        path = self.write_fixture(
+            [
+                position_record(),
+                employee_record(BOSS_ID, "Boss Person"),
+                employee_record(orphan_id, "Orphan Person", parent=missing_id),
+                employee_record(uuid.uuid4(), "Later Person", parent=orphan_id),
+                employee_record(self_id, "Self Person", parent=self_id),
+                employee_record(REPORT_ID, "Report Person", parent=OTHER_ID),
+                employee_record(OTHER_ID, "Other Person", parent=REPORT_ID),
+            ]
+        )
+        # With one row per batch, the orphan and their report would otherwise
+        # be committed long before the unknown manager is noticed.
+        result = EmployeeImporter(batch_size=1)._import(path)
+
+        self.assertEqual([issue.row for issue in result.errors], [3, 4, 5, 6, 7])
+        self.assertIn(str(missing_id), result.errors[0].message)
+        self.assertIn(str(orphan_id), result.errors[1].message)
+        self.assertIn("cycle", result.errors[2].message)
+        self.assertEqual(list(Employee.objects.values_list("pk", flat=True)), [BOSS_ID])
+        self.assertEqual(Employee.objects.get().lft, 1)
+
+    def test_a_cycle_through_existing_employees_keeps_their_managers(self):
+        EmployeeImporter()._import(
+            self.write_fixture(
+                [
+                    position_record(),
+                    employee_record(BOSS_ID, "Boss Person"),
+                    employee_record(REPORT_ID, "Report Person", parent=BOSS_ID),
+                ]
+            )
+        )
+        path = self.write_fixture(
+            [
+                employee_record(BOSS_ID, "Boss Person", parent=REPORT_ID),
+                employee_record(OTHER_ID, "Other Person", parent=BOSS_ID),
+            ]
+        )
+        result = EmployeeImporter()._import(path)
+
+        self.assertEqual([issue.row for issue in result.errors], [1])
+        self.assertEqual(result.created, 1)
+        boss = Employee.objects.get(pk=BOSS_ID)
+        self.assertIsNone(boss.parent_id)
+        self.assertEqual(boss.get_descendant_count(), 2)
+
+    def test_a_cycle_through_a_rejected_row_is_broken(self):
+        EmployeeImporter()._import(
+            self.write_fixture(
+                [
+                    position_record(),
+                    employee_record(BOSS_ID, "Boss Person"),
+                    employee_record(REPORT_ID, "Report Person", parent=BOSS_ID),
+                ]
+            )
+        )
+        # Moving the report to the top is rejected for its hire date, which
+        # leaves the boss reporting to their own report.
+        report = employee_record(REPORT_ID, "Report Person")
+        report["fields"]["hire_date"] = "someday"
+        path = self.write_fixture(
+            [report, employee_record(BOSS_ID, "Boss Person", parent=REPORT_ID)]
+        )
+        result = EmployeeImporter()._import(path)
+
+        self.assertEqual([issue.row for issue in result.errors], [1, 0, 0])
+        self.assertFalse(Employee.objects.filter(parent__isnull=False).exists())
+        self.assertEqual(
+            sorted(Employee.objects.values_list("lft", "rght")), [(1, 2), (1, 2)]
+        )
+
+    def test_csv(self):
+        path = self.directory / "employees.csv"
+        path.write_text(
+            "id,full_name,email,hire_date,position,parent\n"
+            f"{BOSS_ID},Boss Person,boss@example.com,2020-01-01,CEO,\n"
+            f",Report Person,report@example.com,2020-01-01,QA,{BOSS_ID}\n"
+            ",Short Row\n"
+        )
+        result = EmployeeImporter()._import(path)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([issue.row for issue in result.errors], [3])
+        report = Employee.objects.get(email="report@example.com")
+        self.assertEqual(report.parent_id, BOSS_ID)
+        self.assertEqual(report.position.position_name, "QA")
+
+    def test_csv_without_a_required_column(self):
+        path = self.directory / "employees.csv"
+        path.write_text("full_name,hire_date\nBoss Person,2020-01-01\n")
+
+        with self.assertRaisesMessage(ValueError, "email"):
+            EmployeeImporter()._import(path)
+        with self.assertRaises(CommandError):
+            call_command("load_employees", str(path), stdout=io.StringIO())
+        self.assertFalse(Employee.objects.exists())
@@ -0,0 +1,224 @@
+import uuid
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.employee.models import Employee
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.tree import compute_tree_positions
+from apps.employee.service.treewrites import MAX_QUEUED_SECONDS
+
+
+class CheckTreeTest(TestCase):
+    def setUp(self):
+        # a -> (b -> c), (d -> e)
+        self.ids = {name: uuid.uuid4() for name in "abcde"}
+        self.names = {pk: name for name, pk in self.ids.items()}
+        self.rows = {
+            "a": [None, 1, 1, 10, 0],
+            "b": ["a", 1, 2, 5, 1],
+            "c": ["b", 1, 3, 4, 2],
+            "d": ["a", 1, 6, 9, 1],
+            "e": ["d", 1, 7, 8, 2],
+        }
+
+    def check(self, **changes):
+        rows = {name: list(row) for name, row in self.rows.items()}
+        for name, row in changes.items():
+            if row is None:
+                del rows[name]
+            else:
+                rows[name] = row
+        tree_rows = sorted(
+            (
+                (
+                    self.ids[name],
+                    self.ids[parent] if parent else None,
+                    tree_id,
+                    lft,
+                    rght,
+                    level,
+                )
+                for name, (parent, tree_id, lft, rght, level) in rows.items()
+            ),
+            key=lambda row: row[3],
+        )
+        return [
+            (self.names[issue.node_id], str(issue.message))
+            for issue in TreeIntegrityService._check_tree(1, tree_rows)
+        ]
+
+    def test_valid_tree(self):
+        self.assertEqual(self.check(), [])
+
+    def test_wrong_rght(self):
+        self.assertEqual(
+            self.check(a=[None, 1, 1, 11, 0]), [("a", "rght is 11, expected 10")]
+        )
+
+    def test_gap_in_lft(self):
+        issues = self.check(d=["a", 1, 7, 9, 1], e=["d", 1, 8, 9, 2])
+        self.assertIn(("d", "lft is 7, expected 6"), issues)
+
+    def test_parent_disagrees_with_nesting(self):
+        self.assertEqual(
+            self.check(c=["d", 1, 3, 4, 2]),
+            [
+                (
+                    "c",
+                    "parent is {} but the node is nested under {}".format(
+                        self.ids["d"], self.ids["b"]
+                    ),
+                )
+            ],
+        )
+
+    def test_wrong_level(self):
+        self.assertEqual(
+            self.check(e=["d", 1, 7, 8, 1]), [("e", "level is 1, expected 2")]
+        )
+
+    def test_second_root(self):
+        self.assertEqual(
+            self.check(
+                a=[None, 1, 1, 2, 0],
+                b=[None, 1, 3, 8, 0],
+                c=["b", 1, 4, 5, 1],
+                d=["b", 1, 6, 7, 1],
+                e=None,
+            )[:1],
+            [("b", "second root in the tree")],
+        )
+
+    def test_rght_not_larger_than_lft(self):
+        self.assertIn(
+            ("c", "rght is not larger than lft"), self.check(c=["b", 1, 3, 3, 2])
+        )
+
+    def test_node_extending_past_its_parent(self):
+        self.assertIn(
+            ("c", "the node extends past its parent"),
+            self.check(c=["b", 1, 3, 6, 2]),
+        )
+
+
+class TreeIntegrityServiceTest(TestCase):
+    def setUp(self):
+        # Two trees: a -> (b -> c), d and f -> g.
+        self.ids = {name: uuid.uuid4() for name in "abcdfg"}
+        parents = {"a": None, "b": "a", "c": "b", "d": "a", "f": None, "g": "f"}
+        positions = compute_tree_positions(
+            (self.ids[name], self.ids[parent] if parent else None)
+            for name, parent in parents.items()
+        )
+        Employee.objects.bulk_create(
+            Employee(
+                id=self.ids[name],
+                full_name="Employee {}".format(name),
+                email="{}@example.com".format(name),
+                hire_date=date(2020, 1, 1),
+                parent_id=self.ids[parent] if parent else None,
+                **positions[self.ids[name]]._asdict(),
+            )
+            for name, parent in parents.items()
+        )
+
+    def nested_set(self, *names):
+        return list(
+            Employee.objects.filter(pk__in=[self.ids[name] for name in names])
+            .order_by("lft")
+            .values_list("tree_id", "lft", "rght", "level")
+        )
+
+    def test_clean_forest(self):
+        check = TreeIntegrityService._check()
+
+        self.assertEqual((check.trees, check.rows), (2, 6))
+        self.assertEqual(check.issues, {})
+        self.assertEqual(TreeIntegrityService._repair(check), [])
+
+    def queue(self, parent, tree_id=1):
+        employee_id = uuid.uuid4()
+        Employee.objects.bulk_create(
+            [
+                Employee(
+                    id=employee_id,
+                    full_name="Employee new",
+                    email="new@example.com",
+                    hire_date=date(2020, 1, 1),
+                    parent_id=self.ids[parent],
+                    tree_id=tree_id,
+                    lft=0,
+                    rght=1,
+                    level=0,
+                )
+            ]
+        )
+        return employee_id
+
+    def test_rows_waiting_for_their_flush_are_skipped(self):
+        self.queue("b")
+
+        check = TreeIntegrityService._check()
+
+        self.assertEqual(check.rows, 6)
+        self.assertEqual(check.issues, {})
+
+    def test_rows_left_unplaced_are_repaired(self):
+        # Queued too long, queued in a tree that has no root and inserted
+        # without a tree.
+        long_ago = timezone.now() - timedelta(seconds=MAX_QUEUED_SECONDS + 1)
+        stale = self.queue("b")
+        Employee.objects.filter(pk=stale).update(updated_at=long_ago)
+        orphan = self.queue("g", tree_id=3)
+        treeless = self.queue("a", tree_id=0)
+
+        check = TreeIntegrityService._check()
+
+        self.assertEqual(
+            {
+                tree_id: [issue.node_id for issue in tree_issues]
+                for tree_id, tree_issues in check.issues.items()
+            },
+            {0: [treeless], 1: [stale], 3: [orphan]},
+        )
+        self.assertEqual(TreeIntegrityService._repair_groups(check), [(0, 1), (2, 3)])
+        TreeIntegrityService._repair(check)
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+        self.assertFalse(Employee.objects.filter(lft=0).exists())
+
+    def test_repairs_only_the_drifted_tree(self):
+        Employee.objects.filter(pk=self.ids["d"]).update(lft=8, rght=9)
+        Employee.objects.filter(pk=self.ids["a"]).update(rght=10)
+        other_tree = self.nested_set("f", "g")
+
+        check = TreeIntegrityService._check()
+        self.assertEqual(list(check.issues), [1])
+        self.assertEqual(check.issue_counts[1], len(check.issues[1]))
+
+        repairs = TreeIntegrityService._repair(check)
+
+        self.assertEqual([repair.tree_ids for repair in repairs], [(1,)])
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+        self.assertEqual(self.nested_set("f", "g"), other_tree)
+
+    def test_dry_run_leaves_the_tree_alone(self):
+        Employee.objects.filter(pk=self.ids["a"]).update(rght=10)
+
+        repairs = TreeIntegrityService._repair(
+            TreeIntegrityService._check(), dry_run=True
+        )
+
+        self.assertEqual(repairs[0].rows, 1)
+        self.assertEqual(list(TreeIntegrityService._check().issues), [1])
+
+    def test_rows_with_a_parent_in_another_tree_are_repaired_together(self):
+        Employee.objects.filter(pk=self.ids["g"]).update(parent_id=self.ids["b"])
+
+        check = TreeIntegrityService._check()
+
+        self.assertEqual(check.linked_trees, {2: {1}})
+        self.assertEqual(TreeIntegrityService._repair_groups(check), [(1, 2)])
+        TreeIntegrityService._repair(check)
+        self.assertEqual(TreeIntegrityService._check().issues, {})
@@ -0,0 +1,179 @@
+import io
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employee import tasks
+from apps.employee.models import Employee, Job
+from apps.employee.service import jobs
+from apps.employee.service.jobs import JobCancelled, JobContext, JobService
+
+
+class JobServiceTest(TestCase):
+    def setUp(self):
+        delay = mock.patch.object(tasks.run_job, "delay")
+        self.delay = delay.start()
+        self.addCleanup(delay.stop)
+
+    def submit(self, kind=Job.Kind.REPAIR_TREE, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            return JobService._submit(kind, {"tree_ids": None, **params})
+
+    def run_job(self, job, **options):
+        tasks.run_job.apply(args=[str(job.pk)], **options)
+        job.refresh_from_db()
+        return job
+
+    def test_submit_queues_the_task_after_the_commit(self):
+        job = self.submit(subtree=uuid.UUID(int=1))
+
+        self.assertEqual(job.status, Job.Status.PENDING)
+        self.assertEqual(job.params["subtree"], str(uuid.UUID(int=1)))
+        self.delay.assert_called_once_with(str(job.pk))
+
+    def test_an_identical_active_job_is_reused(self):
+        job = self.submit()
+
+        self.assertEqual(self.submit(), job)
+        self.assertNotEqual(self.submit(dry_run=True), job)
+        Job.objects.filter(pk=job.pk).update(status=Job.Status.SUCCEEDED)
+        self.assertNotEqual(self.submit(), job)
+
+    def test_run(self):
+        Employee.objects.create(
+            full_name="Employee a", email="a@example.com", hire_date=date(2020, 1, 1)
+        )
+
+        job = self.run_job(self.submit())
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual((job.attempts, job.result["rows"]), (1, 1))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(JobService._to_dict(job)["status"], "succeeded")
+
+    def test_a_finished_job_is_not_run_again(self):
+        job = self.run_job(self.submit())
+
+        self.assertEqual(self.run_job(job).attempts, 1)
+
+    def test_a_failing_job(self):
+        handler = mock.Mock(side_effect=ValueError("Bad file"))
+
+        with mock.patch.dict(
+            jobs.JOB_HANDLERS, {Job.Kind.REPAIR_TREE: handler}
+        ), self.assertLogs(jobs.logger, "ERROR"):
+            job = self.run_job(self.submit())
+
+        self.assertEqual((job.status, job.error), (Job.Status.FAILED, "Bad file"))
+
+    def test_a_database_error_is_retried(self):
+        handler = mock.Mock(side_effect=[OperationalError("Gone"), {"rows": 0}])
+
+        with mock.patch.dict(jobs.JOB_HANDLERS, {Job.Kind.REPAIR_TREE: handler}):
+            # The retry runs right away; the first attempt ends with ``Retry``.
+            job = self.run_job(self.submit(), throw=False)
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_progress_and_cancel(self):
+        def handler(context):
+            context.report(1, 2, {"step": 1})
+            JobService._cancel(context.job.pk)
+            context.report(2)
+            return {}
+
+        job = self.submit()
+        with mock.patch.dict(jobs.JOB_HANDLERS, {Job.Kind.REPAIR_TREE: handler}):
+            job = self.run_job(job)
+
+        self.assertEqual(job.status, Job.Status.CANCELLED)
+        self.assertEqual((job.done, job.total), (2, 2))
+        self.assertEqual(job.checkpoint, {"step": 1})
+
+    def test_cancel_a_pending_job(self):
+        job = JobService._cancel(self.submit().pk)
+
+        self.assertEqual(job.status, Job.Status.CANCELLED)
+        with self.assertRaises(ValueError):
+            JobService._cancel(uuid.uuid4())
+
+    def test_report_stops_a_cancelled_job(self):
+        job = self.submit()
+        Job.objects.filter(pk=job.pk).update(cancel_requested=True)
+
+        with self.assertRaises(JobCancelled):
+            JobContext(job).report(1)
+
+    def test_background_command(self):
+        stdout = io.StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "delete_employees", "--tree-id", "3", "--background", stdout=stdout
+            )
+
+        job = Job.objects.get()
+        self.assertEqual((job.kind, job.params["tree_id"]), (Job.Kind.WIPE, 3))
+        self.assertIn(str(job.pk), stdout.getvalue())
+        self.delay.assert_called_once_with(str(job.pk))
+
+
+class JobEndpointTest(TestCase):
+    def setUp(self):
+        delay = mock.patch.object(tasks.run_job, "delay")
+        self.delay = delay.start()
+        self.addCleanup(delay.stop)
+        self.url = reverse("employee:employee_job_create", args=["repair_tree"])
+
+    def login(self, is_staff):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                "staff" if is_staff else "user", password="secret", is_staff=is_staff
+            )
+        )
+
+    def test_staff_only(self):
+        self.assertEqual(self.client.post(self.url).status_code, 302)
+        self.login(is_staff=False)
+        self.assertEqual(self.client.post(self.url).status_code, 403)
+
+    def test_submit_status_and_cancel(self):
+        self.login(is_staff=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"tree_id": 2})
+
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get()
+        self.assertEqual(job.params, {"dry_run": False, "tree_ids": [2]})
+        self.assertEqual(
+            response["Location"], reverse("employee:employee_job", args=[job.pk])
+        )
+        self.delay.assert_called_once_with(str(job.pk))
+        status = self.client.get(response["Location"])
+        self.assertEqual(status.json()["status"], "pending")
+        cancel = self.client.post(
+            reverse("employee:employee_job_cancel", args=[job.pk])
+        )
+        self.assertEqual(cancel.json()["status"], "cancelled")
+
+    def test_invalid_requests(self):
+        self.login(is_staff=True)
+
+        unknown = self.client.post(
+            reverse("employee:employee_job_create", args=["reindex"])
+        )
+        invalid = self.client.post(self.url, {"tree_id": 0})
+        missing = self.client.get(reverse("employee:employee_job", args=[uuid.uuid4()]))
+
+        self.assertEqual(unknown.status_code, 404)
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(missing.status_code, 404)
+        self.assertFalse(Job.objects.exists())
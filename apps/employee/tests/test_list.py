@@ -0,0 +1,67 @@
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.employees import LIST_FIELDS, EmployeeService
+from apps.employee.service.positions import invalidate_position_registry
+from apps.employee.views import EmployeeListView
+
+
+class EmployeeListRowsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        position = Position.objects.create(position_name="Engineer")
+        boss = Employee.objects.create(
+            full_name="Boss", email="boss@example.com", hire_date=date(2019, 1, 1)
+        )
+        for number in range(20):
+            Employee.objects.create(
+                full_name="Employee {:02}".format(number),
+                email="employee{}@example.com".format(number),
+                hire_date=date(2020, 1, 1),
+                position=position,
+                parent=boss,
+            )
+
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_numbered_page(self):
+        with self.assertNumQueries(2):
+            page = EmployeeService._get_paginated_employees("full_name", 2, 15)
+            rows = list(page)
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]._fields, LIST_FIELDS)
+        self.assertNotIsInstance(rows[0], Employee)
+
+    def test_keyset_page(self):
+        with self.assertNumQueries(1):
+            rows = list(EmployeeService._get_keyset_page("email", None, 15))
+
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(rows[0]._fields, LIST_FIELDS)
+
+    def test_list_queries_do_not_grow_with_the_page(self):
+        def queries(per_page):
+            cache.clear()
+            with mock.patch.object(
+                EmployeeListView, "items_per_page", per_page
+            ), CaptureQueriesContext(connection) as captured:
+                response = self.client.get(
+                    reverse("employee:employee_list"), {"page": 1}
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context["employees"]), per_page)
+            return len(captured)
+
+        self.assertEqual(queries(20), queries(2))
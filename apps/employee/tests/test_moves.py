@@ -0,0 +1,182 @@
+import json
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employee.models import Employee
+from apps.employee.service import tree
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.tree import TreeMove, TreeService, compute_tree_positions
+
+
+class TreePlacementTest(TestCase):
+    def setUp(self):
+        # Two trees with children listed out of id order, so sibling order is
+        # only kept by reading them in lft order.
+        self.ids = {name: uuid.uuid4() for name in "abcdefgh"}
+        shape = [
+            ("a", None, 1),
+            ("c", "a", 1),
+            ("b", "a", 1),
+            ("e", "c", 1),
+            ("d", "c", 1),
+            ("f", "b", 1),
+            ("g", None, 2),
+            ("h", "g", 2),
+        ]
+        Employee.objects.bulk_create(
+            Employee(
+                id=self.ids[name],
+                full_name="Employee {}".format(name),
+                email="{}@example.com".format(name),
+                hire_date=date(2020, 1, 1),
+                parent_id=self.ids[parent] if parent else None,
+                tree_id=tree_id,
+                # Only the order of lft is right; everything else is stale.
+                lft=(number + 1) * 10,
+                rght=0,
+                level=0,
+            )
+            for number, (name, parent, tree_id) in enumerate(shape)
+        )
+
+    def test_placements_and_unplaced_rows(self):
+        TreeService._renumber()
+        # A queued insert (lft=0) goes after its siblings, a placement at the
+        # requested position.
+        Employee.objects.bulk_create(
+            [
+                Employee(
+                    id=uuid.uuid4(),
+                    full_name="Employee new",
+                    email="new@example.com",
+                    hire_date=date(2020, 1, 1),
+                    parent_id=self.ids["a"],
+                    tree_id=1,
+                    lft=0,
+                    rght=0,
+                    level=0,
+                )
+            ]
+        )
+        Employee.objects.filter(pk=self.ids["h"]).update(parent_id=self.ids["a"])
+        TreeService._renumber(placements=[TreeMove(self.ids["h"], self.ids["a"], 0)])
+
+        root = Employee.objects.get(pk=self.ids["a"])
+        self.assertEqual(
+            [child.full_name for child in root.get_children()],
+            ["Employee h", "Employee c", "Employee b", "Employee new"],
+        )
+        self.assertEqual((root.lft, root.rght), (1, 16))
+
+    def test_place(self):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        pairs = [(a, None), (b, a), (c, a)]
+
+        self.assertEqual(
+            TreeService._place(pairs, [TreeMove(c, a, 0)]),
+            [(a, None), (c, a), (b, a)],
+        )
+        self.assertEqual(
+            TreeService._place(pairs, [TreeMove(b, a, None)]),
+            [(a, None), (c, a), (b, a)],
+        )
+
+
+class TreeMoveTest(TestCase):
+    def setUp(self):
+        # a -> (b -> (c, d), e) and f.
+        self.ids = {name: uuid.uuid4() for name in "abcdef"}
+        self.parents = {"a": None, "b": "a", "c": "b", "d": "b", "e": "a", "f": None}
+        pairs = [
+            (self.ids[name], self.ids[parent] if parent else None)
+            for name, parent in self.parents.items()
+        ]
+        positions = compute_tree_positions(pairs)
+        Employee.objects.bulk_create(
+            Employee(
+                id=node_id,
+                full_name="Employee {}".format(name),
+                email="{}@example.com".format(name),
+                hire_date=date(2020, 1, 1),
+                parent_id=parent_id,
+                **positions[node_id]._asdict(),
+            )
+            for name, (node_id, parent_id) in zip(self.parents, pairs)
+        )
+
+    def move(self, name, parent, position=None):
+        return TreeMove(self.ids[name], self.ids[parent] if parent else None, position)
+
+    def children(self, name):
+        return [
+            child.full_name[-1]
+            for child in Employee.objects.get(pk=self.ids[name]).get_children()
+        ]
+
+    def test_batch(self):
+        changes = TreeService._move_nodes(
+            [self.move("d", "a", 0), self.move("f", "b"), self.move("e", None)]
+        )
+
+        self.assertEqual(self.children("a"), ["d", "b"])
+        self.assertEqual(self.children("b"), ["c", "f"])
+        self.assertIsNone(Employee.objects.get(pk=self.ids["e"]).parent_id)
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+        # The old and new parents' levels, the roots included, and headcounts.
+        self.assertEqual(
+            sorted(level["parent"] or "" for level in changes["levels"]),
+            sorted(["", str(self.ids["a"]), str(self.ids["b"])]),
+        )
+        self.assertEqual(
+            changes["descendants"], {str(self.ids["a"]): 4, str(self.ids["b"]): 2}
+        )
+
+    def test_reorder_among_siblings(self):
+        TreeService._move_nodes([self.move("d", "b", 0)])
+
+        self.assertEqual(self.children("b"), ["d", "c"])
+
+    def test_cycles_roll_back_the_batch(self):
+        with self.assertRaises(ValueError):
+            TreeService._move_nodes([self.move("f", "a"), self.move("b", "c")])
+
+        self.assertIsNone(Employee.objects.get(pk=self.ids["f"]).parent_id)
+        self.assertEqual(self.children("b"), ["c", "d"])
+
+    def test_invalid_batches(self):
+        with self.assertRaises(ValueError):
+            TreeService._move_nodes([TreeMove(uuid.uuid4(), None, None)])
+        with mock.patch.object(tree, "MAX_TREE_MOVES", 1), self.assertRaises(
+            ValueError
+        ):
+            TreeService._move_nodes([self.move("c", "a"), self.move("d", "a")])
+
+    def post(self, body):
+        return self.client.post(
+            reverse("employee:update_supervisor"),
+            body,
+            content_type="application/json",
+        )
+
+    def test_endpoint(self):
+        body = json.dumps(
+            {"moves": [{"id": str(self.ids["c"]), "parent": None, "position": None}]}
+        )
+        self.assertEqual(self.post(body).status_code, 302)
+
+        self.client.force_login(
+            get_user_model().objects.create_user("hr", password="secret")
+        )
+        for invalid in ["", "{}", '{"moves": []}', '{"moves": [{"id": "x"}]}']:
+            with self.subTest(body=invalid):
+                self.assertEqual(self.post(invalid).status_code, 400)
+        response = self.post(body)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("levels", response.json())
+        self.assertIsNone(Employee.objects.get(pk=self.ids["c"]).parent_id)
@@ -0,0 +1,124 @@
+import json
+import uuid
+from datetime import date
+
+from django.test import TestCase
+
+from apps.employee.models import Employee
+from apps.employee.service.caching import get_generation
+from apps.employee.service.orgchart import OrgChartService
+from apps.employee.service.tree import compute_tree_positions
+
+
+class OrgChartInvalidationTest(TestCase):
+    def setUp(self):
+        # root -> (left -> leaf), right
+        self.ids = {name: uuid.uuid4() for name in ("root", "left", "leaf", "right")}
+        parents = {"root": None, "left": "root", "leaf": "left", "right": "root"}
+        pairs = [
+            (self.ids[name], self.ids[parent] if parent else None)
+            for name, parent in parents.items()
+        ]
+        positions = compute_tree_positions(pairs)
+
+        Employee.objects.bulk_create(
+            Employee(
+                id=self.ids[name],
+                full_name=name.title(),
+                email=f"{name}@example.com",
+                hire_date=date(2020, 1, 1),
+                parent_id=self.ids[parent] if parent else None,
+                **positions[self.ids[name]]._asdict(),
+            )
+            for name, parent in parents.items()
+        )
+
+    def node_ids(self, *names):
+        return {self.ids[name] for name in names}
+
+    def test_unchanged_manager(self):
+        leaf = Employee.objects.get(pk=self.ids["leaf"])
+        leaf.full_name = "Renamed"
+
+        with self.assertNumQueries(1):
+            node_ids = OrgChartService._get_changed_node_ids(leaf)
+        self.assertEqual(node_ids, self.node_ids("root", "left", "leaf"))
+
+    def test_root_needs_no_query(self):
+        root = Employee.objects.get(pk=self.ids["root"])
+
+        with self.assertNumQueries(0):
+            node_ids = OrgChartService._get_changed_node_ids(root)
+        self.assertEqual(node_ids, self.node_ids("root"))
+
+    def test_deleted_employee(self):
+        leaf = Employee.objects.get(pk=self.ids["leaf"])
+
+        with self.assertNumQueries(1):
+            node_ids = OrgChartService._get_changed_node_ids(leaf, deleted=True)
+        self.assertEqual(node_ids, self.node_ids("root", "left", "leaf"))
+
+    def test_new_manager_adds_their_ancestors(self):
+        leaf = Employee.objects.get(pk=self.ids["leaf"])
+        leaf.parent_id = self.ids["right"]
+
+        with self.assertNumQueries(1):
+            node_ids = OrgChartService._get_changed_node_ids(leaf)
+        self.assertEqual(node_ids, self.node_ids("root", "left", "leaf", "right"))
+
+    def bumped(self, change):
+        before = {
+            name: get_generation(f"orgchart:{node_id}")
+            for name, node_id in self.ids.items()
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        return {
+            name
+            for name, node_id in self.ids.items()
+            if get_generation(f"orgchart:{node_id}") != before[name]
+        }
+
+    def test_mptt_move_bumps_the_old_and_new_ancestors(self):
+        leaf = Employee.objects.get(pk=self.ids["leaf"])
+        leaf.parent = Employee.objects.get(pk=self.ids["right"])
+
+        self.assertEqual(self.bumped(leaf.save), {"root", "left", "right", "leaf"})
+        leaf.refresh_from_db()
+        self.assertEqual(leaf.level, 2)
+
+    def test_snapshot_is_rebuilt_after_a_change(self):
+        snapshot = json.loads(OrgChartService._get_snapshot(self.ids["left"]))
+        self.assertEqual(
+            snapshot,
+            [
+                {
+                    "id": str(self.ids["left"]),
+                    "name": "Left",
+                    "position": "",
+                    "children": [
+                        {"id": str(self.ids["leaf"]), "name": "Leaf", "position": ""}
+                    ],
+                }
+            ],
+        )
+
+        leaf = Employee.objects.get(pk=self.ids["leaf"])
+        leaf.parent = Employee.objects.get(pk=self.ids["right"])
+        with self.captureOnCommitCallbacks(execute=True):
+            leaf.save()
+
+        self.assertNotIn(
+            "children", json.loads(OrgChartService._get_snapshot(self.ids["left"]))[0]
+        )
+        forest = json.loads(OrgChartService._get_snapshot())
+        self.assertEqual(
+            [child["name"] for child in forest[0]["children"]], ["Left", "Right"]
+        )
+        self.assertEqual(forest[0]["children"][1]["children"][0]["name"], "Leaf")
+
+    def test_save_bumps_only_the_snapshots_containing_the_employee(self):
+        leaf = Employee.objects.get(pk=self.ids["leaf"])
+        leaf.full_name = "Renamed"
+
+        self.assertEqual(self.bumped(leaf.save), {"root", "left", "leaf"})
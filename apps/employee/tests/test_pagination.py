@@ -0,0 +1,72 @@
+import uuid
+from datetime import date
+
+from django.test import TestCase
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.pagination import KeysetPaginator
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        position = Position.objects.create(position_name="QA")
+        hire_dates = [date(2020, 1, 1), date(2021, 6, 1), date(2022, 3, 1)]
+        for number in range(13):
+            Employee.objects.create(
+                id=uuid.uuid4(),
+                full_name="Employee {}".format("abcdefghijklm"[number]),
+                email="employee{}@example.com".format(number),
+                # Few distinct values, so most pages start and end inside a tie.
+                hire_date=hire_dates[number % 3],
+                position=position if number % 2 else None,
+            )
+
+    def expected(self, key):
+        rows = Employee.objects.all()
+        return [
+            row.id
+            for row in sorted(
+                rows,
+                key=lambda row: (
+                    getattr(row, key) is None,
+                    getattr(row, key) or "",
+                    row.id,
+                ),
+            )
+        ]
+
+    def walk(self, paginator):
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def assert_round_trip(self, sort_field, key):
+        paginator = KeysetPaginator(Employee.objects.all(), sort_field, per_page=4)
+        pages = self.walk(paginator)
+
+        self.assertEqual([len(page) for page in pages], [4, 4, 4, 1])
+        self.assertEqual([row.id for page in pages for row in page], self.expected(key))
+        self.assertFalse(pages[0].has_previous())
+
+        # Walking back from the last page yields the same pages.
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginator.get_page(page.previous_cursor)
+            self.assertEqual([row.id for row in page], [row.id for row in expected])
+            self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_round_trip_across_ties(self):
+        self.assert_round_trip("hire_date", "hire_date")
+
+    def test_round_trip_across_nulls(self):
+        self.assert_round_trip("position", "position_id")
+
+    def test_invalid_cursor_returns_the_first_page(self):
+        paginator = KeysetPaginator(Employee.objects.all(), "hire_date", per_page=4)
+        first = [row.id for row in paginator.get_page()]
+
+        for cursor in ("not base64!", "e30", "eyJkIjoic2lkZXdheXMifQ"):
+            self.assertEqual([row.id for row in paginator.get_page(cursor)], first)
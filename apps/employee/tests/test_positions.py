@@ -0,0 +1,45 @@
+from django.test import TestCase
+
+from apps.employee.forms import EmployeeForm
+from apps.employee.models import Position
+from apps.employee.service.positions import (
+    get_position_registry,
+    invalidate_position_registry,
+)
+
+
+class PositionRegistryTest(TestCase):
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.qa = Position.objects.create(position_name="QA")
+            self.hr = Position.objects.create(position_name="HR")
+
+    def test_lookups_need_no_queries_once_loaded(self):
+        get_position_registry()
+        with self.assertNumQueries(0):
+            registry = get_position_registry()
+            self.assertEqual(registry.id_for("QA"), self.qa.id)
+            self.assertEqual(registry.name(self.hr.id), "HR")
+            self.assertEqual(registry.matching("q"), [self.qa.id])
+            self.assertEqual(registry.get(self.qa.id), self.qa)
+            EmployeeForm().as_p()
+
+    def test_saving_a_position_reloads_the_registry(self):
+        get_position_registry()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.qa.position_name = "Quality"
+            self.qa.save()
+
+        registry = get_position_registry()
+        self.assertIsNone(registry.id_for("QA"))
+        self.assertEqual(registry.id_for("Quality"), self.qa.id)
+
+    def test_unknown_position_is_rejected(self):
+        with self.assertRaises(Position.DoesNotExist):
+            get_position_registry().get(Position().id)
+
+        form = EmployeeForm(data={"position": str(Position().id)})
+        form.is_valid()
+        self.assertIn("position", form.errors)
@@ -0,0 +1,100 @@
+import uuid
+from datetime import date
+
+from django.test import TestCase
+
+from apps.employee.models import Employee
+from apps.employee.service.tree import TreeService
+
+NESTED_SET_FIELDS = ["tree_id", "lft", "rght", "level"]
+
+
+class TreeRenumberTest(TestCase):
+    def setUp(self):
+        # Two trees with children listed out of id order, so sibling order is
+        # only kept by reading them in lft order.
+        self.ids = {name: uuid.uuid4() for name in "abcdefgh"}
+        shape = [
+            ("a", None, 1),
+            ("c", "a", 1),
+            ("b", "a", 1),
+            ("e", "c", 1),
+            ("d", "c", 1),
+            ("f", "b", 1),
+            ("g", None, 2),
+            ("h", "g", 2),
+        ]
+        Employee.objects.bulk_create(
+            Employee(
+                id=self.ids[name],
+                full_name="Employee {}".format(name),
+                email="{}@example.com".format(name),
+                hire_date=date(2020, 1, 1),
+                parent_id=self.ids[parent] if parent else None,
+                tree_id=tree_id,
+                # Only the order of lft is right; everything else is stale.
+                lft=(number + 1) * 10,
+                rght=0,
+                level=0,
+            )
+            for number, (name, parent, tree_id) in enumerate(shape)
+        )
+        self.stale = self.snapshot()
+
+    def snapshot(self):
+        return {
+            row[0]: tuple(row[1:])
+            for row in Employee.objects.values_list("id", *NESTED_SET_FIELDS)
+        }
+
+    def restore(self, state):
+        Employee.objects.bulk_update(
+            [
+                Employee(id=pk, **dict(zip(NESTED_SET_FIELDS, values)))
+                for pk, values in state.items()
+            ],
+            NESTED_SET_FIELDS,
+        )
+
+    def test_matches_mptt_rebuild(self):
+        self.assertEqual(TreeService._renumber(), 8)
+        renumbered = self.snapshot()
+
+        self.restore(self.stale)
+        Employee.objects.rebuild()
+
+        self.assertEqual(renumbered, self.snapshot())
+        self.assertEqual(renumbered[self.ids["a"]], (1, 1, 12, 0))
+        self.assertEqual(renumbered[self.ids["d"]], (1, 5, 6, 2))
+
+    def test_renumbering_twice_changes_nothing(self):
+        TreeService._renumber()
+        self.assertEqual(TreeService._renumber(), 0)
+
+    def test_dry_run_only_counts(self):
+        self.assertEqual(TreeService._renumber(dry_run=True), 8)
+        self.assertEqual(self.snapshot(), self.stale)
+
+    def test_single_tree(self):
+        self.assertEqual(TreeService._renumber(tree_ids=[2]), 2)
+        state = self.snapshot()
+        self.assertEqual(state[self.ids["h"]], (2, 2, 3, 1))
+        self.assertEqual(state[self.ids["a"]], self.stale[self.ids["a"]])
+
+    def test_rows_without_a_tree_become_new_trees(self):
+        Employee.objects.filter(pk__in=[self.ids["g"], self.ids["h"]]).update(
+            tree_id=0, lft=0
+        )
+
+        TreeService._renumber()
+
+        state = self.snapshot()
+        self.assertEqual(state[self.ids["g"]], (2, 1, 4, 0))
+        self.assertEqual(state[self.ids["h"]], (2, 2, 3, 1))
+
+    def test_unreachable_rows_are_refused(self):
+        Employee.objects.filter(pk=self.ids["c"]).update(parent_id=self.ids["e"])
+
+        with self.assertRaises(ValueError):
+            TreeService._renumber()
+        self.assertEqual(self.snapshot(), self.stale)
@@ -0,0 +1,91 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.employee.models import Employee
+from apps.employee.service.caching import bump_generation
+from apps.employee.service.metrics import get_counters
+from apps.employee.service.positions import invalidate_position_registry
+
+
+@override_settings(EMPLOYEE_RESPONSE_CACHE_TIMEOUT=600)
+class ListResponseCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(20):
+            Employee.objects.create(
+                full_name="Employee {:02}".format(number),
+                email="employee{}@example.com".format(number),
+                hire_date=date(2020, 1, 1 + number),
+            )
+
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.url = reverse("employee:employee_list")
+
+    def counters(self):
+        counters = get_counters("list_cache_hits", "list_cache_misses")
+        return counters["list_cache_hits"], counters["list_cache_misses"]
+
+    def test_pages_are_cached_until_a_write(self):
+        first = self.client.get(self.url, {"sort_by": "email"})
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url, {"sort_by": "email"})
+
+        # Only the savepoint of the atomic request is left.
+        self.assertFalse([query for query in queries if "SELECT" in query["sql"]])
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(self.counters(), (1, 1))
+        bump_generation("employee")
+        self.client.get(self.url, {"sort_by": "email"})
+        self.assertEqual(self.counters(), (1, 2))
+
+    def test_links_carry_only_the_list_params(self):
+        first = self.client.get(
+            self.url, {"sort_by": "email", "search": "", "utm_source": "mail"}
+        )
+        second = self.client.get(self.url, {"ref": "home", "sort_by": "email"})
+
+        self.assertEqual(self.counters(), (1, 1))
+        for response in [first, second]:
+            content = response.content.decode()
+            self.assertIn("?sort_by=email&cursor=", content)
+            self.assertNotIn("utm_source", content)
+            self.assertNotIn("ref=home", content)
+
+    def test_the_last_days_follow_the_date(self):
+        params = {"hired_within_days": 30}
+
+        with mock.patch(
+            "django.utils.timezone.localdate", return_value=date(2020, 1, 25)
+        ):
+            first = self.client.get(self.url, params)
+            self.client.get(self.url, params)
+        with mock.patch(
+            "django.utils.timezone.localdate", return_value=date(2020, 2, 10)
+        ):
+            later = self.client.get(self.url, params)
+
+        self.assertEqual(self.counters(), (1, 2))
+        self.assertEqual(len(first.context["employees"]), 15)
+        self.assertEqual(len(later.context["employees"]), 10)
+
+    def test_signed_in_users_are_not_cached(self):
+        self.client.force_login(
+            get_user_model().objects.create_user("user", password="secret")
+        )
+
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.assertEqual(self.counters(), (0, 0))
@@ -0,0 +1,89 @@
+import unittest
+from datetime import date
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.test import TestCase
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.employees import EmployeeService, HireDateRange
+from apps.employee.service.positions import invalidate_position_registry
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        self.position = Position.objects.create(position_name="Data Engineer")
+        self.boss = Employee.objects.create(
+            full_name="Margaret Hamilton",
+            email="margaret@example.com",
+            hire_date=date(2019, 5, 1),
+        )
+        self.report = Employee.objects.create(
+            full_name="Alan Turing",
+            email="alan@example.com",
+            hire_date=date(2020, 2, 3),
+            position=self.position,
+            parent=self.boss,
+        )
+        self.other = Employee.objects.create(
+            full_name="Grace Hopper",
+            email="grace@navy.example.com",
+            hire_date=date(2021, 7, 8),
+        )
+
+    def search(self, query):
+        return list(EmployeeService._get_search_queryset(query))
+
+    def test_name_email_position_and_manager(self):
+        self.assertEqual(self.search("turing"), [self.report])
+        self.assertEqual(self.search("navy"), [self.other])
+        self.assertEqual(self.search("engineer"), [self.report])
+        self.assertIn(self.report, self.search("hamilton"))
+
+    def test_hire_date(self):
+        self.assertEqual(self.search("2021-07-08"), [self.other])
+
+    def test_pages_with_a_hire_date_range(self):
+        page = EmployeeService._search_employees(
+            "example",
+            items_per_page=2,
+            hire_date_range=HireDateRange(date(2020, 1, 1), None),
+        )
+
+        self.assertEqual(page.paginator.count, 2)
+        self.assertEqual(
+            {row.full_name for row in page}, {"Alan Turing", "Grace Hopper"}
+        )
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "full-text search")
+    def test_partial_words_and_typos(self):
+        self.assertEqual(self.search("Turin"), [self.report])
+        self.assertEqual(self.search("Hoper"), [self.other])
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "full-text search")
+    def test_best_match_first(self):
+        self.assertEqual(self.search("Margaret Hamilton")[0], self.boss)
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "search triggers")
+    def test_renames_refresh_the_search_columns(self):
+        self.position.position_name = "Cryptanalyst"
+        self.position.save()
+        self.boss.full_name = "Ada Lovelace"
+        self.boss.save()
+
+        self.report.refresh_from_db()
+        self.assertEqual(
+            self.report.search_text,
+            "Alan Turing alan@example.com Cryptanalyst Ada Lovelace",
+        )
+        matches = Employee.objects.filter(
+            search_document=SearchQuery("lovelace", config="simple")
+        )
+        self.assertEqual(set(matches), {self.boss, self.report})
+        self.assertFalse(
+            Employee.objects.filter(
+                search_document=SearchQuery("hamilton", config="simple")
+            ).exists()
+        )
@@ -0,0 +1,125 @@
+import io
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.caching import get_generation
+from apps.employee.service.fixtures import read_fixture
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.positions import invalidate_position_registry
+from apps.employee.service.seeding import POSITION_NAMES
+from apps.employee.service.tree import TreePosition, compute_tree_positions
+
+
+class ComputeTreePositionsTest(TestCase):
+    def test_forest(self):
+        positions = compute_tree_positions(
+            [("a", None), ("b", "a"), ("c", "a"), ("d", "b"), ("e", None)],
+            first_tree_id=3,
+        )
+
+        self.assertEqual(
+            positions,
+            {
+                "a": TreePosition(3, 1, 8, 0),
+                "b": TreePosition(3, 2, 5, 1),
+                "d": TreePosition(3, 3, 4, 2),
+                "c": TreePosition(3, 6, 7, 1),
+                "e": TreePosition(4, 1, 2, 0),
+            },
+        )
+
+    def test_roots_keep_their_tree_ids(self):
+        positions = compute_tree_positions(
+            [("a", None), ("b", None), ("c", None)], root_tree_ids={"b": 7}
+        )
+
+        self.assertEqual([positions[node].tree_id for node in "abc"], [1, 7, 2])
+
+    def test_unreachable_nodes(self):
+        with self.assertRaises(ValueError):
+            compute_tree_positions([("a", None), ("b", "x")])
+        with self.assertRaises(ValueError):
+            compute_tree_positions([("a", "b"), ("b", "a")])
+
+
+class BulkSeedTest(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+
+    def seed(self, *args, output="employees.jsonl"):
+        # Outside a test the position registry is reloaded as every position
+        # is committed.
+        with self.captureOnCommitCallbacks(execute=True), redirect_stdout(
+            io.StringIO()
+        ):
+            call_command(
+                "seed_employees",
+                *args,
+                "--output",
+                str(self.directory / output),
+                stdout=io.StringIO(),
+            )
+        return self.directory / output
+
+    def test_bulk_seed_writes_a_valid_tree(self):
+        generations = get_generation("employee"), get_generation("tree")
+
+        fixture = self.seed("25", "--bulk", "--batch-size", "7")
+
+        self.assertEqual(Employee.objects.count(), 25)
+        self.assertEqual(Employee.objects.filter(parent__isnull=True).count(), 1)
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+        # Bulk inserts skip the signals, so the generations are bumped instead.
+        self.assertNotEqual(
+            (get_generation("employee"), get_generation("tree")), generations
+        )
+
+        records = list(read_fixture(fixture))
+        self.assertEqual(
+            [record["model"] for record in records],
+            ["employee.position"] * len(POSITION_NAMES) + ["employee.employee"] * 25,
+        )
+        saved = {
+            str(pk): (lft, rght)
+            for pk, lft, rght in Employee.objects.values_list("id", "lft", "rght")
+        }
+        self.assertEqual(
+            {
+                record["pk"]: (record["fields"]["lft"], record["fields"]["rght"])
+                for record in records[len(POSITION_NAMES) :]
+            },
+            saved,
+        )
+
+    def test_a_second_seed_adds_a_tree(self):
+        self.seed("10", "--bulk")
+        first_tree = list(Employee.objects.values_list("id", "lft", "rght", "tree_id"))
+
+        self.seed("10", "--bulk", "--copy", output="more.json.gz")
+
+        self.assertEqual(Employee.objects.count(), 20)
+        self.assertEqual(Position.objects.count(), len(POSITION_NAMES))
+        self.assertEqual(
+            list(
+                Employee.objects.filter(tree_id=1).values_list(
+                    "id", "lft", "rght", "tree_id"
+                )
+            ),
+            first_tree,
+        )
+        self.assertEqual(Employee.objects.filter(tree_id=2).count(), 10)
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+
+    def test_without_supervisors_nothing_is_written(self):
+        self.seed("5", "0", "--bulk")
+
+        self.assertFalse(Employee.objects.exists())
@@ -0,0 +1,138 @@
+import io
+import unittest
+from datetime import date
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.employees import SORT_FIELDS, EmployeeService
+from apps.employee.service.plans import QueryPlanService, SortPlan
+from apps.employee.service.positions import invalidate_position_registry
+
+
+class SortFieldTest(TestCase):
+    def test_every_option_sorts_by_an_indexed_column(self):
+        self.assertEqual(
+            SORT_FIELDS,
+            {
+                "full_name": "full_name",
+                "position": "position_name",
+                "hire_date": "hire_date",
+                "email": "email",
+                "manager": "manager_name",
+            },
+        )
+        indexed = {index.fields[0] for index in Employee._meta.indexes}
+        self.assertLessEqual(set(SORT_FIELDS.values()), indexed)
+
+    def test_unknown_options_sort_by_name(self):
+        for sort_by in ["first_name", "parent", ""]:
+            with self.subTest(sort_by=sort_by):
+                self.assertEqual(EmployeeService._get_sort_field(sort_by), "full_name")
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "sort key trigger")
+class SortKeyTest(TestCase):
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        self.position = Position.objects.create(position_name="Manager")
+        self.boss = Employee.objects.create(
+            full_name="Zed Boss",
+            email="zed@example.com",
+            hire_date=date(2019, 1, 1),
+            position=self.position,
+        )
+        self.report = Employee.objects.create(
+            full_name="Amy Report",
+            email="amy@example.com",
+            hire_date=date(2020, 1, 1),
+            parent=self.boss,
+        )
+
+    def sort_keys(self, employee):
+        employee.refresh_from_db()
+        return employee.position_name, employee.manager_name
+
+    def test_keys_follow_the_position_and_manager(self):
+        self.assertEqual(self.sort_keys(self.boss), ("Manager", ""))
+        self.assertEqual(self.sort_keys(self.report), ("", "Zed Boss"))
+
+        self.position.position_name = "Director"
+        self.position.save()
+        self.boss.full_name = "Yan Boss"
+        self.boss.save()
+
+        self.assertEqual(self.sort_keys(self.boss), ("Director", ""))
+        self.assertEqual(self.sort_keys(self.report), ("", "Yan Boss"))
+
+    def test_sorts(self):
+        def names(sort_by):
+            return [
+                row.full_name for row in EmployeeService._get_sorted_employees(sort_by)
+            ]
+
+        self.assertEqual(names("full_name"), ["Amy Report", "Zed Boss"])
+        self.assertEqual(names("position"), ["Amy Report", "Zed Boss"])
+        self.assertEqual(names("manager"), ["Zed Boss", "Amy Report"])
+        self.assertEqual(names("hire_date"), ["Zed Boss", "Amy Report"])
+
+
+class SortPlanTest(TestCase):
+    def setUp(self):
+        for number in range(5):
+            Employee.objects.create(
+                full_name="Employee {}".format(number),
+                email="employee{}@example.com".format(number),
+                hire_date=date(2020, 1, 1 + number),
+            )
+
+    def test_every_sort_and_page_is_explained(self):
+        plans = QueryPlanService._check_sort_plans(per_page=2)
+
+        self.assertEqual(
+            [(plan.sort_by, plan.page) for plan in plans],
+            [(sort_by, page) for sort_by in SORT_FIELDS for page in ["first", "next"]],
+        )
+        if connection.vendor != "postgresql":
+            self.assertTrue(all(plan.index_only_order is None for plan in plans))
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "query plans")
+    def test_every_sort_can_be_served_by_an_index(self):
+        # The table is too small for the planner to prefer an index on its own.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+
+        plans = QueryPlanService._check_sort_plans(per_page=2)
+
+        self.assertEqual(
+            [plan.sort_by for plan in plans if not plan.index_only_order], []
+        )
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "query plans")
+    def test_a_sort_node_fails_the_check(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+        plan = QueryPlanService._explain(Employee.objects.order_by("full_name"))
+
+        self.assertFalse(plan.index_only_order)
+
+    def test_command_fails_on_a_full_sort(self):
+        plans = [
+            SortPlan("email", "first", True, ["Index Scan on employee_employee"], ""),
+            SortPlan("manager", "next", False, ["Sort", "Seq Scan"], ""),
+        ]
+        stdout = io.StringIO()
+
+        with mock.patch.object(
+            QueryPlanService, "_check_sort_plans", return_value=plans
+        ), self.assertRaisesMessage(CommandError, "manager (next page)"):
+            call_command("explain_employee_sorts", stdout=stdout)
+
+        self.assertIn("email, first page", stdout.getvalue())
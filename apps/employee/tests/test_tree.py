@@ -0,0 +1,106 @@
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.employee.models import Employee
+from apps.employee.service.tree import TreeService, compute_tree_positions
+
+
+class TreeLevelTest(TestCase):
+    def setUp(self):
+        self.root = uuid.uuid4()
+        self.children = children = [uuid.uuid4() for _number in range(10)]
+        self.grandchildren = [uuid.uuid4() for _number in range(2)]
+        pairs = (
+            [(self.root, None)]
+            + [(child, self.root) for child in children]
+            + [(grandchild, children[0]) for grandchild in self.grandchildren]
+        )
+        positions = compute_tree_positions(pairs)
+        Employee.objects.bulk_create(
+            Employee(
+                id=node_id,
+                full_name="Employee",
+                email="employee@example.com",
+                hire_date=date(2020, 1, 1),
+                parent_id=parent_id,
+                **positions[node_id]._asdict(),
+            )
+            for node_id, parent_id in pairs
+        )
+
+    def test_nested_levels_are_loaded_within_the_cap(self):
+        level = TreeService._get_tree_level(depth=2)
+
+        (root,) = level["nodes"]
+        self.assertEqual(len(root["children"]), 10)
+        self.assertEqual(root["descendants"], 12)
+        self.assertNotIn("children", root["children"][0])
+
+    def test_one_level(self):
+        with self.assertNumQueries(2):
+            level = TreeService._get_tree_level(self.root)
+
+        self.assertEqual(level["parent"], str(self.root))
+        self.assertIsNone(level["next"])
+        first = level["nodes"][0]
+        self.assertEqual(first["id"], str(self.children[0]))
+        self.assertEqual((first["has_children"], first["descendants"]), (True, 2))
+        self.assertEqual(
+            [node["has_children"] for node in level["nodes"][1:]], [False] * 9
+        )
+
+    def test_depth_costs_one_query_per_level(self):
+        with self.assertNumQueries(3):
+            level = TreeService._get_tree_level(depth=10)
+
+        first = level["nodes"][0]["children"][0]
+        self.assertEqual(
+            [child["id"] for child in first["children"]],
+            [str(grandchild) for grandchild in self.grandchildren],
+        )
+
+    def test_pages(self):
+        seen, after = [], None
+        while True:
+            level = TreeService._get_tree_level(self.root, after=after, limit=4)
+            seen.extend(node["id"] for node in level["nodes"])
+            after = level["next"]
+            if after is None:
+                break
+
+        self.assertEqual(seen, [str(child) for child in self.children])
+
+    def test_unknown_parent(self):
+        with self.assertRaises(ValueError):
+            TreeService._get_tree_level(uuid.uuid4())
+
+    def test_api(self):
+        url = reverse("employee:employee_tree_api")
+
+        response = self.client.get(url, {"parent": str(self.root), "limit": 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["nodes"]), 3)
+        self.assertIsNotNone(response.json()["next"])
+
+        for params in [{"parent": "x"}, {"depth": "deep"}, {"after": "1.5"}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+        response = self.client.get(url, {"parent": str(uuid.uuid4())})
+        self.assertEqual(response.status_code, 404)
+
+    @mock.patch("apps.employee.service.tree.MAX_TREE_NODES", 5)
+    def test_a_level_over_the_cap_is_left_for_a_later_request(self):
+        with CaptureQueriesContext(connection) as queries:
+            level = TreeService._get_tree_level(depth=2)
+
+        (root,) = level["nodes"]
+        self.assertNotIn("children", root)
+        self.assertTrue(root["has_children"])
+        # The level below is read only up to one row past the cap.
+        self.assertIn("LIMIT 5", queries.captured_queries[-1]["sql"])
@@ -0,0 +1,139 @@
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.employee.models import Employee
+from apps.employee.service.caching import get_generation
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.metrics import get_metric
+from apps.employee.service.positions import invalidate_position_registry
+from apps.employee.service.tree import TreeService, compute_tree_positions
+from apps.employee.service.treewrites import UNPLACED_LFT, TreeWriteService
+
+
+class TreeWriteServiceTest(TestCase):
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # a -> (b -> c, d) and e.
+        self.ids = {name: uuid.uuid4() for name in "abcde"}
+        parents = {"a": None, "b": "a", "c": "b", "d": "a", "e": None}
+        positions = compute_tree_positions(
+            (self.ids[name], self.ids[parent] if parent else None)
+            for name, parent in parents.items()
+        )
+        Employee.objects.bulk_create(
+            self.employee(name, parent, **positions[self.ids[name]]._asdict())
+            for name, parent in parents.items()
+        )
+
+    def employee(self, name, parent, **nested_set):
+        self.ids.setdefault(name, uuid.uuid4())
+        return Employee(
+            id=self.ids[name],
+            full_name="Employee {}".format(name),
+            email="{}@example.com".format(name),
+            hire_date=date(2020, 1, 1),
+            parent_id=self.ids[parent] if parent else None,
+            **nested_set,
+        )
+
+    def insert(self, name, parent):
+        with self.captureOnCommitCallbacks(execute=True):
+            TreeWriteService._insert(self.employee(name, parent))
+
+    def queue(self, name, parent, tree_id=1):
+        Employee.objects.bulk_create(
+            [self.employee(name, parent, tree_id=tree_id, lft=0, rght=1, level=0)]
+        )
+
+    def children(self, name):
+        return [
+            child.full_name[-1]
+            for child in Employee.objects.get(pk=self.ids[name]).get_children()
+        ]
+
+    def nested_set(self, name):
+        return Employee.objects.values_list("lft", "rght", "level").get(
+            pk=self.ids[name]
+        )
+
+    def test_insert_is_placed_after_the_commit(self):
+        self.insert("f", "b")
+
+        self.assertEqual(self.children("b"), ["c", "f"])
+        self.assertEqual(self.nested_set("f"), (5, 6, 2))
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+        self.assertEqual(get_metric("tree_batch_rows").last, 1)
+
+    def test_a_burst_is_placed_in_one_pass_without_renumbering(self):
+        self.queue("f", "b")
+        self.queue("g", "a")
+        self.queue("h", "f")
+        self.queue("i", "c")
+        generation = get_generation("tree")
+
+        with mock.patch.object(TreeService, "_renumber") as renumber:
+            self.assertEqual(TreeWriteService._flush(1), 4)
+
+        renumber.assert_not_called()
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+        self.assertEqual(self.children("a"), ["b", "d", "g"])
+        self.assertEqual(self.children("b"), ["c", "f"])
+        self.assertEqual(self.children("f"), ["h"])
+        self.assertEqual(self.nested_set("h"), (8, 9, 3))
+        self.assertGreater(get_generation("tree"), generation)
+
+    def test_rows_left_of_the_new_reports_are_not_rewritten(self):
+        self.queue("f", "d")
+
+        TreeWriteService._flush(1)
+
+        self.assertEqual(self.nested_set("b"), (2, 5, 1))
+        self.assertEqual(self.nested_set("c"), (3, 4, 2))
+        self.assertEqual(self.nested_set("a"), (1, 10, 0))
+
+    def test_nothing_queued(self):
+        generation = get_generation("tree")
+
+        self.assertEqual(TreeWriteService._flush(1), 0)
+        self.assertEqual(get_generation("tree"), generation)
+
+    def test_a_manager_in_another_tree_takes_a_renumbering(self):
+        self.queue("f", "b")
+        Employee.objects.filter(pk=self.ids["b"]).update(
+            parent_id=self.ids["e"], tree_id=2
+        )
+
+        self.assertEqual(TreeWriteService._flush(1), 1)
+
+        self.assertFalse(Employee.objects.filter(lft=UNPLACED_LFT).exists())
+        self.assertEqual(TreeIntegrityService._check([1]).issues, {})
+
+    def test_a_locked_tree_is_waited_for(self):
+        self.queue("f", "b")
+
+        with mock.patch.object(
+            TreeService, "_try_lock_tree", return_value=False
+        ), mock.patch.object(
+            TreeService, "_lock_trees", wraps=TreeService._lock_trees
+        ) as lock:
+            self.assertEqual(TreeWriteService._flush(1), 1)
+
+        lock.assert_called_once_with([1])
+        self.assertEqual(self.children("b"), ["c", "f"])
+
+    def test_update_moves(self):
+        employee = Employee.objects.get(pk=self.ids["c"])
+        employee.full_name = "Employee x"
+        employee.parent_id = self.ids["d"]
+
+        TreeWriteService._update(employee)
+
+        self.assertEqual(self.children("d"), ["x"])
+        self.assertEqual(TreeIntegrityService._check().issues, {})
@@ -0,0 +1,159 @@
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.employee.models import Employee
+from apps.employee.service import typeahead
+from apps.employee.service.caching import bump_generation, get_generation
+from apps.employee.service.typeahead import (
+    REBUILD,
+    TYPEAHEAD_DELTA_KEY,
+    TypeaheadIndex,
+    get_typeahead_index,
+    invalidate_typeahead_index,
+)
+
+
+class TypeaheadIndexTest(TestCase):
+    def setUp(self):
+        self.ann = uuid.uuid4()
+        self.bob = uuid.uuid4()
+        self.index = TypeaheadIndex()
+        self.index.build(
+            [
+                (self.ann, "Ann Smith", "ann.smith@example.com"),
+                (self.bob, "Bob Anderson", "bob@example.com"),
+            ]
+        )
+
+    def ids(self, query):
+        return [match.id for match in self.index.search(query)]
+
+    def test_whole_name_prefixes_rank_before_later_words(self):
+        self.assertEqual(self.ids("an"), [self.ann, self.bob])
+        self.assertEqual(self.ids("smi"), [self.ann])
+        self.assertEqual(self.ids("bob@"), [self.bob])
+
+    def test_trigrams_tolerate_typos(self):
+        self.assertEqual(self.ids("andersen"), [self.bob])
+
+    def test_upsert_and_remove(self):
+        self.index.upsert(self.ann, "Anna Jones", "anna@example.com")
+        self.assertEqual(self.ids("smith"), [])
+        self.assertEqual(self.ids("jon"), [self.ann])
+
+        self.index.remove(self.bob)
+        self.assertEqual(self.ids("bob"), [])
+        self.assertEqual(len(self.index), 1)
+
+    def test_added_keys_are_found_before_and_after_compaction(self):
+        carl = uuid.uuid4()
+        self.index.upsert(carl, "Anders Carlsson", "carl@example.com")
+        self.assertEqual(self.ids("ander")[:2], [carl, self.bob])
+        self.assertEqual(self.ids("carl")[0], carl)
+
+        self.index._compact()
+        self.assertEqual(self.ids("ander")[:2], [carl, self.bob])
+        self.assertEqual(self.ids("carl")[0], carl)
+
+
+class TypeaheadChangesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(setattr, typeahead._index, "generation", None)
+        typeahead._index.load()
+        warm = mock.patch.object(typeahead, "warm_typeahead_index")
+        self.warm = warm.start()
+        self.addCleanup(warm.stop)
+
+    def create_employee(self, full_name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Employee.objects.create(
+                full_name=full_name,
+                email="{}@example.com".format(full_name.split()[0].lower()),
+                hire_date=date(2020, 1, 1),
+            )
+
+    def publish(self, changes, generation=None):
+        # What another process's publish_typeahead_changes stores.
+        if generation is None:
+            generation = bump_generation("typeahead")
+        cache.set(TYPEAHEAD_DELTA_KEY.format(generation=generation), changes)
+        return generation
+
+    def ids(self, query):
+        return [match.id for match in typeahead._index.search(query)]
+
+    def test_local_saves_and_deletes_are_applied_on_commit(self):
+        employee = self.create_employee("Carol Smith")
+
+        self.assertEqual(typeahead._index.generation, get_generation("typeahead"))
+        self.assertEqual(self.ids("carol"), [employee.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.delete()
+        self.assertEqual(self.ids("carol"), [])
+        self.warm.assert_not_called()
+
+    @override_settings(EMPLOYEE_TYPEAHEAD_MAX_STALENESS=0)
+    def test_changes_from_other_processes_are_applied_without_a_rebuild(self):
+        employee_id = uuid.uuid4()
+        self.publish([(employee_id, "Dave Jones", "dave@example.com")])
+
+        self.assertIs(get_typeahead_index(), typeahead._index)
+        self.assertEqual(self.ids("dave"), [employee_id])
+
+        self.publish([(employee_id, None, None)])
+        get_typeahead_index()
+        self.assertEqual(self.ids("dave"), [])
+        self.warm.assert_not_called()
+
+    def test_changes_are_applied_in_generation_order(self):
+        employee_id = uuid.uuid4()
+        first = bump_generation("typeahead")
+        # A later change is published before an earlier one: nothing is
+        # applied until the earlier one arrives.
+        self.publish([(employee_id, None, None)])
+        self.assertTrue(typeahead._index.catch_up())
+        self.assertEqual(typeahead._index.generation, first - 1)
+
+        self.publish([(employee_id, "Erin Brown", "erin@example.com")], first)
+        self.assertTrue(typeahead._index.catch_up())
+        self.assertEqual(typeahead._index.generation, get_generation("typeahead"))
+        self.assertEqual(self.ids("erin"), [])
+
+    def test_a_local_save_does_not_skip_changes_from_other_processes(self):
+        other_id = uuid.uuid4()
+        self.publish([(other_id, "Frank Green", "frank@example.com")])
+
+        employee = self.create_employee("Frances White")
+
+        self.assertEqual(self.ids("fran"), [employee.id, other_id])
+
+    def test_bulk_writes_and_lost_changes_rebuild_the_index(self):
+        invalidate_typeahead_index()
+        self.assertFalse(typeahead._index.catch_up())
+
+        typeahead._index.load()
+        self.assertTrue(typeahead._index.catch_up())
+        generation = bump_generation("typeahead")
+        self.publish([], generation + 1)
+        bump_generation("typeahead")
+        # A change that never arrives is waited for, then given up on.
+        self.assertTrue(typeahead._index.catch_up())
+        with mock.patch.object(typeahead, "TYPEAHEAD_DELTA_WAIT", 0):
+            self.assertFalse(typeahead._index.catch_up())
+
+    def test_a_rebuild_is_published_as_a_marker(self):
+        invalidate_typeahead_index()
+
+        self.assertEqual(
+            cache.get(
+                TYPEAHEAD_DELTA_KEY.format(generation=get_generation("typeahead"))
+            ),
+            REBUILD,
+        )
@@ -0,0 +1,133 @@
+import io
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from apps.employee.models import Employee, Position
+from apps.employee.service.integrity import TreeIntegrityService
+from apps.employee.service.positions import invalidate_position_registry
+from apps.employee.service.tree import compute_tree_positions
+from apps.employee.service.wipe import EmployeeWipeService
+
+
+class EmployeeWipeServiceTest(TestCase):
+    def setUp(self):
+        invalidate_position_registry()
+        self.addCleanup(invalidate_position_registry)
+        # Two trees: a -> (b -> (c, d)), e and f -> g.
+        self.ids = {name: uuid.uuid4() for name in "abcdefg"}
+        self.parents = {
+            "a": None,
+            "b": "a",
+            "c": "b",
+            "d": "b",
+            "e": "a",
+            "f": None,
+            "g": "f",
+        }
+        positions = compute_tree_positions(
+            (self.ids[name], self.ids[parent] if parent else None)
+            for name, parent in self.parents.items()
+        )
+        self.position = Position.objects.create(position_name="QA")
+        Employee.objects.bulk_create(
+            self.employee(name, **positions[self.ids[name]]._asdict())
+            for name in self.parents
+        )
+
+    def employee(self, name, **nested_set):
+        parent = self.parents[name]
+        return Employee(
+            id=self.ids[name],
+            full_name="Employee {}".format(name),
+            email="{}@example.com".format(name),
+            hire_date=date(2020, 1, 1),
+            position=self.position,
+            parent_id=self.ids[parent] if parent else None,
+            **nested_set,
+        )
+
+    def names(self):
+        remaining = set(Employee.objects.values_list("pk", flat=True))
+        return sorted(name for name, pk in self.ids.items() if pk in remaining)
+
+    def test_delete_subtree(self):
+        # A report whose placement is still queued is outside the lft range.
+        self.ids["h"], self.parents["h"] = uuid.uuid4(), "c"
+        Employee.objects.bulk_create(
+            [self.employee("h", tree_id=1, lft=0, rght=0, level=0)]
+        )
+
+        self.assertEqual(EmployeeWipeService._delete_subtree(self.ids["b"]), 4)
+
+        self.assertEqual(self.names(), ["a", "e", "f", "g"])
+        self.assertEqual(TreeIntegrityService._check().issues, {})
+        root = Employee.objects.get(pk=self.ids["a"])
+        self.assertEqual((root.lft, root.rght), (1, 4))
+
+    def test_delete_unknown_subtree(self):
+        with self.assertRaises(ValueError):
+            EmployeeWipeService._delete_subtree(uuid.uuid4())
+
+    def test_delete_tree(self):
+        self.assertEqual(EmployeeWipeService._delete_tree(2), 2)
+
+        self.assertEqual(self.names(), ["a", "b", "c", "d", "e"])
+
+    def test_delete_in_chunks(self):
+        progress = []
+
+        deleted = EmployeeWipeService._delete_in_chunks(
+            chunk_size=2, progress=progress.append
+        )
+
+        self.assertEqual(deleted, 7)
+        self.assertEqual(progress[-1], 7)
+        self.assertGreater(len(progress), 3)
+        self.assertFalse(Employee.objects.exists())
+        self.assertFalse(Position.objects.exists())
+
+    def test_delete_in_chunks_keeps_positions(self):
+        EmployeeWipeService._delete_in_chunks(include_positions=False)
+
+        self.assertFalse(Employee.objects.exists())
+        self.assertTrue(Position.objects.exists())
+
+
+class DeleteEmployeesCommandTest(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(
+            full_name="Employee", email="e@example.com", hire_date=date(2020, 1, 1)
+        )
+
+    def delete(self, *args):
+        call_command("delete_employees", *args, stdout=io.StringIO())
+
+    def test_invalid_subtree(self):
+        for value in ["not-a-uuid", str(uuid.uuid4())]:
+            with self.subTest(value=value), self.assertRaises(CommandError):
+                self.delete("--subtree", value)
+        self.assertTrue(Employee.objects.exists())
+
+    def test_subtree(self):
+        self.delete("--subtree", str(self.employee.pk))
+
+        self.assertFalse(Employee.objects.exists())
+
+    @mock.patch.object(EmployeeWipeService, "_truncate", return_value=False)
+    def test_only_an_explicit_full_wipe_truncates(self, truncate):
+        self.delete("--fast")
+
+        truncate.assert_not_called()
+        self.assertFalse(Employee.objects.exists())
+
+        self.delete("--truncate")
+
+        truncate.assert_called_once_with()
+
+    def test_truncate_is_a_full_wipe(self):
+        with self.assertRaises(CommandError):
+            self.delete("--truncate", "--tree-id", "1")
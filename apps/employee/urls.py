@@ -7,6 +7,13 @@ app_name = "employee"
 urlpatterns = [
     path("", views.EmployeeListView.as_view(), name="employee_list"),
     path("create", views.EmployeeCreateView.as_view(), name="employee_create"),
+    path("export/", views.EmployeeExportView.as_view(), name="employee_export"),
+    path(
+        "autocomplete/",
+        views.EmployeeAutocompleteView.as_view(),
+        name="employee_autocomplete",
+    ),
+    path("transfer/", views.EmployeeTransferView.as_view(), name="employee_transfer"),
     path(
         "<uuid:employee_id>/update",
         views.EmployeeUpdateView.as_view(),
@@ -22,12 +29,39 @@ urlpatterns = [
         views.EmployeeDetailView.as_view(),
         name="employee_detail",
     ),
-    # path("tree/", views.EmployeeTreeView.as_view(), name="employee_tree"),
+    path("tree/", views.EmployeeTreeView.as_view(), name="employee_tree"),
+    path("tree/api/", views.EmployeeTreeApiView.as_view(), name="employee_tree_api"),
+    path(
+        "tree/move/",
+        views.UpdateEmployeeSupervisor.as_view(),
+        name="update_supervisor",
+    ),
+    path(
+        "tree/snapshot/",
+        views.EmployeeOrgChartSnapshotView.as_view(),
+        name="employee_tree_snapshot",
+    ),
+    path(
+        "tree/metrics/",
+        views.EmployeeTreeMetricsView.as_view(),
+        name="employee_tree_metrics",
+    ),
+    path(
+        "cache/metrics/",
+        views.EmployeeCacheMetricsView.as_view(),
+        name="employee_cache_metrics",
+    ),
+    path("jobs/<uuid:job_id>/", views.EmployeeJobView.as_view(), name="employee_job"),
+    path(
+        "jobs/<uuid:job_id>/cancel/",
+        views.EmployeeJobCancelView.as_view(),
+        name="employee_job_cancel",
+    ),
+    path(
+        "jobs/<str:kind>/",
+        views.EmployeeJobCreateView.as_view(),
+        name="employee_job_create",
+    ),
     # path("ajax_table/", views.EmployeeTableAjax.as_view(), name="employee_table_ajax"),
     # path("<uuid:id>/detail", views.EmployeeEditView.as_view(), name="employee_detail"),
-    # path(
-    #     "update_supervisor/",
-    #     views.UpdateEmployeeSupervisor.as_view(),
-    #     name="update_supervisor",
-    # ),
 ]
@@ -1,11 +1,22 @@
-from typing import Any, Dict, Optional
+import json
+from uuid import UUID
+from typing import Any, Dict, List, Optional, Tuple
 
+from django.conf import settings
 from django.shortcuts import render
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.db.models.query import QuerySet
-from django.http import HttpRequest, HttpResponse
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
+from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import (
     View,
     UpdateView,
@@ -13,8 +24,20 @@ from django.views.generic import (
     DetailView,
     CreateView,
 )
-from apps.employee.forms import EmployeeForm
+from apps.employee.forms import (
+    JOB_FORMS,
+    EmployeeFilterForm,
+    EmployeeForm,
+    EmployeeTransferForm,
+)
 from apps.employee.service.employees import EmployeeService
+from apps.employee.service.exports import EXPORT_FORMATS, EmployeeExportService
+from apps.employee.service.fragments import RowFragmentService
+from apps.employee.service.jobs import JobService
+from apps.employee.service.orgchart import OrgChartService
+from apps.employee.service.responses import ResponseCacheService
+from apps.employee.service.tree import TreeMove, TreeService
+from apps.employee.service.treewrites import TreeWriteService
 
 
 class EmployeeListView(View):
@@ -22,43 +45,441 @@ class EmployeeListView(View):
     template_name = "employee/employee_list.html"
     items_per_page = 15
 
+    # The query parameters a page of the list depends on.
+    list_params = (
+        "sort_by",
+        "page",
+        "cursor",
+        "search",
+        *EmployeeFilterForm.base_fields,
+    )
+
     def get(self, request: HttpRequest) -> HttpResponse:
         """
         Retrieves a paginated list of employees based on the provided parameters.
 
+        Pages are fetched with keyset pagination (``cursor``) unless a page number
+        is requested explicitly with ``page``. The hire date filters of
+        ``EmployeeFilterForm`` apply to every mode. Pages rendered for anonymous
+        visitors are cached until the next change to employees or positions.
+
         Args:
             request (HttpRequest): The HTTP request object.
 
         Returns:
             HttpResponse: The HTTP response object containing the rendered template.
         """
-        sort_by = request.GET.get("sort_by", "first_name")
-        page_number = int(request.GET.get("page", 1))
+        variant = self.get_list_params(request)
+        if request.GET.get("hired_within_days"):
+            # "The last N days" end today: the page changes with the date.
+            variant.append(("today", timezone.localdate().isoformat()))
+        return ResponseCacheService._get_or_render(
+            "list", request, variant, lambda: self.render_list(request)
+        )
+
+    def get_list_params(self, request: HttpRequest) -> List[Tuple[str, str]]:
+        """
+        Return the values of ``list_params`` in the request, in their order.
+        """
+        return [(name, request.GET.get(name, "")) for name in self.list_params]
+
+    def render_list(self, request: HttpRequest) -> HttpResponse:
+        """
+        Render the page of the list requested by the query parameters.
+        """
+        sort_by = request.GET.get("sort_by", "full_name")
+        page_number = request.GET.get("page")
+        cursor = request.GET.get("cursor")
         search_query = request.GET.get("search", "").strip()
+        filter_form = EmployeeFilterForm(request.GET)
+        hire_date_range = filter_form.get_hire_date_range()
 
-        employees = (
-            self.employee_service._search_employees(search_query, self.items_per_page)
-            if search_query
-            else self.employee_service._get_paginated_employees(
-                sort_by, page_number, self.items_per_page
+        if search_query:
+            employees = self.employee_service._search_employees(
+                search_query, page_number or 1, self.items_per_page, hire_date_range
+            )
+        elif page_number:
+            employees = self.employee_service._get_paginated_employees(
+                sort_by, page_number, self.items_per_page, hire_date_range
             )
+        else:
+            employees = self.employee_service._get_keyset_page(
+                sort_by, cursor, self.items_per_page, hire_date_range
+            )
+
+        # The list parameters but the position in the list, for the pagination
+        # links. Nothing else is carried on: the page is cached for every query
+        # string with the same list parameters.
+        query_string = urlencode(
+            [
+                (name, value)
+                for name, value in self.get_list_params(request)
+                if value and name not in ("page", "cursor")
+            ]
         )
 
         context = {
             "employees": employees,
+            "employee_rows": RowFragmentService._render_rows(
+                "employee/includes/employee_row.html", employees, request
+            ),
+            "sort_by": sort_by,
+            "search": search_query,
+            "filter_form": filter_form,
+            "query_string": query_string,
+            "keyset": not (search_query or page_number),
             "has_previous": employees.has_previous(),
             "has_next": employees.has_next(),
-            "previous_page_number": employees.previous_page_number()
-            if employees.has_previous()
-            else None,
-            "next_page_number": employees.next_page_number()
-            if employees.has_next()
-            else None,
         }
+        if context["keyset"]:
+            context["previous_cursor"] = employees.previous_cursor
+            context["next_cursor"] = employees.next_cursor
+        else:
+            context["previous_page_number"] = (
+                employees.previous_page_number() if employees.has_previous() else None
+            )
+            context["next_page_number"] = (
+                employees.next_page_number() if employees.has_next() else None
+            )
+            context["page_range"] = employees.paginator.get_elided_page_range(
+                employees.number, on_each_side=3, on_ends=1
+            )
 
         return render(request, self.template_name, context)
 
 
+class EmployeeExportView(LoginRequiredMixin, View):
+    employee_service = EmployeeService()
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Streams every employee of the list as a CSV or XLSX download.
+
+        Takes the parameters of the list (``sort_by``, ``search`` and the hire
+        date filters) plus ``format`` (``csv`` or ``xlsx``); the position in the
+        list is ignored.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: A streaming attachment, or an error with status 400.
+        """
+        fmt = request.GET.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return JsonResponse({"error": _("Unsupported export format")}, status=400)
+        rows = self.employee_service._get_export_rows(
+            request.GET.get("sort_by", "full_name"),
+            request.GET.get("search", "").strip(),
+            EmployeeFilterForm(request.GET).get_hire_date_range(),
+        )
+        response = StreamingHttpResponse(
+            EmployeeExportService._stream(
+                rows, fmt, settings.EMPLOYEE_EXPORT_CHUNK_SIZE
+            ),
+            content_type=EXPORT_FORMATS[fmt],
+        )
+        filename = EmployeeExportService._filename(fmt)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class EmployeeAutocompleteView(View):
+    employee_service = EmployeeService()
+    max_results = 50
+
+    def get(self, request: HttpRequest) -> JsonResponse:
+        """
+        Returns the employees best matching a partial name or email as JSON.
+
+        Args:
+            request (HttpRequest): The HTTP request object, with the query in ``q``
+                and optionally the number of results in ``limit``.
+
+        Returns:
+            JsonResponse: ``{"results": [{"id", "full_name", "email"}, ...]}``.
+        """
+        query = request.GET.get("q", "").strip()
+        try:
+            limit = min(int(request.GET.get("limit", 10)), self.max_results)
+        except ValueError:
+            limit = 10
+        results = (
+            self.employee_service._autocomplete_employees(query, limit) if query else []
+        )
+        return JsonResponse({"results": results})
+
+
+class EmployeeTreeView(View):
+    template_name = "employee/employee_tree.html"
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Renders the org chart page; its levels are loaded from ``EmployeeTreeApiView``
+        as they are expanded.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: The HTTP response object containing the rendered template.
+        """
+        return render(request, self.template_name)
+
+
+class EmployeeTreeApiView(View):
+    tree_service = TreeService()
+    max_limit = 1000
+
+    def get(self, request: HttpRequest) -> JsonResponse:
+        """
+        Returns one level of the org chart as JSON.
+
+        Query parameters: ``parent`` (employee id, the roots when missing),
+        ``depth`` (levels to include), ``after`` (the ``next`` value of the
+        previous page) and ``limit`` (nodes on the first level).
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: ``{"parent", "nodes", "next"}``, or an ``error`` with
+                status 400 or 404.
+        """
+        try:
+            parent_id = request.GET.get("parent") or None
+            if parent_id is not None:
+                parent_id = UUID(parent_id)
+            depth = int(request.GET.get("depth", 1))
+            after = request.GET.get("after")
+            after = int(after) if after else None
+            limit = max(1, min(int(request.GET.get("limit", 200)), self.max_limit))
+        except ValueError:
+            return JsonResponse({"error": _("Invalid parameters")}, status=400)
+
+        try:
+            tree = self.tree_service._get_tree_level(parent_id, depth, after, limit)
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=404)
+        return JsonResponse(tree)
+
+
+class UpdateEmployeeSupervisor(LoginRequiredMixin, View):
+    tree_service = TreeService()
+
+    def post(self, request: HttpRequest) -> JsonResponse:
+        """
+        Applies a batch of org tree drag-and-drop moves.
+
+        The body is JSON: ``{"moves": [{"id", "parent", "position"}, ...]}``,
+        where ``parent`` is null for a root and ``position`` (the index among
+        the new siblings) is null to append.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: The levels and headcounts that changed, or an
+                ``error`` with status 400.
+        """
+        try:
+            moves = [
+                TreeMove(
+                    UUID(move["id"]),
+                    UUID(move["parent"]) if move.get("parent") else None,
+                    int(move["position"]) if move.get("position") is not None else None,
+                )
+                for move in json.loads(request.body)["moves"]
+            ]
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({"error": _("Invalid parameters")}, status=400)
+        if not moves:
+            return JsonResponse({"error": _("Invalid parameters")}, status=400)
+
+        try:
+            changes = self.tree_service._move_nodes(moves)
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        return JsonResponse(changes)
+
+
+class EmployeeOrgChartSnapshotView(View):
+    org_chart_service = OrgChartService()
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Returns the cached org chart snapshot as JSON: the whole organisation,
+        the subtree of ``root`` (employee id) or the tree ``tree_id``.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: The JSON list of root nodes with nested ``children``,
+                or an ``error`` with status 400 or 404.
+        """
+        try:
+            root_id = request.GET.get("root") or None
+            if root_id is not None:
+                root_id = UUID(root_id)
+            tree_id = request.GET.get("tree_id")
+            tree_id = int(tree_id) if tree_id else None
+        except ValueError:
+            return JsonResponse({"error": _("Invalid parameters")}, status=400)
+
+        try:
+            if tree_id is not None and root_id is None:
+                snapshot = self.org_chart_service._get_tree_snapshot(tree_id)
+            else:
+                snapshot = self.org_chart_service._get_snapshot(root_id)
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=404)
+        return HttpResponse(snapshot, content_type="application/json")
+
+
+class EmployeeTreeMetricsView(LoginRequiredMixin, View):
+    def get(self, request: HttpRequest) -> JsonResponse:
+        """
+        Return the lock waits (in microseconds) and the number of employees
+        placed per batched renumbering of the tree writes.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            JsonResponse: ``{metric: {"count", "total", "max", "last", "mean"}}``.
+        """
+        return JsonResponse(
+            {
+                name: {**summary._asdict(), "mean": summary.mean}
+                for name, summary in TreeWriteService._get_metrics().items()
+            }
+        )
+
+
+class EmployeeCacheMetricsView(LoginRequiredMixin, View):
+    def get(self, request: HttpRequest) -> JsonResponse:
+        """
+        Return the hits, misses and render times (in milliseconds) of the
+        cached list and detail pages, and the hits and misses of their cached
+        rows.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            JsonResponse: ``{page: {"hits", "misses", "hit_ratio", "render_ms"},
+                "rows": {"hits", "misses", "hit_ratio"}}``.
+        """
+        return JsonResponse(
+            {
+                **ResponseCacheService._get_metrics(),
+                "rows": RowFragmentService._get_metrics(),
+            }
+        )
+
+
+class EmployeeTransferView(LoginRequiredMixin, View):
+    employee_service = EmployeeService()
+
+    def post(self, request: HttpRequest) -> JsonResponse:
+        """
+        Moves the direct reports of a manager (or the manager with their whole
+        subtree) to a new manager in one transaction.
+
+        Form fields: ``manager``, ``new_manager`` (the reports become roots when
+        empty) and ``include_manager``.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: ``{"moved", "renumbered"}``, or ``errors`` with status
+                400.
+        """
+        form = EmployeeTransferForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        try:
+            result = self.employee_service._transfer_reports(
+                form.cleaned_data["manager"],
+                form.cleaned_data["new_manager"],
+                form.cleaned_data["include_manager"],
+            )
+        except ValueError as error:
+            return JsonResponse({"errors": {"__all__": [str(error)]}}, status=400)
+        return JsonResponse(result._asdict())
+
+
+class StaffRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    def test_func(self) -> bool:
+        return self.request.user.is_staff
+
+
+class EmployeeJobCreateView(StaffRequiredMixin, View):
+    def post(self, request: HttpRequest, kind: str) -> JsonResponse:
+        """
+        Queue a background job of the given kind, with the parameters of the
+        form of that kind.
+
+        Args:
+            request (HttpRequest): The request object.
+            kind (str): One of ``Job.Kind``.
+
+        Returns:
+            JsonResponse: The job, with a 202 status and its status URL in the
+                ``Location`` header, or the form errors.
+        """
+        form_class = JOB_FORMS.get(kind)
+        if form_class is None:
+            return JsonResponse({"error": _("Unknown job")}, status=404)
+        form = form_class(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        job = JobService._submit(kind, form.cleaned_data, request.user)
+        response = JsonResponse(JobService._to_dict(job), status=202)
+        response["Location"] = reverse("employee:employee_job", args=[job.pk])
+        return response
+
+
+class EmployeeJobView(LoginRequiredMixin, View):
+    def get(self, request: HttpRequest, job_id: UUID) -> JsonResponse:
+        """
+        Return the status and progress of a background job.
+
+        Args:
+            request (HttpRequest): The request object.
+            job_id (UUID): The job.
+
+        Returns:
+            JsonResponse: The job, as serialized by ``JobService._to_dict``.
+        """
+        try:
+            job = JobService._get_job(job_id)
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=404)
+        return JsonResponse(JobService._to_dict(job))
+
+
+class EmployeeJobCancelView(StaffRequiredMixin, View):
+    def post(self, request: HttpRequest, job_id: UUID) -> JsonResponse:
+        """
+        Cancel a background job; a running job stops after its current chunk.
+
+        Args:
+            request (HttpRequest): The request object.
+            job_id (UUID): The job.
+
+        Returns:
+            JsonResponse: The job, as serialized by ``JobService._to_dict``.
+        """
+        try:
+            job = JobService._cancel(job_id)
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=404)
+        return JsonResponse(JobService._to_dict(job))
+
+
 class EmployeeUpdateView(LoginRequiredMixin, UpdateView):
     template_name = "employee/employee_edit.html"
     form_class = EmployeeForm
@@ -77,6 +498,25 @@ class EmployeeUpdateView(LoginRequiredMixin, UpdateView):
         """
         return self.employee_service._get_employee_by_id(self.kwargs["employee_id"])
 
+    def form_valid(self, form) -> Any:
+        """
+        Save the changes of the employee.
+
+        Args:
+            form: An instance of the form containing the employee data.
+
+        Returns:
+            A redirect to the employee list, or the form with an error when the
+            new supervisor reports to the employee.
+        """
+        self.object = form.save(commit=False)
+        try:
+            self.employee_service._update_employee(self.object)
+        except ValueError as error:
+            form.add_error("parent", str(error))
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
+
 
 class EmployeeDeleteView(LoginRequiredMixin, DeleteView):
     template_name = "employee/employee_delete.html"
@@ -160,6 +600,19 @@ class EmployeeDetailView(DetailView):
         """
         return self.employee_service._get_all_employees()
 
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """
+        Render the detail page; pages rendered for anonymous visitors are cached
+        until the next change to employees or positions.
+        """
+        render = super().get
+        return ResponseCacheService._get_or_render(
+            "detail",
+            request,
+            [("employee_id", str(kwargs[self.pk_url_kwarg]))],
+            lambda: render(request, *args, **kwargs),
+        )
+
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
         Get the context data for the view.
@@ -172,9 +625,17 @@ class EmployeeDetailView(DetailView):
 
         """
         context = super().get_context_data(**kwargs)
-        employee = self.get_object()
-        supervisors = self.employee_service._get_supervisors(employee.id)
-        context["supervisors"] = supervisors
+        summary = self.employee_service._get_org_summary(self.object)
+        context["supervisors"] = summary.supervisors
+        context["direct_reports"] = summary.direct_reports
+        context["direct_report_rows"] = RowFragmentService._render_rows(
+            "employee/includes/direct_report_row.html",
+            summary.direct_reports,
+            self.request,
+        )
+        context["direct_report_count"] = summary.direct_report_count
+        context["headcount"] = summary.headcount
+        context["depth"] = summary.depth
         return context
 
 
@@ -192,8 +653,8 @@ class EmployeeCreateView(LoginRequiredMixin, CreateView):
             form: An instance of the form containing the employee data.
 
         Returns:
-            The result of calling the `form_valid` method of the parent class.
+            A redirect to the employee list.
         """
-        employee = form.save(commit=False)
-        self.employee_service._create_employee(employee)
-        return super().form_valid(form)
+        self.object = form.save(commit=False)
+        self.employee_service._create_employee(self.object)
+        return HttpResponseRedirect(self.get_success_url())
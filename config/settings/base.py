@@ -61,12 +61,14 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
     # "django.contrib.humanize", # Handy template tags
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
 ]
 THIRD_PARTY_APPS = [
     "crispy_forms",
     "crispy_bootstrap5",
     "mptt",
+    "django_celery_beat",
 ]
 
 LOCAL_APPS = [
@@ -223,6 +225,51 @@ ADMINS = [("""To Kirill""", "tio.kirill@gmail.com")]
 # https://docs.djangoproject.com/en/dev/ref/settings/#managers
 MANAGERS = ADMINS
 
+# EMPLOYEES
+# ------------------------------------------------------------------------------
+# How the employee list counts its rows for numbered pages: "exact" (COUNT(*)),
+# "cached" (COUNT(*) cached until an employee or position changes) or
+# "estimated" (PostgreSQL planner statistics above the threshold).
+EMPLOYEE_COUNT_STRATEGY = env("EMPLOYEE_COUNT_STRATEGY", default="exact")
+EMPLOYEE_COUNT_CACHE_TIMEOUT = env.int("EMPLOYEE_COUNT_CACHE_TIMEOUT", default=60 * 60)
+EMPLOYEE_COUNT_ESTIMATE_THRESHOLD = env.int(
+    "EMPLOYEE_COUNT_ESTIMATE_THRESHOLD", default=100_000
+)
+# How often (seconds) a worker applies the employee changes other processes
+# published to its in-memory type-ahead index.
+EMPLOYEE_TYPEAHEAD_MAX_STALENESS = env.int(
+    "EMPLOYEE_TYPEAHEAD_MAX_STALENESS", default=300
+)
+# How long (seconds) org chart snapshots are cached, and how long other workers
+# wait for the one rebuilding a snapshot before building it themselves.
+EMPLOYEE_ORG_CHART_TIMEOUT = env.int("EMPLOYEE_ORG_CHART_TIMEOUT", default=60 * 60 * 24)
+EMPLOYEE_ORG_CHART_LOCK_TIMEOUT = env.int("EMPLOYEE_ORG_CHART_LOCK_TIMEOUT", default=60)
+# How long (seconds) the pages of the employee list and detail views are cached
+# for anonymous visitors (0 disables the cache), and how long other workers wait
+# for the one rendering a missing page.
+EMPLOYEE_RESPONSE_CACHE_TIMEOUT = env.int(
+    "EMPLOYEE_RESPONSE_CACHE_TIMEOUT", default=60 * 10
+)
+EMPLOYEE_RESPONSE_CACHE_LOCK_TIMEOUT = env.int(
+    "EMPLOYEE_RESPONSE_CACHE_LOCK_TIMEOUT", default=10
+)
+# How long (seconds) rendered rows of the employee list and detail pages are
+# cached; a changed employee gets a new key, so this only bounds the memory.
+EMPLOYEE_ROW_FRAGMENT_TIMEOUT = env.int(
+    "EMPLOYEE_ROW_FRAGMENT_TIMEOUT", default=60 * 60 * 24
+)
+# How often (seconds) a process checks whether the positions it keeps in
+# memory were changed by another process.
+EMPLOYEE_POSITION_REGISTRY_CHECK_INTERVAL = env.int(
+    "EMPLOYEE_POSITION_REGISTRY_CHECK_INTERVAL", default=5
+)
+# How many rows a background job handles per chunk; progress is reported, the
+# checkpoint saved and cancellation checked after every chunk.
+EMPLOYEE_JOB_CHUNK_SIZE = env.int("EMPLOYEE_JOB_CHUNK_SIZE", default=5000)
+# How many rows a CSV/XLSX export of the employee list fetches from its
+# server-side cursor at a time.
+EMPLOYEE_EXPORT_CHUNK_SIZE = env.int("EMPLOYEE_EXPORT_CHUNK_SIZE", default=2000)
+
 # LOGGING
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#logging
@@ -246,3 +293,53 @@ LOGGING = {
     },
     "root": {"level": "INFO", "handlers": ["console"]},
 }
+
+# Redis
+# ------------------------------------------------------------------------------
+# Serves the cache and the Celery broker. The cache must be shared by every web
+# and worker process: cache generations, type-ahead changes and metrics
+# written by one process are read by the others.
+REDIS_URL = env("REDIS_URL", default="redis://redis:6379/0")
+
+# Celery
+# ------------------------------------------------------------------------------
+if USE_TZ:
+    # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-timezone
+    CELERY_TIMEZONE = TIME_ZONE
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-broker_url
+# The Redis of the cache (the `redis` service of local.yml) by default.
+CELERY_BROKER_URL = env("CELERY_BROKER_URL", default=REDIS_URL)
+# Job progress and outcomes are stored on the Job rows, not in a result backend.
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-task_ignore_result
+CELERY_TASK_IGNORE_RESULT = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-accept_content
+CELERY_ACCEPT_CONTENT = ["json"]
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-task_serializer
+CELERY_TASK_SERIALIZER = "json"
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-result_serializer
+CELERY_RESULT_SERIALIZER = "json"
+# Jobs resume from their checkpoint, so the task of a worker that dies is
+# redelivered instead of lost.
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-acks-late
+CELERY_TASK_ACKS_LATE = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-reject-on-worker-lost
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-prefetch-multiplier
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# A job that runs out of time is retried from its checkpoint.
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-soft-time-limit
+CELERY_TASK_SOFT_TIME_LIMIT = 30 * 60
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-time-limit
+CELERY_TASK_TIME_LIMIT = 35 * 60
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
+CELERY_WORKER_SEND_TASK_EVENTS = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-task_send_sent_event
+CELERY_TASK_SEND_SENT_EVENT = True
+# Run tasks in the calling process instead of a worker, e.g. to test jobs
+# locally without a broker.
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-always-eager
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-eager-propagates
+CELERY_TASK_EAGER_PROPAGATES = True
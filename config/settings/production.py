@@ -31,10 +31,16 @@ CACHES = {
             # Mimicing memcache behavior.
             # https://github.com/jazzband/django-redis#memcached-exceptions-behavior
             "IGNORE_EXCEPTIONS": True,
+            # Org chart snapshots are large, repetitive JSON documents.
+            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
         },
     }
 }
 
+# EMPLOYEES
+# ------------------------------------------------------------------------------
+EMPLOYEE_COUNT_STRATEGY = env("EMPLOYEE_COUNT_STRATEGY", default="estimated")
+
 # SECURITY
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#secure-proxy-ssl-header
@@ -33,6 +33,12 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 # file. This includes Django's development server, if the WSGI_APPLICATION
 # setting points here.
 application = get_wsgi_application()
+
+# Build the employee type-ahead index in the background as each worker starts.
+from apps.employee.service.typeahead import warm_typeahead_index  # noqa E402
+
+warm_typeahead_index()
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)